@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Times a cold ``import vcs`` (fresh interpreter, temporary HOME) replaying
+the initial.attributes files and restoring them from the elements
+snapshot written by the first import.
+
+    python scripts/benchmarks/bench_import_vcs.py [repeats]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+child = """
+import time
+start = time.time()
+import vcs
+elapsed = time.time() - start
+print("%f %i" % (elapsed, vcs._snapshotRestored))
+"""
+
+
+def importVCS(home):
+    env = dict(os.environ)
+    env["HOME"] = home
+    env.pop("UVCDAT_DIR", None)
+    out = subprocess.check_output([sys.executable, "-c", child], env=env)
+    elapsed, restored = out.decode("utf-8").strip().split("\n")[-1].split()
+    return float(elapsed), bool(int(restored))
+
+
+def main(repeats):
+    home = tempfile.mkdtemp()
+    snapshot = os.path.join(home, ".uvcdat", "elements.snapshot")
+    try:
+        replayed = []
+        restored = []
+        for i in range(repeats):
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
+            elapsed, fromSnapshot = importVCS(home)
+            if fromSnapshot:
+                raise RuntimeError("the snapshot was restored without a snapshot file")
+            replayed.append(elapsed)
+            elapsed, fromSnapshot = importVCS(home)
+            if not fromSnapshot:
+                print("warning: the snapshot was not restored")
+            restored.append(elapsed)
+        print("import vcs, best of %i:" % repeats)
+        print("  replaying initial.attributes: %.3fs" % min(replayed))
+        print("  from the elements snapshot:   %.3fs" % min(restored))
+    finally:
+        shutil.rmtree(home)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
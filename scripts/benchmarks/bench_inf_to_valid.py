@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Times vcs2vtk.setInfToValid and vcs2vtk.getVisibleBounds on projected
+points, 30% of them at infinity, against the point by point loops they
+replaced.
+
+    python scripts/benchmarks/bench_inf_to_valid.py [number of points]
+"""
+import math
+import sys
+import time
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+from vcs import vcs2vtk
+
+
+def loopSetInfToValid(geoPoints, ghost):
+    # the point by point version setInfToValid used to be
+    validPoint = [0, 0, 0]
+    for i in range(geoPoints.GetNumberOfTuples()):
+        point = geoPoints.GetTuple(i)
+        if (not math.isinf(point[0]) and not math.isinf(point[1])):
+            validPoint = point
+            break
+    anyInfinity = False
+    for i in range(geoPoints.GetNumberOfTuples()):
+        point = geoPoints.GetTuple(i)
+        if (math.isinf(point[0]) or math.isinf(point[1])):
+            anyInfinity = True
+            newPoint = list(point)
+            if (math.isinf(point[0])):
+                newPoint[0] = validPoint[0]
+            if (math.isinf(point[1])):
+                newPoint[1] = validPoint[1]
+            geoPoints.SetTuple(i, newPoint)
+            ghost.SetValue(i, vtk.vtkDataSetAttributes.HIDDENPOINT)
+    return anyInfinity
+
+
+def loopVisibleBounds(pts, ghost):
+    xm = ym = sys.float_info.max
+    xM = yM = - sys.float_info.max
+    for i in range(pts.GetNumberOfPoints()):
+        if (ghost.GetValue(i) & vtk.vtkDataSetAttributes.HIDDENPOINT == 0):
+            p = pts.GetPoint(i)
+            xm = min(xm, p[0])
+            xM = max(xM, p[0])
+            ym = min(ym, p[1])
+            yM = max(yM, p[1])
+    return [xm, xM, ym, yM]
+
+
+def projectedPoints(n, infinity=.3):
+    xyz = numpy.random.random((n, 3)) * 1.e6
+    xyz[numpy.random.random(n) < infinity, 0] = numpy.inf
+    xyz[numpy.random.random(n) < infinity, 1] = - numpy.inf
+    pts = vtk.vtkPoints()
+    pts.SetData(VN.numpy_to_vtk(xyz, deep=True))
+    ghost = vtk.vtkUnsignedCharArray()
+    ghost.SetNumberOfTuples(n)
+    ghost.Fill(0)
+    return pts, ghost
+
+
+def timed(function, *args):
+    start = time.time()
+    function(*args)
+    return time.time() - start
+
+
+def main(n):
+    pts, ghost = projectedPoints(n)
+    loopPts = vtk.vtkPoints()
+    loopPts.DeepCopy(pts)
+    loopGhost = vtk.vtkUnsignedCharArray()
+    loopGhost.DeepCopy(ghost)
+    print("%i points" % n)
+    print("%16s %10s %10s" % ("", "numpy", "loop"))
+    print("%16s %9.3fs %9.3fs" % ("setInfToValid", timed(vcs2vtk.setInfToValid, pts, ghost),
+                                  timed(loopSetInfToValid, loopPts.GetData(), loopGhost)))
+    print("%16s %9.3fs %9.3fs" % ("visible bounds", timed(vcs2vtk.getVisibleBounds, pts, ghost),
+                                  timed(loopVisibleBounds, loopPts, loopGhost)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
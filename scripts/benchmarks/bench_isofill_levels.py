@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Isofill contouring time against the number of levels on a 1440x720
+field: one banded contour filter per level (the path isofill took when
+levels could not be grouped, e.g. one opacity per level) against the
+single banded pass classified into levels that isofill does now. Also
+times a full vcs plot with one opacity per level.
+
+    python scripts/benchmarks/bench_isofill_levels.py
+"""
+import time
+import numpy
+import vtk
+import vcs
+from vtk.util import numpy_support as VN
+from vcs import vcs2vtk
+
+NX, NY = 1440, 720
+LEVEL_COUNTS = [5, 10, 20, 40, 80]
+
+
+def field():
+    x = numpy.linspace(0, 8 * numpy.pi, NX)
+    y = numpy.linspace(0, 4 * numpy.pi, NY)
+    return numpy.sin(x)[numpy.newaxis, :] * numpy.cos(y)[:, numpy.newaxis]
+
+
+def fieldPolyData(data):
+    image = vtk.vtkImageData()
+    image.SetDimensions(NX, NY, 1)
+    scalars = VN.numpy_to_vtk(numpy.ascontiguousarray(data.ravel()), deep=True)
+    scalars.SetName("scalar")
+    image.GetPointData().SetScalars(scalars)
+    surface = vtk.vtkDataSetSurfaceFilter()
+    surface.SetInputData(image)
+    surface.Update()
+    return surface.GetOutput()
+
+
+def contourBands(poly, values, scalarModeToValue=False):
+    cot = vtk.vtkBandedPolyDataContourFilter()
+    cot.ClippingOn()
+    cot.SetInputData(poly)
+    cot.SetNumberOfContours(len(values))
+    cot.SetClipTolerance(0.)
+    if scalarModeToValue:
+        cot.SetScalarModeToValue()
+    for j, v in enumerate(values):
+        cot.SetValue(j, v)
+    cot.Update()
+    return cot.GetOutput()
+
+
+def perLevel(poly, levels):
+    for level in levels:
+        contourBands(poly, level)
+
+
+def singlePass(poly, levels):
+    bands = numpy.unique(levels).tolist()
+    vcs2vtk.classifyCells(contourBands(poly, bands, True), levels, bands=bands)
+
+
+def timed(function, *args):
+    start = time.time()
+    function(*args)
+    return time.time() - start
+
+
+def main():
+    data = field()
+    poly = fieldPolyData(data)
+    canvas = vcs.init(bg=True)
+    print("%ix%i field" % (NX, NY))
+    print("%7s %12s %12s %12s" % ("levels", "per level", "single pass", "vcs plot"))
+    for numberOfLevels in LEVEL_COUNTS:
+        edges = numpy.linspace(-1, 1, numberOfLevels + 1)
+        levels = [[edges[k], edges[k + 1]] for k in range(numberOfLevels)]
+        iso = canvas.createisofill()
+        iso.levels = edges.tolist()
+        iso.fillareacolors = vcs.getcolors(iso.levels)
+        iso.fillareaopacity = numpy.linspace(50, 100, numberOfLevels).tolist()
+        plotTime = timed(canvas.plot, data, iso)
+        canvas.clear()
+        vcs.removeobject(iso)
+        print("%7i %11.3fs %11.3fs %11.3fs" % (numberOfLevels, timed(perLevel, poly, levels),
+                                               timed(singlePass, poly, levels), plotTime))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Time to build the polygon cells of a mesh against the number of cells:
+vcs2vtk.genPolygonCells (numpy, through numpy_to_vtkCellArray) against
+the cell by cell InsertNextCell loop genGrid used to do. The loop is
+skipped above LOOP_MAX_CELLS cells.
+
+    python scripts/benchmarks/bench_polygon_cells.py
+"""
+import time
+import numpy
+import vtk
+from vcs import vcs2vtk
+
+CELL_COUNTS = [10000, 100000, 1000000]
+LOOP_MAX_CELLS = 1000000
+N_VERTICES = 6
+
+
+def loopPolygonCells(vertices, numberOfCells, nVertices):
+    # the cell by cell construction genGrid used to do
+    vg = vtk.vtkUnstructuredGrid()
+    for i in range(numberOfCells):
+        pt_ids = []
+        for j in range(nVertices):
+            indx = i * nVertices + j
+            if not numpy.isnan(vertices[indx][0]):
+                pt_ids.append(indx)
+        vg.InsertNextCell(vtk.VTK_POLYGON, len(pt_ids), pt_ids)
+    return vg
+
+
+def numpyPolygonCells(vertices, numberOfCells, nVertices):
+    vg = vtk.vtkUnstructuredGrid()
+    vg.SetCells(vtk.VTK_POLYGON, vcs2vtk.genPolygonCells(vertices, numberOfCells, nVertices))
+    return vg
+
+
+def randomMesh(numberOfCells, nVertices, missing=.2):
+    vertices = numpy.random.random((numberOfCells * nVertices, 3))
+    vertices[numpy.random.random(numberOfCells * nVertices) < missing, 0] = numpy.nan
+    return vertices
+
+
+def timed(function, *args):
+    start = time.time()
+    function(*args)
+    return time.time() - start
+
+
+def main():
+    print("%10s %12s %12s" % ("cells", "numpy", "loop"))
+    for numberOfCells in CELL_COUNTS:
+        vertices = randomMesh(numberOfCells, N_VERTICES)
+        vectorized = timed(numpyPolygonCells, vertices, numberOfCells, N_VERTICES)
+        if numberOfCells <= LOOP_MAX_CELLS:
+            loop = "%11.3fs" % timed(loopPolygonCells, vertices, numberOfCells, N_VERTICES)
+        else:
+            loop = "%12s" % "-"
+        print("%10i %11.3fs %s" % (numberOfCells, vectorized, loop))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Times vcs2vtk.doWrapData on global 0.1 degree data (3600x1800 cells)
+wrapped over 720 degrees, against the transform filter per translation
+it used to append and clip.
+
+    python scripts/benchmarks/bench_wrap_data.py [--new-only]
+"""
+import sys
+import time
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+from vcs import vcs2vtk
+
+WC = [-360., 360., -90., 90.]
+WRAP = [0., 360.]
+
+
+def appendWrapData(data, wc, wrap):
+    # one transform filter per translation appended together and
+    # clipped, as doWrapData used to do
+    surface = vtk.vtkDataSetSurfaceFilter()
+    surface.SetInputData(data)
+    surface.Update()
+    data = surface.GetOutput()
+    data.GetCellData().SetActiveAttribute(-1, vtk.vtkDataSetAttributes.GLOBALIDS)
+    data.GetPointData().SetActiveAttribute(-1, vtk.vtkDataSetAttributes.VECTORS)
+    bounds = data.GetBounds()
+    nX = [0, 0]
+    Amn, Amx = bounds[0], bounds[1]
+    while Amn > wc[0]:
+        nX[0] += 1
+        Amn -= wrap[1]
+    while Amx < wc[1]:
+        nX[1] += 1
+        Amx += wrap[1]
+    appendFilter = vtk.vtkAppendPolyData()
+    for i in range(-nX[0], nX[1] + 1):
+        for j in range(-nX[0], nX[1] + 1):
+            transform = vtk.vtkTransform()
+            transform.Translate(i * wrap[1], j * wrap[0], 0)
+            tpf = vtk.vtkTransformFilter()
+            tpf.SetInputData(data)
+            tpf.SetTransform(transform)
+            tpf.Update()
+            appendFilter.AddInputData(tpf.GetOutput())
+    clipBox = vtk.vtkBox()
+    clipBox.SetXMin(wc[0], wc[2], -1.0)
+    clipBox.SetXMax(wc[1], wc[3], 1.0)
+    clipper = vtk.vtkExtractPolyDataGeometry()
+    clipper.ExtractInsideOn()
+    clipper.SetImplicitFunction(clipBox)
+    clipper.ExtractBoundaryCellsOn()
+    clipper.PassPointsOff()
+    clipper.SetInputConnection(appendFilter.GetOutputPort())
+    clipper.Update()
+    return clipper.GetOutput()
+
+
+def globalGrid(nx, ny):
+    grid = vtk.vtkRectilinearGrid()
+    grid.SetDimensions(nx + 1, ny + 1, 1)
+    grid.SetXCoordinates(VN.numpy_to_vtk(numpy.linspace(0., 360., nx + 1), deep=True))
+    grid.SetYCoordinates(VN.numpy_to_vtk(numpy.linspace(-90., 90., ny + 1), deep=True))
+    grid.SetZCoordinates(VN.numpy_to_vtk(numpy.zeros(1), deep=True))
+    globalIds = VN.numpy_to_vtk(numpy.arange(nx * ny), deep=True)
+    globalIds.SetName("GlobalIds")
+    grid.GetCellData().SetGlobalIds(globalIds)
+    vectors = VN.numpy_to_vtk(numpy.random.random(((nx + 1) * (ny + 1), 3)), deep=True)
+    vectors.SetName("vector")
+    grid.GetPointData().SetVectors(vectors)
+    return grid
+
+
+def timed(function, *args):
+    start = time.time()
+    result = function(*args)
+    return time.time() - start, result
+
+
+def main(newOnly):
+    grid = globalGrid(3600, 1800)
+    print("global 0.1 degree data (3600x1800 cells) over 720 degrees")
+    elapsed, result = timed(vcs2vtk.doWrapData, grid, WC, WRAP)
+    print("  doWrapData:      %.3fs, %i cells" % (elapsed, result.GetNumberOfCells()))
+    if not newOnly:
+        elapsed, result = timed(appendWrapData, grid, WC, WRAP)
+        print("  append and clip: %.3fs, %i cells" % (elapsed, result.GetNumberOfCells()))
+
+
+if __name__ == "__main__":
+    main("--new-only" in sys.argv[1:])
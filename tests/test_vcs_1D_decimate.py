@@ -0,0 +1,112 @@
+import basevcstest
+import numpy
+import cdms2
+import vcs
+from vcs.vcsvtk import pipeline1d
+
+
+def loopSegments(values):
+    # Reference: the per element splitting Pipeline1D used to do
+    segments = []
+    prev = None
+    for i, v in enumerate(values):
+        if v is not None:
+            if prev is None:
+                prev = []
+            prev.append(i)
+        elif prev is not None:
+            segments.append((prev[0], prev[-1] + 1))
+            prev = None
+    if prev is not None:
+        segments.append((prev[0], prev[-1] + 1))
+    return segments
+
+
+class TestVCS1DDecimate(basevcstest.VCSBaseTest):
+    def testSegments(self):
+        for mask in [[0, 0, 1, 0, 1, 1, 0], [1, 0, 0, 1], [1, 1], [0], []]:
+            values = numpy.ma.masked_array(numpy.arange(len(mask)), mask=mask)
+            self.assertEqual([(int(s), int(e)) for s, e in pipeline1d.segments(~numpy.ma.getmaskarray(values))],
+                             loopSegments(values.tolist()))
+
+    def testMinMaxKeepsPeaks(self):
+        x = numpy.arange(100000, dtype=numpy.float64)
+        y = numpy.random.random(len(x))
+        y[12345] = 10.
+        y[54321] = -10.
+        kept = pipeline1d.minmax_indices(x, y, 0, len(x) - 1, 100)
+        self.assertLessEqual(len(kept), 4 * 101)
+        self.assertIn(12345, kept)
+        self.assertIn(54321, kept)
+        self.assertEqual(kept[0], 0)
+        self.assertEqual(kept[-1], len(x) - 1)
+        # min and max of each pixel column are kept
+        bins = numpy.floor(x / (len(x) - 1) * 100)
+        for b in numpy.unique(bins):
+            self.assertEqual(y[kept][bins[kept] == b].max(), y[bins == b].max())
+            self.assertEqual(y[kept][bins[kept] == b].min(), y[bins == b].min())
+
+    def testLTTB(self):
+        x = numpy.arange(100000, dtype=numpy.float64)
+        y = numpy.sin(x / 1000.)
+        y[12345] = 10.
+        kept = pipeline1d.lttb_indices(x, y, 200)
+        self.assertEqual(len(kept), 200)
+        self.assertTrue((numpy.diff(kept) > 0).all())
+        self.assertIn(12345, kept)
+        # nothing to do on short series
+        self.assertEqual(pipeline1d.lttb_indices(x[:300], y[:300], 200).tolist(), list(range(300)))
+
+    def testDecimateValues(self):
+        yx = self.x.create1d()
+        yx.decimate = "LTTB"
+        self.assertEqual(yx.decimate, "lttb")
+        yx.decimate = None
+        with self.assertRaises(ValueError):
+            yx.decimate = "every_other"
+
+    def testNonMonotonic(self):
+        # x going back and forth, as in flipped or parametric plots
+        t = numpy.linspace(0, 20 * numpy.pi, 100000)
+        x = numpy.cos(t) * t
+        y = numpy.sin(t) * t
+        kept = pipeline1d.decimate(x, y, "minmax", x.min(), x.max(), 100)
+        self.assertLessEqual(len(kept), 8 * 100)
+        self.assertTrue((numpy.diff(kept) > 0).all())
+        for values in [x, y]:
+            self.assertIn(numpy.argmax(values), kept)
+            self.assertIn(numpy.argmin(values), kept)
+        self.assertEqual(len(pipeline1d.decimate(x, y, "lttb", x.min(), x.max(), 100)), 200)
+
+    def testPlotLongSeries(self):
+        n = 10000000
+        data = numpy.ma.masked_array(numpy.sin(numpy.arange(n) / 10000.) + numpy.random.random(n))
+        data[n // 3:n // 3 + 1000] = numpy.ma.masked
+        data = cdms2.createVariable(data, id="station")
+        for method in ["minmax", "lttb"]:
+            yx = self.x.create1d()
+            yx.decimate = method
+            self.x.plot(data, yx, bg=self.bg)
+            self.x.clear()
+            vcs.removeobject(yx)
+
+    def testMarkersNotDecimated(self):
+        n = 100000
+        data = cdms2.createVariable(numpy.sin(numpy.arange(n) / 100.), id="station")
+        yx = self.x.create1d()
+        yx.decimate = "minmax"
+        yx.marker = "dot"
+        plotted = {}
+        plot = vcs.Canvas.Canvas.plot
+
+        def record(canvas, *args, **kargs):
+            if args and (vcs.isline(args[0]) or vcs.ismarker(args[0])):
+                plotted.setdefault(type(args[0]).__name__, sum(len(x) for x in args[0].x))
+            return plot(canvas, *args, **kargs)
+        vcs.Canvas.Canvas.plot = record
+        try:
+            self.x.plot(data, yx, bg=self.bg)
+        finally:
+            vcs.Canvas.Canvas.plot = plot
+        self.assertEqual(plotted["Tm"], n)
+        self.assertLess(plotted["Tl"], n)
@@ -0,0 +1,119 @@
+import basevcstest
+import hashlib
+import numpy
+import os
+import shutil
+import vtk
+from vtk.util import numpy_support as VN
+
+
+def digests(files):
+    return [hashlib.md5(open(f, "rb").read()).hexdigest() for f in files]
+
+
+def readPNG(fnm):
+    reader = vtk.vtkPNGReader()
+    reader.SetFileName(fnm)
+    reader.Update()
+    image = reader.GetOutput()
+    width, height, _ = image.GetDimensions()
+    return VN.vtk_to_numpy(image.GetPointData().GetScalars()).reshape(height, width, -1)[::-1]
+
+
+class Collector(object):
+    def __init__(self):
+        self.images = []
+
+    def write(self, image):
+        self.images.append(image.copy())
+
+
+class TestVCSAnimateWorkers(basevcstest.VCSBaseTest):
+    def renderFrames(self, workers):
+        create = self.x.animate.create_thread
+        create.create_prefix()
+        frames = list(range(self.x.animate.number_of_frames()))
+        files = create.render_frames(frames, workers)
+        self.assertEqual([os.path.basename(f) for f in files], ["anim_%i.png" % i for i in frames])
+        result = digests(files)
+        shutil.rmtree(os.path.dirname(files[0]))
+        return result
+
+    def testWorkersSetting(self):
+        self.assertEqual(self.x.animate.workers(), 1)
+        self.x.animate.workers(4)
+        self.assertEqual(self.x.animate.workers(), 4)
+        with self.assertRaises(ValueError):
+            self.x.animate.workers(0)
+
+    def testSameFramesAsSerial(self):
+        s = self.clt("clt", slice(0, 12))
+        gm = self.x.createisofill()
+        self.x.plot(s, gm, bg=self.bg)
+        self.x.animate.create()
+        serial = self.renderFrames(1)
+        parallel = self.renderFrames(3)
+        self.assertEqual(len(serial), 12)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(set(serial)), 12)
+
+    def testStreamedFramesMatchFiles(self):
+        s = self.clt("clt", slice(0, 6))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        create = self.x.animate.create_thread
+        frames = list(range(self.x.animate.number_of_frames()))
+        files = create.render_frames(frames, 1)
+        for workers in [1, 2]:
+            collector = Collector()
+            create.stream_frames(frames, collector, workers)
+            self.assertEqual(len(collector.images), len(files))
+            for image, fnm in zip(collector.images, files):
+                numpy.testing.assert_array_equal(image, readPNG(fnm)[..., :3])
+        shutil.rmtree(os.path.dirname(files[0]))
+
+    def testNoGlobPerFrame(self):
+        s = self.clt("clt", slice(0, 6))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        create = self.x.animate.create_thread
+        self.x.animate.plot_to_canvas(create.canvas, self.x.display_names, bg=1)
+        self.x.animate.animation_files = []
+        for i in [0, 3, 0, 5]:
+            create.get_frame(i)
+        self.assertEqual([os.path.basename(f) for f in self.x.animate.animation_files],
+                         ["anim_0.png", "anim_3.png", "anim_5.png"])
+        shutil.rmtree(os.path.dirname(self.x.animate.animation_files[0]))
+
+    def testSave(self):
+        s = self.clt("clt", slice(0, 6))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        prefix = os.path.splitext(os.path.split(__file__)[1])[0]
+        for workers in [1, 2]:
+            # frames are piped to ffmpeg, no png is written
+            self.x.animate.save("%s.mp4" % prefix, workers=workers)
+            self.assertTrue(os.path.exists("%s.mp4" % prefix))
+            self.assertEqual(self.x.animate.animation_files, [])
+            self.assertFalse(os.path.exists(self.x.animate.create_thread.get_frame_name(0)))
+            os.remove("%s.mp4" % prefix)
+        # ffmpeg failures are raised
+        with self.assertRaises(RuntimeError):
+            self.x.animate.save("%s.mp4" % prefix, options="-not_an_ffmpeg_option")
+        self.x.animate.save("%s.mp4" % prefix, workers=2, frames=True)
+        self.assertTrue(os.path.exists(self.x.animate.create_thread.get_frame_name(5)))
+        os.remove("%s.mp4" % prefix)
+        self.x.animate.close()
+
+    def testClosePreservesStreamedFrames(self):
+        s = self.clt("clt", slice(0, 6))
+        self.x.plot(s, bg=self.bg)
+        self.x.animate.create()
+        prefix = os.path.splitext(os.path.split(__file__)[1])[0]
+        self.x.animate.save("%s.mp4" % prefix)
+        # the streamed frames are rendered when their pngs are kept
+        pngs = self.x.animate.close(preserve_pngs=True)
+        self.assertEqual(sorted(os.path.basename(p) for p in pngs),
+                         sorted("anim_%i.png" % i for i in range(6)))
+        shutil.rmtree(os.path.dirname(pngs[0]))
+        os.remove("%s.mp4" % prefix)
@@ -0,0 +1,124 @@
+import basevcstest
+import unittest
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+from vcs import vcs2vtk
+
+
+def gridPolyData(nx, ny, values):
+    # Surface of a nx by ny cells image with 'values' as cell scalars
+    image = vtk.vtkImageData()
+    image.SetDimensions(nx + 1, ny + 1, 1)
+    scalars = VN.numpy_to_vtk(numpy.ascontiguousarray(values, dtype=numpy.float64), deep=True)
+    scalars.SetName("scalar")
+    image.GetCellData().SetScalars(scalars)
+    surface = vtk.vtkDataSetSurfaceFilter()
+    surface.SetInputData(image)
+    surface.Update()
+    return surface.GetOutput()
+
+
+def thresholdLevels(poly, levels):
+    # Reference: the one vtkThreshold per level custom boxfills used to do
+    result = []
+    for low, high in levels:
+        th = vtk.vtkThreshold()
+        if hasattr(th, "SetLowerThreshold"):
+            th.SetLowerThreshold(low)
+            th.SetUpperThreshold(high)
+            th.SetThresholdFunction(vtk.vtkThreshold.THRESHOLD_BETWEEN)
+        else:
+            th.ThresholdBetween(low, high)
+        th.SetInputData(poly)
+        surface = vtk.vtkDataSetSurfaceFilter()
+        surface.SetInputConnection(th.GetOutputPort())
+        surface.Update()
+        result.append(surface.GetOutput())
+    return result
+
+
+def loopClassify(values, levels):
+    # Reference: later levels are drawn on top of earlier ones
+    result = numpy.full(len(values), -1)
+    for k, (low, high) in enumerate(levels):
+        result[(values >= low) & (values <= high)] = k
+    return result
+
+
+class TestVCSBoxfillCustomClassify(unittest.TestCase):
+    def testClassifyValues(self):
+        values = numpy.array([-5., 0., 5., 10., 15., 20., 25., 30., 1.e21, numpy.nan])
+        for levels in [[[0, 10], [10, 20], [20, 30]],
+                       [[-1.e20, 10], [20, 1.e20]],
+                       [[0, 20], [5, 10]],
+                       [[5, 10], [0, 20]],
+                       [[10, 10]],
+                       []]:
+            self.assertEqual(vcs2vtk.classifyValues(values, levels).tolist(),
+                             loopClassify(values, levels).tolist())
+        values = numpy.random.random(10000) * 100. - 10.
+        levels = [[0, 12.5], [12.5, 30], [40, 41], [41, 80], [60, 70]]
+        self.assertEqual(vcs2vtk.classifyValues(values, levels).tolist(),
+                         loopClassify(values, levels).tolist())
+
+    def testClassifyCells(self):
+        nx, ny = 30, 20
+        poly = gridPolyData(nx, ny, numpy.random.random(nx * ny) * 100.)
+        # the surface filter may reorder the cells
+        values = VN.vtk_to_numpy(poly.GetCellData().GetScalars())
+        levels = [[10, 20], [20, 50], [60, 90]]
+        classified = vcs2vtk.classifyCells(poly, levels)
+        index = loopClassify(values, levels)
+        self.assertEqual(classified.GetNumberOfCells(), (index >= 0).sum())
+        self.assertEqual(classified.GetCellData().GetScalars().GetName(), "LevelIndex")
+        self.assertEqual(VN.vtk_to_numpy(classified.GetCellData().GetScalars()).tolist(),
+                         index[index >= 0].tolist())
+        numpy.testing.assert_array_equal(
+            VN.vtk_to_numpy(classified.GetCellData().GetArray("scalar")), values[index >= 0])
+        # Same cells as the per level thresholds
+        for k, reference in enumerate(thresholdLevels(poly, levels)):
+            level = vcs2vtk.extractCells(classified, VN.vtk_to_numpy(
+                classified.GetCellData().GetScalars()) == k, compact=True)
+            self.assertEqual(level.GetNumberOfPoints(), reference.GetNumberOfPoints())
+            self.assertEqual(level.GetNumberOfCells(), reference.GetNumberOfCells())
+            numpy.testing.assert_array_equal(
+                numpy.sort(VN.vtk_to_numpy(level.GetCellData().GetArray("scalar"))),
+                numpy.sort(VN.vtk_to_numpy(reference.GetCellData().GetArray("scalar"))))
+            numpy.testing.assert_allclose(level.GetBounds(), reference.GetBounds())
+
+    def testManyLevels(self):
+        nx, ny = 720, 360
+        poly = gridPolyData(nx, ny, numpy.random.random(nx * ny) * 100.)
+        values = VN.vtk_to_numpy(poly.GetCellData().GetScalars())
+        for numberOfLevels in [5, 40]:
+            edges = numpy.linspace(0, 100, numberOfLevels + 1)
+            levels = [[edges[k], edges[k + 1]] for k in range(numberOfLevels)]
+            classified = vcs2vtk.classifyCells(poly, levels)
+            self.assertEqual(classified.GetNumberOfCells(), nx * ny)
+            self.assertEqual(VN.vtk_to_numpy(classified.GetCellData().GetScalars()).tolist(),
+                             loopClassify(values, levels).tolist())
+
+
+def patternCells(display):
+    return [item.GetPolyData().GetNumberOfCells() if item.GetVisible() else 0
+            for item in display.backend["vtk_backend_pattern_items"]]
+
+
+class TestVCSBoxfillCustomPatterns(basevcstest.VCSBaseTest):
+    def testUpdatePatterns(self):
+        s = self.clt("clt", slice(0, 2))
+        gm = self.x.createboxfill()
+        gm.boxfill_type = "custom"
+        gm.levels = [0, 20, 40, 60, 80, 100]
+        gm.fillareastyle = "hatch"
+        gm.fillareaindices = [1, 2, 3, 4, 5]
+        display = self.x.plot(s(time=slice(0, 1)), gm, bg=self.bg)
+        before = patternCells(display)
+        self.assertEqual(len(before), 5)
+        # the hatches are cut out of the new data
+        self.x.update(display, s(time=slice(1, 2)))
+        updated = patternCells(display)
+        self.assertNotEqual(updated, before)
+        self.x.clear()
+        self.assertEqual(updated, patternCells(self.x.plot(s(time=slice(1, 2)), gm, bg=self.bg)))
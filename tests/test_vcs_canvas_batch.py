@@ -0,0 +1,44 @@
+import basevcstest
+import numpy
+
+
+class TestVCSCanvasBatch(basevcstest.VCSBaseTest):
+    def countRenders(self):
+        self.renders = 0
+
+        def count(obj, ev):
+            self.renders += 1
+        self.x.backend.renWin.AddObserver("StartEvent", count)
+
+    def plots(self):
+        s = self.clt("clt", time=slice(0, 1))
+        iso = self.x.createisoline()
+        iso.label = "y"
+        return [(s, "top_of2", {"bg": self.bg}),
+                (s, "bot_of2", iso, {"bg": self.bg})]
+
+    def testBatchRendersOnce(self):
+        plots = self.plots()
+        for args in plots:
+            self.x.plot(*args[:-1], **args[-1])
+        direct = self.x.to_buffer().copy()
+        self.x.clear()
+
+        self.countRenders()
+        with self.x.batch():
+            for args in plots:
+                self.x.plot(*args[:-1], **args[-1])
+            self.assertEqual(self.renders, 0)
+        self.assertEqual(self.renders, 1)
+        self.assertTrue(numpy.array_equal(self.x.to_buffer(), direct))
+
+    def testExportInBatch(self):
+        self.x.plot(self.clt("clt", time=slice(0, 1)), bg=self.bg)
+        self.x.clear()
+        self.countRenders()
+        with self.x.batch():
+            self.x.plot_many(self.plots())
+            self.x.to_buffer()
+            self.assertEqual(self.renders, 1)
+        # already rendered by the export
+        self.assertEqual(self.renders, 1)
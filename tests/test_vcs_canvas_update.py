@@ -0,0 +1,137 @@
+import basevcstest
+import cdms2
+import MV2
+import numpy
+import os
+import vcs
+import vtk
+from vtk.util import numpy_support as VN
+
+
+class TestVCSCanvasUpdate(basevcstest.VCSBaseTest):
+    def pixels(self):
+        fnm = os.path.join(self.pngsdir, "canvas_update.png")
+        self.x.png(fnm)
+        reader = vtk.vtkPNGReader()
+        reader.SetFileName(fnm)
+        reader.Update()
+        os.remove(fnm)
+        return VN.vtk_to_numpy(reader.GetOutput().GetPointData().GetScalars()).copy()
+
+    def checkUpdate(self, gm, data, data2=None):
+        """update from the first to the second time step and compare with
+        plotting the second time step directly"""
+        args = [data(time=slice(0, 1))]
+        if data2 is not None:
+            args.append(data2(time=slice(0, 1)))
+        display = self.x.plot(*(args + [gm]), bg=self.bg)
+        new = [data(time=slice(1, 2))]
+        if data2 is not None:
+            new.append(data2(time=slice(1, 2)))
+        self.x.update(display, *new)
+        updated = self.pixels()
+        self.x.clear()
+        self.x.plot(*(new + [gm]), bg=self.bg)
+        direct = self.pixels()
+        self.x.clear()
+        self.assertTrue(numpy.array_equal(updated, direct), "%s update differs from plot" % gm.g_name)
+
+    def testUpdateMatchesPlot(self):
+        s = self.clt("clt", slice(0, 2))
+        for create in [self.x.createboxfill, self.x.createisofill, self.x.createisoline]:
+            # fixed levels are updated in place, automatic ones replot
+            for levels in [list(range(0, 101, 10)), None]:
+                gm = create()
+                if levels is not None:
+                    gm.levels = levels
+                    if gm.g_name == "Gfb":
+                        gm.boxfill_type = "custom"
+                self.checkUpdate(gm, s)
+        gm = self.x.createboxfill()
+        gm.boxfill_type = "log10"
+        gm.level_1 = 0.
+        gm.level_2 = 2.
+        self.checkUpdate(gm, s)
+        u = self.clt("u", slice(0, 2))
+        v = self.clt("v", slice(0, 2))
+        self.checkUpdate(self.x.createvector(), u, v)
+        gm = self.x.createvector()
+        gm.scaletype = "constant"
+        gm.reference = 10.
+        self.checkUpdate(gm, u, v)
+        self.checkUpdate(self.x.createstreamline(), u, v)
+
+    def curvilinear(self):
+        """two time steps of the curvilinear sample"""
+        f = cdms2.open(os.path.join(vcs.sample_data, "sampleCurveGrid4.nc"))
+        s = f("sample")
+        f.close()
+        s2 = MV2.resize(s, (2,) + s.shape)
+        t = cdms2.createAxis([0, 1])
+        t.units = "months since 2015"
+        t.id = "time"
+        t.designateTime()
+        s2.setAxis(0, t)
+        s2.setAxis(1, s.getAxis(0))
+        s2.setAxis(2, s.getAxis(1))
+        s2.setGrid(s.getGrid())
+        s2[1] = s2[1] * 1.1
+        return s2
+
+    def testMeshfillUpdateMatchesPlot(self):
+        s = self.clt("clt", slice(0, 2))
+        curvilinear = self.curvilinear()
+        for data in [s, curvilinear]:
+            for levels in [list(range(0, 101, 10)), None]:
+                gm = self.x.createmeshfill()
+                if levels is not None:
+                    gm.levels = levels
+                self.checkUpdate(gm, data)
+        gm = self.x.createmeshfill()
+        gm.mesh = True
+        self.checkUpdate(gm, curvilinear)
+
+    def testInPlace(self):
+        s = self.clt("clt", slice(0, 2))
+        gm = self.x.createisofill()
+        gm.levels = list(range(0, 101, 10))
+        display = self.x.plot(s(time=slice(0, 1)), gm, bg=self.bg)
+        self.assertTrue(self.x.backend.update_input(display.backend, s(time=slice(1, 2)), update=False))
+        # automatic levels that change need a replot
+        gm = self.x.createisofill()
+        display = self.x.plot(s(time=slice(0, 1)), gm, bg=self.bg)
+        self.assertFalse(self.x.backend.update_input(display.backend, s(time=slice(1, 2)) * 10., update=False))
+        # vectors are updated in place unless their legend changes
+        u = self.clt("u", slice(0, 2))
+        v = self.clt("v", slice(0, 2))
+        gm = self.x.createvector()
+        gm.scaletype = "constant"
+        gm.reference = 10.
+        vectors = self.x.plot(u(time=slice(0, 1)), v(time=slice(0, 1)), gm, bg=self.bg)
+        self.assertTrue(self.x.backend.update_input(vectors.backend, u(time=slice(1, 2)),
+                                                    v(time=slice(1, 2)), update=False))
+        vectors = self.x.plot(u(time=slice(0, 1)), v(time=slice(0, 1)), bg=self.bg)
+        self.assertFalse(self.x.backend.update_input(vectors.backend, u(time=slice(1, 2)) * 2.,
+                                                     v(time=slice(1, 2)) * 2., update=False))
+        gm = self.x.createstreamline()
+        gm.coloredbyvector = False
+        streamlines = self.x.plot(u(time=slice(0, 1)), v(time=slice(0, 1)), gm, bg=self.bg)
+        self.assertTrue(self.x.backend.update_input(streamlines.backend, u(time=slice(1, 2)),
+                                                    v(time=slice(1, 2)), update=False))
+        # the display keeps the new data
+        self.x.update(display.name, s(time=slice(1, 2)))
+        self.assertEqual(display.array[0].shape, (1,) + s.shape[1:])
+
+    def testUpdateSequence(self):
+        s = self.clt("clt")
+        gm = self.x.createboxfill()
+        gm.boxfill_type = "custom"
+        gm.levels = list(range(0, 101, 10))
+        display = self.x.plot(s(time=slice(0, 1)), gm, bg=self.bg)
+        n = min(len(s), 20)
+        for i in range(n):
+            self.x.update(display, s(time=slice(i, i + 1)))
+        self.assertTrue(numpy.ma.allequal(display.array[0], s(time=slice(n - 1, n))))
+        self.x.clear()
+        self.x.plot(s(time=slice(n - 1, n)), gm, bg=self.bg)
+        self.assertEqual(len(vcs.elements["display"][self.x.display_names[0]].array[0]), 1)
@@ -0,0 +1,56 @@
+import unittest
+import json
+import numpy
+import vcs
+
+
+class TestVCSColormapArray(unittest.TestCase):
+    def testArrayBacked(self):
+        cmap = vcs.createcolormap(Cp_name_src="rainbow")
+        self.assertEqual(cmap.index.array.shape, (256, 4))
+        self.assertEqual(cmap.index[16], cmap.index.array[16].tolist())
+        self.assertEqual(len(cmap.index), 256)
+        self.assertEqual(list(cmap.index.keys()), list(range(256)))
+        version = cmap.index.version
+        cmap.index[16] = [10, 20, 30]
+        self.assertEqual(cmap.index[16], [10, 20, 30, 100])
+        self.assertTrue(all(isinstance(v, int) for v in cmap.index[16]))
+        cmap.index[16] = [10.5, 20, 30]
+        self.assertEqual(cmap.index[16], [10.5, 20, 30, 100])
+        self.assertNotEqual(cmap.index.version, version)
+        with self.assertRaises(ValueError):
+            cmap.index[256] = [10, 20, 30]
+        with self.assertRaises(ValueError):
+            cmap.index[16] = [10, 20, 300]
+        with self.assertRaises(ValueError):
+            vcs.getcolormap().index[16] = [10, 20, 30]
+        # the data dictionary writes back to the array
+        cmap.index.data.update({17: [1, 2, 3]})
+        self.assertEqual(cmap.index[17], [1, 2, 3, 100])
+        # json round trip
+        dumped = json.loads(vcs.utils.dumpToJson(cmap, None))
+        self.assertEqual(dumped["index"]["data"]["17"], [1, 2, 3, 100])
+        cmap2 = vcs.createcolormap()
+        cmap2.index = dumped["index"]
+        self.assertTrue(numpy.allclose(cmap2.index.array, cmap.index.array))
+
+    def testRGBAColors(self):
+        cmap = vcs.createcolormap(Cp_name_src="rainbow")
+        colors = [16, "red", [100, 0, 0], [0, 0, 100, 50]]
+        rgba = vcs.utils.rgba_colors(colors, cmap)
+        self.assertEqual(rgba.shape, (4, 4))
+        for color, value in zip(colors, rgba):
+            self.assertTrue(numpy.allclose(vcs.utils.rgba_color(color, cmap), value))
+        self.assertIs(vcs.utils.rgba_colors(colors, cmap), rgba)
+        # modifying the colormap invalidates the cache
+        cmap.index[16] = [1, 2, 3]
+        self.assertEqual(vcs.utils.rgba_colors(colors, cmap)[0].tolist(), [1., 2., 3., 100.])
+        self.assertEqual(vcs.utils.rgba_colors(range(256), cmap).tolist(),
+                         cmap.index.array.tolist())
+
+    def testMatchColor(self):
+        cmap = vcs.getcolormap("rainbow")
+        for i in [0, 16, 128, 255]:
+            self.assertEqual(vcs.utils.match_color(cmap.index[i], "rainbow"), i)
+        self.assertEqual(vcs.utils.match_color("red", cmap),
+                         vcs.utils.match_color("red", "rainbow"))
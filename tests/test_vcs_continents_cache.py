@@ -0,0 +1,80 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy
+import vcs
+from vcs import vcs2vtk
+
+
+def loopReadContinents(fnm):
+    # Reference: the line by line parser prepContinents used to use
+    lines = []
+    f = open(fnm)
+    ln = f.readline()
+    while ln.strip().split() != ["-99", "-99"]:
+        N = int(ln.split()[0])
+        pts = []
+        while len(pts) * 2 < N:
+            ln = f.readline()
+            sp = ln.split()
+            try:
+                if len(sp) % 2 != 0:
+                    raise ValueError
+                pts += [[float(sp[i * 2 + 1]), float(sp[i * 2])] for i in range(len(sp) // 2)]
+            except ValueError:
+                while len(ln) > 2:
+                    pts.append([float(ln[8:16]), float(ln[:8])])
+                    ln = ln[16:]
+        lines.append(pts[:N // 2])
+        ln = f.readline()
+    f.close()
+    return lines
+
+
+class TestVCSContinentsCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fnm = os.path.join(self.tmpdir, "data_continent_political")
+        shutil.copy(os.path.join(vcs.vcs_egg_path, "data_continent_political"), self.fnm)
+        vcs2vtk.vcsProjectedContinents.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testParser(self):
+        lonlat, starts, sizes = vcs2vtk.readContinents(self.fnm)
+        good = loopReadContinents(self.fnm)
+        self.assertEqual(len(starts), len(good))
+        for start, size, pts in zip(starts, sizes, good):
+            self.assertTrue(numpy.allclose(lonlat[start:start + size], pts))
+
+    def testParsedCache(self):
+        first = vcs2vtk.readContinents(self.fnm)
+        self.assertIs(vcs2vtk.readContinents(self.fnm), first)
+        # Touching the file invalidates the cache
+        mtime = os.path.getmtime(self.fnm) + 10
+        os.utime(self.fnm, (mtime, mtime))
+        self.assertIsNot(vcs2vtk.readContinents(self.fnm), first)
+
+    def testProjectedCache(self):
+        wc = [-180., 180., -90., 90.]
+        first = vcs2vtk.prepProjectedContinents(self.fnm, wc, "robinson")
+        second = vcs2vtk.prepProjectedContinents(self.fnm, wc, "robinson")
+        self.assertEqual(len(vcs2vtk.vcsProjectedContinents), 1)
+        # Each caller gets its own copy sharing the cached points
+        self.assertIsNot(first, second)
+        self.assertIs(first.GetPoints(), second.GetPoints())
+        first.GetFieldData().AddArray(vcs2vtk.numpy_to_vtk_wrapper(numpy.zeros(1), deep=True))
+        self.assertEqual(second.GetFieldData().GetNumberOfArrays(), 0)
+        vcs2vtk.prepProjectedContinents(self.fnm, wc, "linear")
+        vcs2vtk.prepProjectedContinents(self.fnm, wc, "robinson", yaxisconvert="area_wt")
+        self.assertEqual(len(vcs2vtk.vcsProjectedContinents), 3)
+
+    def testProjectedCacheSize(self):
+        for i in range(vcs2vtk.vcsProjectedContinentsSize + 5):
+            vcs2vtk.prepProjectedContinents(self.fnm, [-180. + i, 180. + i, -90., 90.], "linear")
+        self.assertEqual(len(vcs2vtk.vcsProjectedContinents), vcs2vtk.vcsProjectedContinentsSize)
+        # Oldest entries went first
+        keys = list(vcs2vtk.vcsProjectedContinents.keys())
+        self.assertEqual(keys[0][2][0], -175.)
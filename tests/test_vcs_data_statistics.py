@@ -0,0 +1,52 @@
+import basevcstest
+import numpy
+import vcs
+from vcs import dataStatistics
+
+
+class TestVCSDataStatistics(basevcstest.VCSBaseTest):
+    def testSinglePass(self):
+        s = self.clt("clt")
+        s[0, 0, 0] = numpy.ma.masked
+        stats = dataStatistics.statistics(s)
+        self.assertIs(dataStatistics.statistics(s), stats)
+        self.assertEqual(stats.minmax(), vcs.minmax(s))
+        self.assertEqual(stats.count, s.count())
+        self.assertAlmostEqual(stats.sum / stats.count, float(s.mean()), 4)
+        # chunked over the first axis
+        dataStatistics.CHUNK_SIZE, chunk = 1000, dataStatistics.CHUNK_SIZE
+        try:
+            self.assertEqual(dataStatistics.Statistics(s).minmax(), vcs.minmax(s))
+        finally:
+            dataStatistics.CHUNK_SIZE = chunk
+        self.assertEqual(dataStatistics.minmax([s, None]), vcs.minmax(s))
+        # all masked
+        m = numpy.ma.masked_all((3, 4))
+        self.assertEqual(dataStatistics.minmax(m), (1.E20, 1.E20))
+        self.assertIs(dataStatistics.statistics(m).min, numpy.ma.masked)
+
+    def testInvalidate(self):
+        s = self.clt("clt", time=slice(0, 1), squeeze=1)
+        mean = dataStatistics.statistics(s).mean()
+        template = self.x.gettemplate()
+        string = template.dataAttributeString("mean", s)
+        s[:] = s + 1000.
+        self.assertEqual(template.dataAttributeString("mean", s), string)
+        dataStatistics.invalidate(s)
+        self.assertNotEqual(template.dataAttributeString("mean", s), string)
+        self.assertEqual(dataStatistics.minmax(s), vcs.minmax(s))
+        self.assertAlmostEqual(dataStatistics.statistics(s).mean(), mean + 1000., 3)
+        # plotting forgets the statistics of the data
+        stats = dataStatistics.statistics(s)
+        self.x.plot(s, bg=self.bg)
+        self.assertIsNot(dataStatistics.statistics(s), stats)
+
+    def testUpdateRefilledBuffer(self):
+        s = self.clt("clt", time=slice(0, 1), squeeze=1)
+        d = self.x.plot(s, bg=self.bg)
+        before = d.backend["vtk_backend_Max_text_actor"].GetInput()
+        # same buffer, new values
+        s[:] = s + 1000.
+        self.x.update(d, s)
+        self.assertNotEqual(d.backend["vtk_backend_Max_text_actor"].GetInput(), before)
+        self.assertEqual(dataStatistics.minmax(s), vcs.minmax(s))
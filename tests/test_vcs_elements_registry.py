@@ -0,0 +1,50 @@
+import basevcstest
+import vcs
+from vcs import elementsRegistry
+
+
+class TestVCSElementsRegistry(basevcstest.VCSBaseTest):
+    def testReplotIsBounded(self):
+        s = self.clt("clt", time=slice(0, 1))
+        d = self.x.plot(s, bg=self.bg)
+        self.assertGreater(len(sum(d.newelements.values(), [])), 0)
+        size = elementsRegistry.info()["size"]
+        reclaimed = elementsRegistry.info()["reclaimed"]
+        for i in range(5):
+            self.x.plot(s, display_name=d.name, bg=self.bg)
+            self.assertEqual(elementsRegistry.info()["size"], size)
+        self.assertGreater(elementsRegistry.info()["reclaimed"], reclaimed)
+        self.assertEqual(elementsRegistry.info()["pending"], 0)
+        # the display can still be replotted
+        self.x.backend._lastSize = None
+        self.x.update()
+        self.assertEqual(elementsRegistry.info()["size"], size)
+
+    def testClearReclaims(self):
+        size = elementsRegistry.info()["size"]
+        s = self.clt("clt", time=slice(0, 1))
+        for i in range(3):
+            self.x.plot(s, bg=self.bg)
+        self.x.clear()
+        self.assertEqual(elementsRegistry.info()["size"], size)
+
+    def testRemoveDisplayName(self):
+        s = self.clt("clt", time=slice(0, 1))
+        d = self.x.plot(s, bg=self.bg)
+        self.x.remove_display_name(d.name)
+        self.assertNotIn(d.name, self.x.display_names)
+        # the display and what it uses are still there
+        self.assertIs(vcs.elements["display"][d.name], d)
+        self.assertIn(d.template, vcs.elements["template"])
+        self.assertIn(d.g_name, vcs.elements[d.g_type])
+
+    def testTracking(self):
+        mark = elementsRegistry.track()
+        vcs.createline()
+        tt = vcs.createtexttable()
+        del vcs.elements["texttable"][tt.name]
+        new = elementsRegistry.untrack(mark)
+        self.assertEqual(list(new.keys()), ["line"])
+        self.assertEqual(elementsRegistry.info()["pending"], 0)
+        elementsRegistry.reclaim(new)
+        self.assertNotIn(new["line"][0], vcs.elements["line"])
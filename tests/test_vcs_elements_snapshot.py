@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+
+# Imports vcs, then prints whether the snapshot was used and the registry content
+child = """
+import vcs
+import json
+elements = {}
+for typ in vcs.elements:
+    elements[typ] = sorted(str(nm) for nm in vcs.listelements(typ))
+protected = dict((typ, sorted(str(nm) for nm in names)) for typ, names in vcs._protected_elements.items())
+print(json.dumps({"restored": vcs._snapshotRestored, "elements": elements, "protected": protected,
+                  "brown": vcs.getline("brown").color, "default": vcs.gettemplate("default").data.x1,
+                  "boxfill": vcs.getboxfill("default").boxfill_type,
+                  "shared": vcs.elements["yxvsx"]["default"] is vcs.elements["1d"]["default_yxvsx_"],
+                  "taylor": vcs.elements["taylordiagram"]["default"] is vcs.t}))
+"""
+
+
+class TestVCSElementsSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.home)
+
+    def importVCS(self):
+        env = dict(os.environ)
+        env["HOME"] = self.home
+        env.pop("UVCDAT_DIR", None)
+        P = subprocess.Popen([sys.executable, "-c", child], env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = P.communicate()
+        self.assertEqual(P.returncode, 0, err)
+        return json.loads(out.decode("utf-8").strip().split("\n")[-1])
+
+    def testSnapshot(self):
+        replayed = self.importVCS()
+        snapshot = os.path.join(self.home, ".uvcdat", "elements.snapshot")
+        self.assertTrue(os.path.exists(snapshot))
+        with open(snapshot, "rb") as f:
+            key = f.readline()
+        restored = self.importVCS()
+        self.assertFalse(replayed["restored"])
+        self.assertTrue(restored["restored"])
+        for k in ["elements", "protected", "brown", "default", "shared", "taylor"]:
+            self.assertEqual(replayed[k], restored[k])
+        self.assertTrue(restored["shared"])
+        # elements created in code are kept
+        self.assertTrue(restored["taylor"])
+        # a snapshot with another key is not loaded
+        with open(snapshot, "rb") as f:
+            content = f.read()
+        with open(snapshot, "wb") as f:
+            f.write(b"0" * (len(key) - 1) + content[len(key) - 1:])
+        self.assertFalse(self.importVCS()["restored"])
+
+    def testUserAttributesChange(self):
+        self.importVCS()
+        with open(os.path.join(self.home, ".uvcdat", "initial.attributes"), "w") as f:
+            json.dump({"Tl": {"snapshot_test": {"color": [[10., 20., 30., 100.]], "width": [3],
+                                                "type": ["dash"]}},
+                       "Gfb": {"default": {"boxfill_type": "custom"}}}, f)
+        restored = self.importVCS()
+        self.assertIn("snapshot_test", restored["elements"]["line"])
+        self.assertNotIn("snapshot_test", restored["protected"]["line"])
+        # protected elements are still not overwritten
+        self.assertEqual(restored["boxfill"], "linear")
+        # the snapshot of the new attributes is used on the next import
+        self.assertFalse(restored["restored"])
+        again = self.importVCS()
+        self.assertTrue(again["restored"])
+        self.assertEqual(again["elements"], restored["elements"])
@@ -0,0 +1,29 @@
+import basevcstest
+import numpy
+from vcs import vcs2vtk
+
+
+class TestVCSFillareaManyPolygons(basevcstest.VCSBaseTest):
+    def testPolygonsPolyData(self):
+        xyz = numpy.arange(30.).reshape((10, 3))
+        lengths = numpy.array([3, 4, 3])
+        pd = vcs2vtk.genPolygonsPolyData(xyz, lengths, numpy.array([True, False, True]))
+        self.assertEqual(pd.GetNumberOfCells(), 2)
+        self.assertEqual(pd.GetNumberOfPoints(), 6)
+        self.assertEqual(pd.GetPoint(3), tuple(xyz[7]))
+        self.assertEqual(pd.GetCell(1).GetNumberOfPoints(), 3)
+
+    def testManyPolygons(self):
+        # a 250x200 station choropleth, some hatched and patterned
+        nx, ny = 250, 200
+        x0, y0 = numpy.meshgrid(numpy.arange(nx) / float(nx), numpy.arange(ny) / float(ny))
+        x0, y0 = x0.ravel(), y0.ravel()
+        dx, dy = 1. / nx, 1. / ny
+        fa = self.x.createfillarea()
+        fa.x = numpy.column_stack((x0, x0 + dx, x0 + dx, x0)).tolist()
+        fa.y = numpy.column_stack((y0, y0, y0 + dy, y0 + dy)).tolist()
+        n = nx * ny
+        fa.color = (numpy.arange(n) % 200 + 16).tolist()
+        fa.style = ["solid", "solid", "solid", "hatch", "pattern"] * (n // 5)
+        fa.index = (numpy.arange(n) % 3 + 1).tolist()
+        self.assertIsNotNone(self.x.plot(fa, bg=self.bg))
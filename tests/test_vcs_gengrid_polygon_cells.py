@@ -0,0 +1,60 @@
+import unittest
+import numpy
+import vtk
+from vcs import vcs2vtk
+
+
+def loopPolygonCells(vertices, numberOfCells, nVertices):
+    # Reference: the cell by cell construction genGrid used to do
+    vg = vtk.vtkUnstructuredGrid()
+    for i in range(numberOfCells):
+        pt_ids = []
+        for j in range(nVertices):
+            indx = i * nVertices + j
+            if not numpy.isnan(vertices[indx][0]):
+                pt_ids.append(indx)
+        vg.InsertNextCell(vtk.VTK_POLYGON, len(pt_ids), pt_ids)
+    return vg
+
+
+def randomMesh(numberOfCells, nVertices, missing=.2):
+    vertices = numpy.random.random((numberOfCells * nVertices, 3))
+    vertices[numpy.random.random(numberOfCells * nVertices) < missing, 0] = numpy.nan
+    return vertices
+
+
+class TestVCSGenGridPolygonCells(unittest.TestCase):
+    def cellPoints(self, grid, i):
+        ids = vtk.vtkIdList()
+        grid.GetCellPoints(i, ids)
+        return [ids.GetId(k) for k in range(ids.GetNumberOfIds())]
+
+    def testSameAsLoop(self):
+        for numberOfCells, nVertices in [(1, 3), (4, 5), (500, 6), (0, 4)]:
+            vertices = randomMesh(numberOfCells, nVertices)
+            good = loopPolygonCells(vertices, numberOfCells, nVertices)
+            vg = vtk.vtkUnstructuredGrid()
+            vg.SetCells(vtk.VTK_POLYGON,
+                        vcs2vtk.genPolygonCells(vertices, numberOfCells, nVertices))
+            self.assertEqual(vg.GetNumberOfCells(), good.GetNumberOfCells())
+            for i in range(numberOfCells):
+                self.assertEqual(vg.GetCellType(i), vtk.VTK_POLYGON)
+                self.assertEqual(self.cellPoints(vg, i), self.cellPoints(good, i))
+
+    def testCellArray(self):
+        cells = vcs2vtk.numpy_to_vtkCellArray([0, 3, 3, 5], [7, 8, 9, 1, 2])
+        self.assertEqual(cells.GetNumberOfCells(), 3)
+        pd = vtk.vtkPolyData()
+        pd.SetPolys(cells)
+        self.assertEqual(self.cellPoints(pd, 0), [7, 8, 9])
+        self.assertEqual(self.cellPoints(pd, 1), [])
+        self.assertEqual(self.cellPoints(pd, 2), [1, 2])
+
+    def testLargeMeshes(self):
+        nVertices = 6
+        for numberOfCells in [10000, 100000, 1000000]:
+            vertices = randomMesh(numberOfCells, nVertices)
+            vg = vtk.vtkUnstructuredGrid()
+            vg.SetCells(vtk.VTK_POLYGON,
+                        vcs2vtk.genPolygonCells(vertices, numberOfCells, nVertices))
+            self.assertEqual(vg.GetNumberOfCells(), numberOfCells)
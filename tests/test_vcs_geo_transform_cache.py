@@ -0,0 +1,46 @@
+import unittest
+import vcs
+import vtk
+from vcs import vcs2vtk
+
+
+class TestVCSGeoTransformCache(unittest.TestCase):
+    def setUp(self):
+        vcs2vtk.vcsGeoTransforms.clear()
+        self.proj = vcs.createprojection()
+        self.proj.type = "robinson"
+
+    def tearDown(self):
+        vcs.removeobject(self.proj)
+
+    def project(self, proj, wc):
+        pts = vtk.vtkPoints()
+        pts.InsertNextPoint(10., 20., 0.)
+        return vcs2vtk.project(pts, proj, wc)
+
+    def testShared(self):
+        wc = [-180., 180., -90., 90.]
+        geo, pts = self.project(self.proj, wc)
+        geo2, pts2 = self.project(self.proj.name, wc)
+        self.assertIs(geo, geo2)
+        self.assertEqual(pts.GetPoint(0), pts2.GetPoint(0))
+        self.assertIs(vcs2vtk.getGeoTransform(self.proj, wc), geo)
+        geo3, _ = self.project(self.proj, [0., 360., -90., 90.])
+        self.assertIsNot(geo3, geo)
+        self.assertEqual(len(vcs2vtk.vcsGeoTransforms), 2)
+
+    def testProjChange(self):
+        wc = [-180., 180., -90., 90.]
+        geo, pts = self.project(self.proj, wc)
+        self.proj.centralmeridian = 90.
+        geo2, pts2 = self.project(self.proj, wc)
+        self.assertIsNot(geo, geo2)
+        self.assertNotEqual(pts.GetPoint(0), pts2.GetPoint(0))
+        self.proj.type = "mollweide"
+        geo3, _ = self.project(self.proj, wc)
+        self.assertIsNot(geo3, geo2)
+
+    def testSize(self):
+        for i in range(vcs2vtk.vcsGeoTransformsSize + 10):
+            self.project(self.proj, [-180. + i, 180. + i, -90., 90.])
+        self.assertEqual(len(vcs2vtk.vcsGeoTransforms), vcs2vtk.vcsGeoTransformsSize)
@@ -0,0 +1,89 @@
+import unittest
+import math
+import sys
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+from vcs import vcs2vtk
+
+
+def loopSetInfToValid(geoPoints, ghost):
+    # Reference: the point by point version setInfToValid used to be
+    validPoint = [0, 0, 0]
+    for i in range(geoPoints.GetNumberOfTuples()):
+        point = geoPoints.GetTuple(i)
+        if (not math.isinf(point[0]) and not math.isinf(point[1])):
+            validPoint = point
+            break
+    anyInfinity = False
+    for i in range(geoPoints.GetNumberOfTuples()):
+        point = geoPoints.GetTuple(i)
+        if (math.isinf(point[0]) or math.isinf(point[1])):
+            anyInfinity = True
+            newPoint = list(point)
+            if (math.isinf(point[0])):
+                newPoint[0] = validPoint[0]
+            if (math.isinf(point[1])):
+                newPoint[1] = validPoint[1]
+            geoPoints.SetTuple(i, newPoint)
+            ghost.SetValue(i, vtk.vtkDataSetAttributes.HIDDENPOINT)
+    return anyInfinity
+
+
+def loopVisibleBounds(pts, ghost):
+    xm = ym = sys.float_info.max
+    xM = yM = - sys.float_info.max
+    for i in range(pts.GetNumberOfPoints()):
+        if (ghost.GetValue(i) & vtk.vtkDataSetAttributes.HIDDENPOINT == 0):
+            p = pts.GetPoint(i)
+            xm = min(xm, p[0])
+            xM = max(xM, p[0])
+            ym = min(ym, p[1])
+            yM = max(yM, p[1])
+    return [xm, xM, ym, yM]
+
+
+def projectedPoints(n, infinity=.3):
+    xyz = numpy.random.random((n, 3)) * 1.e6
+    xyz[numpy.random.random(n) < infinity, 0] = numpy.inf
+    xyz[numpy.random.random(n) < infinity, 1] = - numpy.inf
+    pts = vtk.vtkPoints()
+    pts.SetData(VN.numpy_to_vtk(xyz, deep=True))
+    ghost = vtk.vtkUnsignedCharArray()
+    ghost.SetNumberOfTuples(n)
+    ghost.Fill(0)
+    return pts, ghost
+
+
+class TestVCSInfToValid(unittest.TestCase):
+    def testSameAsLoop(self):
+        for n, infinity in [(1, 0.), (1, 1.), (10, .5), (1000, .3), (1000, 1.), (1000, 0.)]:
+            pts, ghost = projectedPoints(n, infinity)
+            goodPts = vtk.vtkPoints()
+            goodPts.SetData(VN.numpy_to_vtk(VN.vtk_to_numpy(pts.GetData()), deep=True))
+            goodGhost = vtk.vtkUnsignedCharArray()
+            goodGhost.DeepCopy(ghost)
+            self.assertEqual(vcs2vtk.setInfToValid(pts, ghost), loopSetInfToValid(goodPts.GetData(), goodGhost))
+            self.assertTrue(numpy.array_equal(VN.vtk_to_numpy(pts.GetData()),
+                                              VN.vtk_to_numpy(goodPts.GetData())))
+            self.assertTrue(numpy.array_equal(VN.vtk_to_numpy(ghost), VN.vtk_to_numpy(goodGhost)))
+            self.assertEqual(vcs2vtk.getVisibleBounds(pts, ghost), loopVisibleBounds(pts, ghost))
+
+    def testValidPoint(self):
+        vectors = VN.numpy_to_vtk(numpy.array([[numpy.inf, 1., 0.], [2., 3., 0.]]), deep=True)
+        self.assertTrue(vcs2vtk.setInfToValid(vectors, ghost=None, validPoint=[0, 0, 0]))
+        self.assertEqual(vectors.GetTuple(0), (0., 1., 0.))
+        self.assertEqual(vectors.GetTuple(1), (2., 3., 0.))
+
+    def testManyPoints(self):
+        n = 1000000
+        pts, ghost = projectedPoints(n)
+        infinite = numpy.isinf(VN.vtk_to_numpy(pts.GetData())[:, :2]).any(axis=1)
+        self.assertTrue(vcs2vtk.setInfToValid(pts, ghost))
+        xyz = VN.vtk_to_numpy(pts.GetData())
+        self.assertTrue(numpy.isfinite(xyz).all())
+        hidden = VN.vtk_to_numpy(ghost) & vtk.vtkDataSetAttributes.HIDDENPOINT != 0
+        self.assertTrue(numpy.array_equal(hidden, infinite))
+        visible = xyz[~hidden]
+        self.assertEqual(vcs2vtk.getVisibleBounds(pts, ghost),
+                         [visible[:, 0].min(), visible[:, 0].max(), visible[:, 1].min(), visible[:, 1].max()])
@@ -0,0 +1,97 @@
+import basevcstest
+import numpy
+import vtk
+import vcs
+from vtk.util import numpy_support as VN
+from vcs import vcs2vtk
+
+
+def imagePolyData(nx, ny):
+    # Surface of a nx by ny points image with a smooth point scalar field
+    image = vtk.vtkImageData()
+    image.SetDimensions(nx, ny, 1)
+    x, y = numpy.meshgrid(numpy.linspace(0, 4 * numpy.pi, nx), numpy.linspace(0, 2 * numpy.pi, ny))
+    scalars = VN.numpy_to_vtk(numpy.ascontiguousarray((numpy.sin(x) * numpy.cos(y)).ravel() * 50. + 50.),
+                              deep=True)
+    scalars.SetName("scalar")
+    image.GetPointData().SetScalars(scalars)
+    surface = vtk.vtkDataSetSurfaceFilter()
+    surface.SetInputData(image)
+    surface.Update()
+    return surface.GetOutput()
+
+
+def contourBands(poly, values, scalarModeToValue=False):
+    cot = vtk.vtkBandedPolyDataContourFilter()
+    cot.ClippingOn()
+    cot.SetInputData(poly)
+    cot.SetNumberOfContours(len(values))
+    cot.SetClipTolerance(0.)
+    if scalarModeToValue:
+        cot.SetScalarModeToValue()
+    for j, v in enumerate(values):
+        cot.SetValue(j, v)
+    cot.Update()
+    return cot.GetOutput()
+
+
+def area(poly):
+    triangles = vtk.vtkTriangleFilter()
+    triangles.SetInputData(poly)
+    properties = vtk.vtkMassProperties()
+    properties.SetInputConnection(triangles.GetOutputPort())
+    properties.Update()
+    return properties.GetSurfaceArea()
+
+
+def patternCells(display):
+    return [item.GetPolyData().GetNumberOfCells() if item.GetVisible() else 0
+            for item in display.backend["vtk_backend_pattern_items"]]
+
+
+class TestVCSIsofillSingleContour(basevcstest.VCSBaseTest):
+    def testBandsMatchPerLevelContours(self):
+        poly = imagePolyData(200, 100)
+        levels = [[-1.e20, 10], [10, 25], [25, 30], [40, 60], [60, 1.e20]]
+        bands = numpy.unique(levels).tolist()
+        classified = vcs2vtk.classifyCells(contourBands(poly, bands, True), levels, bands=bands)
+        levelIndex = VN.vtk_to_numpy(classified.GetCellData().GetScalars())
+        for k, level in enumerate(levels):
+            # Reference: contouring each level on its own
+            reference = area(contourBands(poly, level))
+            self.assertAlmostEqual(area(vcs2vtk.extractCells(classified, levelIndex == k)),
+                                   reference, delta=reference * 1.e-6 + 1.e-9)
+        # the [30, 40] gap is not drawn
+        self.assertLess(area(classified), area(poly))
+
+    def testUpdatePatterns(self):
+        s = self.clt("clt", slice(0, 2))
+        iso = self.x.createisofill()
+        iso.levels = [0, 20, 40, 60, 80, 100]
+        iso.fillareastyle = "pattern"
+        iso.fillareaindices = [1, 2, 3, 4, 5]
+        display = self.x.plot(s(time=slice(0, 1)), iso, bg=self.bg)
+        before = patternCells(display)
+        self.assertEqual(len(before), 5)
+        # the patterns are cut out of the new bands
+        self.x.update(display, s(time=slice(1, 2)))
+        updated = patternCells(display)
+        self.assertNotEqual(updated, before)
+        self.x.clear()
+        self.assertEqual(updated, patternCells(self.x.plot(s(time=slice(1, 2)), iso, bg=self.bg)))
+
+    def testManyLevels(self):
+        nx, ny = 1440, 720
+        data = numpy.sin(numpy.linspace(0, 8 * numpy.pi, nx))[numpy.newaxis, :] * \
+            numpy.cos(numpy.linspace(0, 4 * numpy.pi, ny))[:, numpy.newaxis]
+        for numberOfLevels in [5, 20, 80]:
+            iso = self.x.createisofill()
+            iso.levels = numpy.linspace(-1, 1, numberOfLevels + 1).tolist()
+            iso.fillareacolors = vcs.getcolors(iso.levels)
+            # one opacity per level used to force one contour pass per level
+            iso.fillareaopacity = numpy.linspace(50, 100, numberOfLevels).tolist()
+            display = self.x.plot(data, iso, bg=self.bg)
+            # the contouring is done once whatever the number of levels
+            self.assertEqual(len(display.backend["vtk_backend_contours"]), 1)
+            self.x.clear()
+            vcs.removeobject(iso)
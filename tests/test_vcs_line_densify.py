@@ -0,0 +1,46 @@
+import unittest
+import numpy
+from vcs import vcs2vtk
+
+
+def loopDensifyLine(x, y, NPointsInterp):
+    # Reference: the point by point interpolation prepLine used to do
+    pts = [[x[0], y[0], 0.]]
+    for j in range(1, len(x)):
+        for i in range(1, NPointsInterp + 1):
+            if x[j] != x[j - 1]:
+                tmpx = x[j - 1] + float(i) / NPointsInterp * (x[j] - x[j - 1])
+            else:
+                tmpx = x[j]
+            if y[j] != y[j - 1]:
+                tmpy = y[j - 1] + float(i) / NPointsInterp * (y[j] - y[j - 1])
+            else:
+                tmpy = y[j]
+            pts.append([tmpx, tmpy, 0.])
+    return numpy.array(pts)
+
+
+class TestVCSLineDensify(unittest.TestCase):
+    def testSameAsLoop(self):
+        for n, NPointsInterp in [(2, 25), (10, 50), (7, 1), (1, 25)]:
+            x = list(numpy.random.random(n) * 360.)
+            y = list(numpy.random.random(n) * 180. - 90.)
+            if n > 2:
+                y[2] = y[1]
+            xyz = vcs2vtk.densifyLine(x, y, NPointsInterp)
+            self.assertEqual(xyz.shape, ((n - 1) * NPointsInterp + 1, 3))
+            self.assertTrue(numpy.allclose(xyz, loopDensifyLine(x, y, NPointsInterp)))
+
+    def testExtend(self):
+        xyz = vcs2vtk.densifyLine([0., 10., 20.], [5.], 1)
+        self.assertTrue(numpy.array_equal(xyz[:, 0], [0., 10., 20.]))
+        self.assertTrue(numpy.array_equal(xyz[:, 1], [5., 5., 5.]))
+
+    def testLongTrack(self):
+        # a long track interpolated for a round projection
+        x = numpy.random.random(100000) * 360.
+        y = numpy.random.random(100000) * 180. - 90.
+        xyz = vcs2vtk.densifyLine(x, y, 50)
+        self.assertEqual(xyz.shape, ((len(x) - 1) * 50 + 1, 3))
+        self.assertTrue(numpy.allclose(xyz[::50, 0], x))
+        self.assertTrue(numpy.allclose(xyz[::50, 1], y))
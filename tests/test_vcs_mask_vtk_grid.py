@@ -0,0 +1,147 @@
+import unittest
+import sys
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+from vcs import vcs2vtk
+
+
+def loopRemoveHiddenPointsOrCells(grid, celldata=False):
+    # Reference: the entity by entity version removeHiddenPointsOrCells used to be
+    grid.BuildLinks()
+    ghost = grid.GetCellGhostArray() if celldata else grid.GetPointGhostArray()
+    hidden = vtk.vtkDataSetAttributes.HIDDENCELL if celldata else vtk.vtkDataSetAttributes.HIDDENPOINT
+    scalars = grid.GetPointData().GetScalars()
+    vectors = grid.GetPointData().GetVectors()
+    minScalar = sys.float_info.max
+    minVector = [0, 0, 0]
+    minVectorNorm = sys.float_info.max
+    for i in range(grid.GetNumberOfPoints()):
+        if not celldata and not (ghost.GetValue(i) & hidden):
+            if scalars.GetValue(i) < minScalar:
+                minScalar = scalars.GetValue(i)
+            vector = vectors.GetTuple(i)
+            if numpy.linalg.norm(vector) < minVectorNorm:
+                minVector = vector
+                minVectorNorm = numpy.linalg.norm(vector)
+    num = grid.GetNumberOfCells() if celldata else grid.GetNumberOfPoints()
+    for i in range(num):
+        if (ghost.GetValue(i) & hidden):
+            if not celldata:
+                cells = vtk.vtkIdList()
+                grid.GetPointCells(i, cells)
+                for j in range(cells.GetNumberOfIds()):
+                    grid.DeleteCell(cells.GetId(j))
+                scalars.SetValue(i, minScalar)
+                vectors.SetTuple(i, minVector)
+            else:
+                grid.DeleteCell(i)
+    attributes = grid.GetCellData()
+    attributes.SetActiveAttribute(-1, attributes.GLOBALIDS)
+    grid.RemoveDeletedCells()
+
+
+def maskedPolyData(nx, ny, hidden=.2, celldata=True):
+    sg = vtk.vtkStructuredGrid()
+    sg.SetDimensions(nx, ny, 1)
+    xyz = numpy.zeros((nx * ny, 3))
+    xyz[:, 0] = numpy.tile(numpy.arange(nx), ny)
+    xyz[:, 1] = numpy.repeat(numpy.arange(ny), nx)
+    pts = vtk.vtkPoints()
+    pts.SetData(VN.numpy_to_vtk(xyz, deep=True))
+    sg.SetPoints(pts)
+    geometry = vtk.vtkDataSetSurfaceFilter()
+    geometry.SetInputData(sg)
+    geometry.Update()
+    pd = geometry.GetOutput()
+    # a vertex and a line ahead of the quads
+    pd.SetVerts(vcs2vtk.numpy_to_vtkCellArray([0, 1], [0]))
+    pd.SetLines(vcs2vtk.numpy_to_vtkCellArray([0, 2], [0, nx * ny - 1]))
+    nCells = pd.GetNumberOfCells()
+    globalIds = VN.numpy_to_vtk(numpy.arange(nCells), deep=True)
+    globalIds.SetName("GlobalIds")
+    pd.GetCellData().SetGlobalIds(globalIds)
+    scalars = VN.numpy_to_vtk(numpy.random.random(nx * ny), deep=True)
+    scalars.SetName("scalar")
+    pd.GetPointData().SetScalars(scalars)
+    vectors = VN.numpy_to_vtk(numpy.random.random((nx * ny, 3)), deep=True)
+    vectors.SetName("vector")
+    pd.GetPointData().SetVectors(vectors)
+    n = nCells if celldata else nx * ny
+    ghostValue = vtk.vtkDataSetAttributes.HIDDENCELL if celldata else vtk.vtkDataSetAttributes.HIDDENPOINT
+    ghost = VN.numpy_to_vtk((numpy.random.random(n) < hidden).astype(numpy.uint8) * int(ghostValue),
+                            deep=True)
+    ghost.SetName(vtk.vtkDataSetAttributes.GhostArrayName())
+    if celldata:
+        pd.GetCellData().AddArray(ghost)
+    else:
+        pd.GetPointData().AddArray(ghost)
+    return pd
+
+
+class TestVCSMaskVTKGrid(unittest.TestCase):
+    def assertSameGrid(self, pd, good):
+        self.assertEqual(pd.GetNumberOfCells(), good.GetNumberOfCells())
+        for i in range(good.GetNumberOfCells()):
+            self.assertEqual(pd.GetCellType(i), good.GetCellType(i))
+            ids, goodIds = vtk.vtkIdList(), vtk.vtkIdList()
+            pd.GetCellPoints(i, ids)
+            good.GetCellPoints(i, goodIds)
+            self.assertEqual([ids.GetId(k) for k in range(ids.GetNumberOfIds())],
+                             [goodIds.GetId(k) for k in range(goodIds.GetNumberOfIds())])
+        for attributes, goodAttributes in [(pd.GetCellData(), good.GetCellData()),
+                                           (pd.GetPointData(), good.GetPointData())]:
+            for name in ["GlobalIds", "scalar", "vector", vtk.vtkDataSetAttributes.GhostArrayName()]:
+                if goodAttributes.GetArray(name) is not None:
+                    self.assertTrue(numpy.allclose(VN.vtk_to_numpy(attributes.GetArray(name)),
+                                                   VN.vtk_to_numpy(goodAttributes.GetArray(name))))
+        self.assertEqual(pd.GetCellData().GetGlobalIds().GetName(), "GlobalIds")
+
+    def testRemoveHiddenCells(self):
+        for hidden in [0., .2, 1.]:
+            pd = maskedPolyData(20, 10, hidden, celldata=True)
+            good = vtk.vtkPolyData()
+            good.DeepCopy(pd)
+            vcs2vtk.removeHiddenPointsOrCells(pd, celldata=True)
+            loopRemoveHiddenPointsOrCells(good, celldata=True)
+            self.assertSameGrid(pd, good)
+
+    def testRemoveHiddenPoints(self):
+        for hidden in [0., .2, 1.]:
+            pd = maskedPolyData(20, 10, hidden, celldata=False)
+            good = vtk.vtkPolyData()
+            good.DeepCopy(pd)
+            vcs2vtk.removeHiddenPointsOrCells(pd, celldata=False)
+            loopRemoveHiddenPointsOrCells(good, celldata=False)
+            self.assertSameGrid(pd, good)
+
+    def testPedigreeMask(self):
+        pd = maskedPolyData(20, 10, 0.)
+        nCells = pd.GetNumberOfCells()
+        # a wrapped grid: cells point back into the original data
+        pedigree = numpy.random.randint(0, 50, nCells).astype(numpy.int32)
+        pedigreeIds = VN.numpy_to_vtk(pedigree, deep=True)
+        pedigreeIds.SetName("PedigreeIds")
+        pd.GetCellData().SetPedigreeIds(pedigreeIds)
+        pd.GetCellData().RemoveArray(vtk.vtkDataSetAttributes.GhostArrayName())
+        data = numpy.ma.masked_less(numpy.random.random(50), .3)
+        vcs2vtk.putMaskOnVTKGrid(data, pd, cellData=True)
+        self.assertEqual(pd.GetNumberOfCells(), (~data.mask[pedigree]).sum())
+        self.assertTrue(numpy.array_equal(VN.vtk_to_numpy(pd.GetCellData().GetPedigreeIds()),
+                                          pedigree[~data.mask[pedigree]]))
+        vcs2vtk.setArray(pd, data.filled(0).flat, "scalar", isCellData=True, isScalars=True)
+
+    def testStructuredGhost(self):
+        sg = vtk.vtkStructuredGrid()
+        sg.SetDimensions(11, 6, 1)
+        data = numpy.ma.masked_less(numpy.random.random((5, 10)), .5)
+        vcs2vtk.putMaskOnVTKGrid(data, sg, cellData=True)
+        ghost = VN.vtk_to_numpy(sg.GetCellData().GetArray(vtk.vtkDataSetAttributes.GhostArrayName()))
+        self.assertTrue(numpy.array_equal(ghost != 0, data.mask.flat))
+
+    def testManyCells(self):
+        pd = maskedPolyData(1000, 1000, .4, celldata=True)
+        ghost = VN.vtk_to_numpy(pd.GetCellData().GetArray(vtk.vtkDataSetAttributes.GhostArrayName()))
+        visible = (ghost == 0).sum()
+        vcs2vtk.removeHiddenPointsOrCells(pd, celldata=True)
+        self.assertEqual(pd.GetNumberOfCells(), visible)
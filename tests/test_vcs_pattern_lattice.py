@@ -0,0 +1,102 @@
+import unittest
+import math
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+from vcs.vcsvtk import fillareautils, patterns
+
+
+def loopLattice(bounds, xres, yres):
+    # Reference: the point by point lattice make_patterned_polydata used to build
+    points = []
+    tcoords = []
+    for i in range(yres + 1):
+        for j in range(xres + 1):
+            tc = [i * 1.0 / yres, j * 1.0 / xres]
+            points.append([bounds[0] + tc[1] * (bounds[1] - bounds[0]),
+                           bounds[2] + tc[0] * (bounds[3] - bounds[2]), 0.])
+            tcoords.append(tc)
+    return numpy.array(points), numpy.array(tcoords)
+
+
+def disk(x, y, radius):
+    source = vtk.vtkRegularPolygonSource()
+    source.SetCenter(x, y, 0.)
+    source.SetRadius(radius)
+    source.SetNumberOfSides(40)
+    source.Update()
+    return source.GetOutput()
+
+
+def patternPoints(actor):
+    mapper = actor.GetMapper()
+    mapper.Update()
+    return VN.vtk_to_numpy(mapper.GetInput().GetPoints().GetData())
+
+
+class TestVCSPatternLattice(unittest.TestCase):
+    def testLatticeMatchesLoop(self):
+        bounds = [-180., 180., -90., 90.]
+        lattice = fillareautils.make_lattice(bounds, 36, 18)
+        points, tcoords = loopLattice(bounds, 36, 18)
+        numpy.testing.assert_allclose(VN.vtk_to_numpy(lattice.GetPoints().GetData()), points, atol=1.e-4)
+        numpy.testing.assert_allclose(VN.vtk_to_numpy(lattice.GetPointData().GetTCoords()), tcoords, atol=1.e-6)
+        normals = VN.vtk_to_numpy(lattice.GetPointData().GetNormals())
+        self.assertEqual(normals.tolist(), [[0., 0., 1.]] * len(points))
+        # a window is a block of the full lattice
+        window = fillareautils.make_lattice(bounds, 36, 18, (2, 5, 10, 20))
+        numpy.testing.assert_allclose(VN.vtk_to_numpy(window.GetPoints().GetData()),
+                                      points.reshape(19, 37, 3)[2:5, 10:20].reshape(-1, 3), atol=1.e-4)
+
+    def testTransformGlyph(self):
+        for rotation in [0., 30.]:
+            pattern = patterns.pattern_list[18](vtk.vtkPolyData(), [2., 3.], "pattern")
+            pattern.rotation = rotation
+            pattern.glyph = vtk.vtkPolyData()
+            pattern.glyph.SetPoints(vtk.vtkPoints())
+            pattern.glyph.SetPolys(vtk.vtkCellArray())
+            pattern.paint()
+            before = VN.vtk_to_numpy(pattern.glyph.GetPoints().GetData()).copy()
+            pattern.transform_glyph()
+            a = math.radians(rotation)
+            expected = [[(x * math.cos(a) - y * math.sin(a)) * 2., (x * math.sin(a) + y * math.cos(a)) * 3., 0.]
+                        for x, y, _ in before]
+            numpy.testing.assert_allclose(VN.vtk_to_numpy(pattern.glyph.GetPoints().GetData()),
+                                          expected, atol=1.e-5)
+
+    def testTileCache(self):
+        fillareautils.patternTiles.clear()
+        kargs = {"fillareastyle": "hatch", "fillareaindex": 5, "fillareacolors": [100., 0., 0., 100.],
+                 "size": [800, 600], "screenGeom": [800, 600]}
+        first = patternPoints(fillareautils.make_patterned_polydata(disk(0., 0., 10.), **kargs))
+        self.assertEqual(len(fillareautils.patternTiles), 1)
+        second = patternPoints(fillareautils.make_patterned_polydata(disk(0., 0., 10.), **kargs))
+        self.assertEqual(len(fillareautils.patternTiles), 1)
+        numpy.testing.assert_array_equal(first, second)
+        kargs["fillareaindex"] = 6
+        fillareautils.make_patterned_polydata(disk(0., 0., 10.), **kargs)
+        self.assertEqual(len(fillareautils.patternTiles), 2)
+
+    def testSharedLattice(self):
+        kargs = {"fillareastyle": "pattern", "fillareaindex": 1,
+                 "size": [800, 600], "screenGeom": [800, 600], "latticeBounds": [0., 100., 0., 100.]}
+        alone = fillareautils.make_patterned_polydata(disk(60., 60., 10.), fillareastyle="pattern",
+                                                      fillareaindex=1, size=[800, 600], screenGeom=[800, 600])
+        shared = fillareautils.make_patterned_polydata(disk(60., 60., 10.), **kargs)
+        # glyphs are sized and spaced for the whole plot, not for the band
+        self.assertLess(len(patternPoints(shared)), len(patternPoints(alone)))
+        # both bands are cut out of the same lattice
+        fillareautils.patternTiles.clear()
+        for center in [(20., 20.), (60., 60.)]:
+            points = patternPoints(fillareautils.make_patterned_polydata(disk(center[0], center[1], 10.), **kargs))
+            self.assertGreater(points[:, 0].min(), center[0] - 12.)
+            self.assertLess(points[:, 0].max(), center[0] + 12.)
+        (first, second) = fillareautils.patternTiles.keys()
+        self.assertEqual(first[:6], second[:6])
+        self.assertNotEqual(first[6], second[6])
+
+    def testLargeLattice(self):
+        bounds = [0., 1000., 0., 600.]
+        lattice = fillareautils.make_lattice(bounds, 500, 300)
+        self.assertEqual(lattice.GetNumberOfPoints(), 501 * 301)
+        numpy.testing.assert_allclose(lattice.GetBounds()[:4], bounds)
@@ -0,0 +1,69 @@
+import basevcstest
+import numpy
+import cdms2
+
+
+class TestVCSProbe(basevcstest.VCSBaseTest):
+    def testProbeBoxfill(self):
+        data = numpy.arange(200, dtype=numpy.float64).reshape(10, 20)
+        disp = self.x.plot(data, bg=self.bg)
+        # cells are centered on integer coordinates
+        xs = [0., 3.2, 19.4, 7., 50.]
+        ys = [0., 5.1, 9.3, 2.8, 50.]
+        values, lons, lats = self.x.probe(disp, xs, ys)
+        self.assertEqual(values[:4].tolist(), [0., 103., 199., 67.])
+        self.assertTrue(values.mask[4])
+        self.assertEqual(lons.tolist(), xs)
+        self.assertEqual(lats.tolist(), ys)
+        # display names work too
+        values2, _, _ = self.x.probe(disp.name, xs, ys)
+        self.assertEqual(values2[:4].tolist(), values[:4].tolist())
+
+    def testProbePointData(self):
+        data = numpy.arange(200, dtype=numpy.float64).reshape(10, 20)
+        disp = self.x.plot(data, "default", "isofill", bg=self.bg)
+        # value of the closest grid point
+        xs = [0., 3.2, 18.7, 7.4]
+        ys = [0., 5.1, 8.9, 2.6]
+        values, _, _ = self.x.probe(disp, xs, ys)
+        self.assertEqual(values.tolist(), [0., 103., 199., 67.])
+        values, _, _ = self.x.probe(disp, [50.], [50.])
+        self.assertTrue(values.mask[0])
+
+    def testLocatorCache(self):
+        data = numpy.arange(200, dtype=numpy.float64).reshape(10, 20)
+        disp = self.x.plot(data, bg=self.bg)
+        locator = self.x.backend.getCellLocator(disp)
+        self.assertIs(self.x.backend.getCellLocator(disp), locator)
+        self.x.backend.update_input(disp.backend, cdms2.MV2.array(data[::-1]))
+        self.assertIsNot(self.x.backend.getCellLocator(disp), locator)
+        values, _, _ = self.x.probe(disp, [0.], [0.])
+        self.assertEqual(values.tolist(), [180.])
+
+    def testProbeProjected(self):
+        clt = self.clt("clt", time=slice(0, 1), squeeze=1)
+        box = self.x.createboxfill()
+        box.projection = "robinson"
+        disp = self.x.plot(clt, box, bg=self.bg)
+        geo = disp.backend["vtk_backend_geo"]
+        lonLat = numpy.array([[10.5, 20.5], [-100.5, -30.5], [150.5, 60.5]])
+        world = numpy.array([geo.TransformPoint(lon, lat, 0.) for lon, lat in lonLat])
+        values, lons, lats = self.x.probe(disp, world[:, 0], world[:, 1])
+        numpy.testing.assert_allclose(lons, lonLat[:, 0], atol=1.e-6)
+        numpy.testing.assert_allclose(lats, lonLat[:, 1], atol=1.e-6)
+        for value, (lon, lat) in zip(values, lonLat):
+            self.assertEqual(value, clt(longitude=(lon, lon, "cob"), latitude=(lat, lat, "cob"),
+                                        squeeze=1))
+
+    def testManyPoints(self):
+        data = numpy.random.random((1000, 1000))
+        disp = self.x.plot(data, bg=self.bg)
+        xs = numpy.random.random(10000) * 999.
+        ys = numpy.random.random(10000) * 999.
+        self.x.probe(disp, xs[:1], ys[:1])
+        probeFilter = self.x.backend.getProbeFilter(disp)
+        values, _, _ = self.x.probe(disp, xs, ys)
+        numpy.testing.assert_array_equal(values, data[numpy.round(ys).astype(int),
+                                                      numpy.round(xs).astype(int)])
+        # the probe filter is not rebuilt for each call
+        self.assertIs(self.x.backend.getProbeFilter(disp), probeFilter)
@@ -0,0 +1,77 @@
+import basevcstest
+import numpy
+import vcs
+from vcs.vcsvtk import pipeline2d
+
+
+class TestVCSSubsetLOD(basevcstest.VCSBaseTest):
+    def testSubsetToWorldCoordinates(self):
+        s = self.clt("clt", time=slice(0, 1), squeeze=1)
+        gm = vcs.createboxfill()
+        self.assertIs(pipeline2d.subsetToWorldCoordinates(s, gm), s)
+        gm.datawc(-20., 20., -30., 60.)
+        sub = pipeline2d.subsetToWorldCoordinates(s, gm)
+        self.assertLess(sub.shape[0], s.shape[0])
+        self.assertLess(sub.shape[1], s.shape[1])
+        lat = sub.getLatitude()[:]
+        lon = sub.getLongitude()[:]
+        self.assertTrue(lat.min() < -20. and lat.max() > 20.)
+        self.assertTrue(lon.min() < -30. and lon.max() > 60.)
+        # wraps around the data longitudes (-180, 175)
+        gm.datawc(-20., 20., 150., 210.)
+        sub = pipeline2d.subsetToWorldCoordinates(s, gm)
+        lon = sub.getLongitude()[:]
+        self.assertTrue(lon.min() < 150. and lon.max() > 210.)
+        self.assertTrue(numpy.array_equal(sub(longitude=(170, 190)), s(longitude=(170, 190))))
+
+    def testDecimate2D(self):
+        s = self.clt("clt", time=slice(0, 1), squeeze=1)
+        s[0, 0] = numpy.ma.masked
+        mean = pipeline2d.decimate2D(s, 4, 3)
+        self.assertEqual(mean.shape, (-(-s.shape[0] // 3), -(-s.shape[1] // 4)))
+        self.assertAlmostEqual(float(mean[0, 0]), float(s[:3, :4].mean()), places=4)
+        self.assertAlmostEqual(float(mean[-1, -1]), float(s[-(s.shape[0] % 3 or 3):, -(s.shape[1] % 4 or 4):].mean()),
+                               places=4)
+        # the coarse cells cover the same area
+        lon = s.getLongitude().getBounds()
+        lon2 = mean.getLongitude().getBounds()
+        self.assertEqual(lon2[0, 0], lon[0, 0])
+        self.assertEqual(lon2[-1, 1], lon[-1, 1])
+        stride = pipeline2d.decimate2D(s, 4, 3, "stride")
+        self.assertTrue(numpy.ma.allequal(stride, s[::3, ::4]))
+
+    def pixels(self, *args, **kargs):
+        self.x.plot(*args, bg=self.bg, **kargs)
+        pixels = self.x.to_buffer("rgb").copy()
+        self.x.clear()
+        return pixels
+
+    def testSubsetPlotsSame(self):
+        s = self.clt("clt", time=slice(0, 1))
+        subset = pipeline2d.subsetToWorldCoordinates
+        for create in [vcs.createboxfill, vcs.createisofill, vcs.createisoline]:
+            for datawc in [(-20., 20., -30., 60.), (-60., 70., 120., 250.)]:
+                gm = create()
+                gm.datawc(*datawc)
+                subsetted = self.pixels(s, gm)
+                try:
+                    pipeline2d.subsetToWorldCoordinates = lambda data, gm: data
+                    whole = self.pixels(s, gm)
+                finally:
+                    pipeline2d.subsetToWorldCoordinates = subset
+                self.assertTrue(numpy.array_equal(subsetted, whole),
+                                "%s %s differs when subset" % (gm.g_name, datawc))
+
+    def testLOD(self):
+        s = self.clt("clt", time=slice(0, 1))
+        gm = vcs.createboxfill()
+        # a tiny data area, a few pixels for all the cells
+        tpl = vcs.createtemplate()
+        tpl.data.x2 = tpl.data.x1 + .02
+        tpl.data.y2 = tpl.data.y1 + .02
+        d = self.x.plot(s, gm, tpl, lod="auto", bg=self.bg)
+        self.assertEqual(d.lod, "auto")
+        cells = d.backend["vtk_backend_grid"].GetNumberOfCells()
+        self.assertLess(cells, s.shape[-1] * s.shape[-2])
+        with self.assertRaises(ValueError):
+            self.x.plot(s, gm, lod="bad", bg=self.bg)
@@ -0,0 +1,52 @@
+import basevcstest
+import vcs
+
+
+class TestVCSTemplateDecorations(basevcstest.VCSBaseTest):
+    def registrySizes(self):
+        return dict((typ, len(vcs.elements[typ])) for typ in
+                    ["texttable", "textorientation", "textcombined", "line", "marker", "fillarea"])
+
+    def testNoTemporaryElements(self):
+        s = self.clt("clt", slice(0, 1))
+        before = self.registrySizes()
+        displays = len(vcs.elements["display"])
+        for i in range(3):
+            self.x.plot(s, bg=self.bg)
+        self.assertEqual(self.registrySizes(), before)
+        # one display per plot, nothing else
+        self.assertEqual(len(vcs.elements["display"]), displays + 3)
+
+    def testDrawAttributesReturnsDecorations(self):
+        s = self.clt("clt", slice(0, 1))
+        before = self.registrySizes()
+        drawn = self.x.gettemplate().drawAttributes(self.x, s, self.x.getboxfill(), bg=self.bg)
+        self.assertIn("dataname", [d[1] for d in drawn])
+        self.assertEqual(set(d[0] for d in drawn), set(["text"]))
+        self.assertEqual(self.registrySizes(), before)
+
+    def testDetachedText(self):
+        tmpl = vcs.createtemplate()
+        tmpl.title.priority = 3
+        names = set(vcs.elements["texttable"])
+        tt, to = vcs.template.detachedText(tmpl.title)
+        self.assertEqual(set(vcs.elements["texttable"]), names)
+        self.assertEqual(tt.x, [tmpl.title.x])
+        self.assertEqual(tt.y, [tmpl.title.y])
+        self.assertEqual(tt.priority, 3)
+        self.assertEqual(to.height, vcs.gettextorientation(tmpl.title.textorientation).height)
+        # the copies of the defaults can be modified, the defaults are untouched
+        to.height = 50
+        tt.color = 242
+        self.assertNotEqual(vcs.gettextorientation(tmpl.title.textorientation).height, 50)
+        self.assertNotEqual(vcs.gettexttable(tmpl.title.texttable).color, 242)
+
+    def testPlotClearCycles(self):
+        s = self.clt("clt", slice(0, 1))
+        self.x.plot(s, bg=self.bg)
+        self.x.clear()
+        before = self.registrySizes()
+        for i in range(5):
+            self.x.plot(s, bg=self.bg)
+            self.x.clear()
+        self.assertEqual(self.registrySizes(), before)
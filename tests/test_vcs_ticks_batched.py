@@ -0,0 +1,79 @@
+import basevcstest
+import vcs
+import vtk
+
+
+class Context2D(object):
+    def __init__(self):
+        self.applied = []
+        self.strings = []
+
+    def ApplyTextProp(self, prop):
+        self.applied.append(prop)
+
+    def DrawString(self, x, y, string):
+        self.strings.append((string, self.applied[-1]))
+
+
+class TestVCSTicksBatched(basevcstest.VCSBaseTest):
+    def testSharedTextProperty(self):
+        shared = vtk.vtkTextProperty()
+        shared.SetFontSize(12)
+        actors = []
+        for string in ["a", "b", "c"]:
+            actor = vtk.vtkTextActor()
+            actor.GetTextProperty().ShallowCopy(shared)
+            actor.SetInput(string)
+            actors.append(actor)
+        item = vcs.vcs2vtk.TextActorsWrapperItem(actors, shared)
+        context = Context2D()
+        item.Paint(None, context)
+        self.assertEqual(context.applied, [shared])
+        # an edited actor is painted with its own property
+        actors[1].GetTextProperty().SetColor(1., 0., 0.)
+        context = Context2D()
+        item.Paint(None, context)
+        self.assertEqual([prop for _, prop in context.strings],
+                         [shared, actors[1].GetTextProperty(), shared])
+        self.assertEqual(shared.GetColor(), actors[0].GetTextProperty().GetColor())
+
+    def testDrawTicksDecorations(self):
+        s = self.clt("clt", time=slice(0, 1), squeeze=1)
+        t = self.x.gettemplate("default")
+        gm = self.x.getboxfill("default")
+        vp = [t.data.x1, t.data.x2, t.data.y1, t.data.y2]
+        wc = [-180., 180., -90., 90.]
+        nlines = len(vcs.elements["line"])
+        ntexts = len(vcs.elements["texttable"])
+        decorations = []
+        self.assertEqual(t.drawTicks(s, gm, self.x, "x", "1", vp, wc,
+                                     decorations=decorations), decorations)
+        self.assertEqual([d[0] for d in decorations], ["text", "line"])
+        tt = decorations[0][2]
+        ticks = decorations[1][1]
+        self.assertEqual(len(tt.x), len(tt.string))
+        self.assertEqual(ticks.x, [[X, X] for X in tt.x])
+        self.assertEqual(tt.y, [t.xlabel1.y] * len(tt.x))
+        for X in tt.x:
+            self.assertTrue(vp[0] <= X <= vp[1])
+        # minor ticks have no labels
+        decorations = []
+        t.drawTicks(s, gm, self.x, "y", "1", vp, wc, mintic=True,
+                    decorations=decorations)
+        self.assertEqual([d[0] for d in decorations], ["line"])
+        # nothing is registered
+        self.assertEqual(len(vcs.elements["line"]), nlines)
+        self.assertEqual(len(vcs.elements["texttable"]), ntexts)
+
+    def testDenseLabels(self):
+        s = self.clt("clt", time=slice(0, 1), squeeze=1)
+        gm = vcs.createisofill()
+        gm.projection = "mercator"
+        gm.xticlabels1 = dict((float(i), "%i" % i) for i in range(-180, 181))
+        t = self.x.gettemplate("default")
+        vp = [t.data.x1, t.data.x2, t.data.y1, t.data.y2]
+        decorations = []
+        t.drawTicks(s, gm, self.x, "x", "1", vp, [-180., 180., -90., 90.],
+                    decorations=decorations)
+        self.assertEqual(len(decorations[0][2].string), 361)
+        self.assertIsNotNone(self.x.plot(s, gm, bg=self.bg))
@@ -0,0 +1,39 @@
+import basevcstest
+import numpy
+import os
+import vcs
+import vtk
+from vtk.util import numpy_support as VN
+
+
+class TestVCSToBuffer(basevcstest.VCSBaseTest):
+    def testToBuffer(self):
+        self.x.plot(self.clt("clt", slice(0, 1)), bg=self.bg)
+        fnm = os.path.join(self.pngsdir, "to_buffer.png")
+        m = {'one': 'value one', 'two': 'value two'}
+        self.x.png(fnm, metadata=m)
+        reader = vtk.vtkPNGReader()
+        reader.SetFileName(fnm)
+        reader.Update()
+        from_file = VN.vtk_to_numpy(reader.GetOutput().GetPointData().GetScalars())
+        width, height, _ = reader.GetOutput().GetDimensions()
+        from_file = from_file.reshape(height, width, 3)[::-1]
+
+        rgb = self.x.to_buffer("rgb")
+        self.assertEqual(rgb.shape, (height, width, 3))
+        self.assertTrue(numpy.array_equal(rgb, from_file))
+        rgba = self.x.to_buffer()
+        self.assertEqual(rgba.shape, (height, width, 4))
+
+        data = self.x.to_buffer("png", metadata=m)
+        with open(fnm, "rb") as f:
+            self.assertEqual(data, f.read())
+        os.remove(fnm)
+        with open(fnm, "wb") as f:
+            f.write(data)
+        self.assertEqual(vcs.png_read_metadata(fnm), m)
+        os.remove(fnm)
+
+    def testToBufferBadFormat(self):
+        with self.assertRaises(vcs.vcsError):
+            self.x.to_buffer("jpeg")
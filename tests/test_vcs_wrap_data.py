@@ -0,0 +1,92 @@
+import unittest
+import numpy
+import vtk
+from vtk.util import numpy_support as VN
+from vcs import vcs2vtk
+
+
+def appendWrapData(data, wc, wrap):
+    # Reference: one transform filter per translation appended
+    # together and clipped, as doWrapData used to do
+    surface = vtk.vtkDataSetSurfaceFilter()
+    surface.SetInputData(data)
+    surface.Update()
+    data = surface.GetOutput()
+    data.GetCellData().SetActiveAttribute(-1, vtk.vtkDataSetAttributes.GLOBALIDS)
+    data.GetPointData().SetActiveAttribute(-1, vtk.vtkDataSetAttributes.VECTORS)
+    bounds = data.GetBounds()
+    nX = [0, 0]
+    Amn, Amx = bounds[0], bounds[1]
+    while Amn > wc[0]:
+        nX[0] += 1
+        Amn -= wrap[1]
+    while Amx < wc[1]:
+        nX[1] += 1
+        Amx += wrap[1]
+    appendFilter = vtk.vtkAppendPolyData()
+    for i in range(-nX[0], nX[1] + 1):
+        for j in range(-nX[0], nX[1] + 1):
+            transform = vtk.vtkTransform()
+            transform.Translate(i * wrap[1], j * wrap[0], 0)
+            tpf = vtk.vtkTransformFilter()
+            tpf.SetInputData(data)
+            tpf.SetTransform(transform)
+            tpf.Update()
+            appendFilter.AddInputData(tpf.GetOutput())
+    clipBox = vtk.vtkBox()
+    clipBox.SetXMin(wc[0], wc[2], -1.0)
+    clipBox.SetXMax(wc[1], wc[3], 1.0)
+    clipper = vtk.vtkExtractPolyDataGeometry()
+    clipper.ExtractInsideOn()
+    clipper.SetImplicitFunction(clipBox)
+    clipper.ExtractBoundaryCellsOn()
+    clipper.PassPointsOff()
+    clipper.SetInputConnection(appendFilter.GetOutputPort())
+    clipper.Update()
+    return clipper.GetOutput()
+
+
+def globalGrid(nx, ny):
+    grid = vtk.vtkRectilinearGrid()
+    grid.SetDimensions(nx + 1, ny + 1, 1)
+    grid.SetXCoordinates(VN.numpy_to_vtk(numpy.linspace(0., 360., nx + 1), deep=True))
+    grid.SetYCoordinates(VN.numpy_to_vtk(numpy.linspace(-90., 90., ny + 1), deep=True))
+    grid.SetZCoordinates(VN.numpy_to_vtk(numpy.zeros(1), deep=True))
+    globalIds = VN.numpy_to_vtk(numpy.arange(nx * ny), deep=True)
+    globalIds.SetName("GlobalIds")
+    grid.GetCellData().SetGlobalIds(globalIds)
+    vectors = VN.numpy_to_vtk(numpy.random.random(((nx + 1) * (ny + 1), 3)), deep=True)
+    vectors.SetName("vector")
+    grid.GetPointData().SetVectors(vectors)
+    return grid
+
+
+def cellsAndVectors(pd):
+    # unique (GlobalId, cell center) and (point, vector) rows
+    centers = vtk.vtkCellCenters()
+    centers.SetInputData(pd)
+    centers.Update()
+    cells = numpy.column_stack([VN.vtk_to_numpy(pd.GetCellData().GetArray("GlobalIds")),
+                                VN.vtk_to_numpy(centers.GetOutput().GetPoints().GetData())])
+    vectors = numpy.column_stack([VN.vtk_to_numpy(pd.GetPoints().GetData()),
+                                  VN.vtk_to_numpy(pd.GetPointData().GetArray("vector"))])
+    return numpy.unique(cells.round(6), axis=0), numpy.unique(vectors.round(6), axis=0)
+
+
+class TestVCSWrapData(unittest.TestCase):
+    def testSameAsAppend(self):
+        grid = globalGrid(36, 18)
+        for wc in [[0., 360., -90., 90.], [-180., 180., -90., 90.], [-360., 360., -90., 90.],
+                   [100., 200., -10., 30.], [-500., 130., -90., 90.]]:
+            result = vcs2vtk.doWrapData(grid, wc, [0., 360.])
+            good = appendWrapData(grid, wc, [0., 360.])
+            self.assertEqual(result.GetCellData().GetGlobalIds().GetName(), "GlobalIds")
+            self.assertEqual(result.GetPointData().GetVectors().GetName(), "vector")
+            for r, g in zip(cellsAndVectors(result), cellsAndVectors(good)):
+                self.assertTrue(numpy.array_equal(r, g))
+
+    def testLargeGrid(self):
+        # global 0.1 degree data wrapped over 720 degrees
+        grid = globalGrid(3600, 1800)
+        result = vcs2vtk.doWrapData(grid, [-360., 360., -90., 90.], [0., 360.])
+        self.assertEqual(result.GetNumberOfCells(), 2 * 3600 * 1800)
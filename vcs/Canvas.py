@@ -17,6 +17,7 @@
     .. _file: https://docs.python.org/2/library/functions.html?highlight=open#file
 """
 import warnings
+import contextlib
 import numpy.ma
 import MV2
 import numpy
@@ -43,6 +44,8 @@ except Exception:
 from weakref import WeakSet, WeakKeyDictionary
 
 from .error import vcsError
+from . import elementsRegistry
+from . import dataStatistics
 import cdms2
 import copy
 import cdtime
@@ -1055,11 +1058,19 @@ class Canvas(vcs.bestMatch):
         """
         self.drawLogo = self.enableLogo
 
-    def update(self, *args, **kargs):
+    def update(self, display=None, array1=None, array2=None, render=True):
         """If a series of commands are given to VCS and the Canvas Mode is
         set to manual, then use this function to update the plot(s)
         manually.
 
+        Given a display (or display name) and new data, shows the new data on
+        that display: the plotted vtk pipeline is reused, and only the data,
+        the template texts (min, max, mean, time...) and the colors are
+        updated. The plot is redone when the new data changes automatic
+        levels (and the colorbar), or for plots that are not updated in place
+        (vectors, streamlines, 1D). The new data must be on the same grid as
+        the plotted data.
+
         :Example:
 
             .. doctest:: canvas_update
@@ -1078,9 +1089,95 @@ class Canvas(vcs.bestMatch):
                 >>> box.datawc(1e20,1e20,1e20,1e20)
                 >>> box.datawc(-45.0, 45.0, -90.0, 90.0)
                 >>> a.update() # Update the changes manually
+                >>> a.mode = 1
+                >>> d = a.plot(s(time=slice(0, 1)))
+                >>> a.update(d, s(time=slice(1, 2))) # Show the next time step
+
+        :param display: A display returned by plot, or its name
+        :type display: :py:class:`vcs.displayplot.Dp` or `str`_
+
+        :param array1: The new data
+        :type array1: cdms2.tvariable.TransientVariable or numpy.ndarray
+
+        :param array2: The new second array (e.g. v of a vector plot)
+        :type array2: cdms2.tvariable.TransientVariable or numpy.ndarray
+
+        :param render: Render the canvas once updated
+        :type render: `bool`_
+        """
+        if display is None:
+            return self.backend.update()
+        if isinstance(display, str):
+            display = vcs.elements["display"][display]
+        if array1 is None:
+            raise vcsError("update needs the new data to show on the display")
+        array1 = cdms2.asVariable(array1)
+        if array2 is not None:
+            array2 = cdms2.asVariable(array2)
+        # the arrays may be the plotted ones, refilled in place
+        dataStatistics.invalidate(array1)
+        dataStatistics.invalidate(array2)
+        # keep the new data for later replots (resize...)
+        display.array = [array1, array2 if array2 is not None else display.array[1]]
+        self.backend.updateDisplay(display, array1, array2, render=render)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Holds back the rendering of the canvas: plots, updates and clears
+        made in the block are rendered once, when the block ends. Exporting
+        (png, to_buffer...) in the block renders the page as it is.
+        Blocks can be nested, the outermost one renders.
+
+        :Example:
+
+            .. doctest:: canvas_batch
+
+                >>> a=vcs.init(bg=True)
+                >>> array = [range(1, 11) for _ in range(1, 11)]
+                >>> with a.batch():
+                ...     for tpl in ["top_of2", "bot_of2"]:
+                ...         d = a.plot(array, tpl)
+                >>> a.png("batched")
+
+        :returns: The canvas
+        :rtype: vcs.Canvas.Canvas
         """
+        self.backend.holdRendering()
+        try:
+            yield self
+        except BaseException:
+            self.backend.releaseRendering(render=False)
+            raise
+        self.backend.releaseRendering()
 
-        return self.backend.update(*args, **kargs)
+    def plot_many(self, plots):
+        """Plots several plots and renders the canvas once, see batch.
+
+        :Example:
+
+            .. doctest:: canvas_plot_many
+
+                >>> a=vcs.init(bg=True)
+                >>> array = [range(1, 11) for _ in range(1, 11)]
+                >>> displays = a.plot_many([(array, "top_of2"),
+                ...                         (array, "bot_of2", "isofill", {"continents": 0})])
+
+        :param plots: The arguments of each plot, a list of arguments is
+            passed to plot, a trailing dictionary is passed as keywords.
+        :type plots: `list`_
+
+        :returns: The displays of the plots
+        :rtype: `list`_
+        """
+        displays = []
+        with self.batch():
+            for args in plots:
+                args = list(args)
+                kargs = {}
+                if len(args) > 0 and isinstance(args[-1], dict):
+                    kargs = args.pop(-1)
+                displays.append(self.plot(*args, **kargs))
+        return displays
 
     def scriptobject(self, obj, script_filename=None, mode=None):
         """Save individual attributes sets (i.e., individual primary class
@@ -2480,6 +2577,40 @@ class Canvas(vcs.bestMatch):
             out.append([outx, outy])
         return out
 
+    def probe(self, display, xs, ys, screen=False):
+        """Returns the values and lon/lat of a plot at many locations at once,
+        as picking a point with the mouse does.
+
+        :Example:
+
+            .. doctest:: canvas_probe
+
+                >>> a=vcs.init()
+                >>> array=[range(10) for _ in range(10)]
+                >>> disp=a.plot(array)
+                >>> values, lons, lats = a.probe(disp, [2.2, 7.8], [4.1, 4.6])
+
+        :param display: Display to probe.
+        :type display: `str`_ or vcs.displayplot.Dp
+
+        :param xs: x coordinates of the locations to probe
+        :type xs: `list`_ or numpy array
+
+        :param ys: y coordinates of the locations to probe
+        :type ys: `list`_ or numpy array
+
+        :param screen: If True xs and ys are screen (pixel) coordinates,
+            otherwise world coordinates of the plot (projected if any).
+        :type screen: `bool`_
+
+        :returns: The values at each location (masked outside of the data),
+            the longitudes and the latitudes (or x/y if not projected)
+        :rtype: `tuple`_ of numpy.ma arrays
+        """
+        if isinstance(display, str):
+            display = vcs.elements["display"][display]
+        return self.backend.probe(display, xs, ys, screen)
+
     def match_color(self, color, colormap=None):  # noqa
         return vcs.match_color(color, colormap)
     match_color.__doc__ = vcs.utils.match_color.__doc__
@@ -2571,7 +2702,7 @@ class Canvas(vcs.bestMatch):
 
     _plot_keywords_ = ['variable', 'grid', 'xaxis', 'xarray', 'xrev', 'yaxis', 'yarray', 'yrev', 'continents',
                        'xbounds', 'ybounds', 'zaxis', 'zarray', 'taxis', 'tarray', 'waxis', 'warray', 'bg', 'ratio',
-                       'donotstoredisplay', 'render', 'continents_line', "display_name", "frame"]
+                       'donotstoredisplay', 'render', 'continents_line', "display_name", "frame", "lod"]
 
     _deprecated_plot_keywords_ = ["time", "units", "file_comment", "xname", "yname", "zname", "tname", "wname",
                                   "xunits", "yunits", "zunits", "tunits", "wunits", "comment1", "comment2", "comment3",
@@ -2767,6 +2898,15 @@ class Canvas(vcs.bestMatch):
                         # Negative values are ok and start from last frame (frame=-1)
                         frame = 0
 
+                * Level of detail of boxfill, isofill and isoline plots:
+
+                    .. code-block:: python
+
+                        # None draws every cell in the graphics method datawc
+                        # "auto" or "mean" averages blocks of cells down to about one cell per pixel
+                        # "stride" keeps one cell per pixel
+                        lod = None|"auto"|"mean"|"stride"
+
 
         :Example:
 
@@ -2834,27 +2974,43 @@ class Canvas(vcs.bestMatch):
                                    plot_2_1D_input,
                                    plot_output)
 
-    def __new_elts(self, original, new):
-        for e in list(vcs.elements.keys()):
-            for k in list(vcs.elements[e].keys()):
-                if k not in original[e]:
-                    new[e].append(k)
-        return new
-
     def __plot(self, arglist, keyargs):
+        # Anything added to vcs.elements from here on (temp objects) belongs
+        # to the display and is removed at clear time, or when the display is
+        # plotted again
+        dname = keyargs.get("display_name")
+        # the data may have been modified in place since it was last plotted
+        for data in arglist[:2]:
+            dataStatistics.invalidate(data)
+        previous = {}
+        if dname in vcs.elements["display"]:
+            previous = getattr(vcs.elements["display"][dname], "newelements", {})
+        outermost = not elementsRegistry.isTracking()
+        mark = elementsRegistry.track()
+        try:
+            dn = self.__plotTracked(arglist, keyargs, mark)
+        finally:
+            new = elementsRegistry.untrack(mark)
+        if previous:
+            used = elementsRegistry.usedElements()
+            used.update((typ, name) for typ in new for name in new[typ])
+            kept = elementsRegistry.reclaim(previous, used)
+            if isinstance(dn, displayplot.Dp):
+                # still used by the new plot, now part of its elements
+                for typ, names in kept.items():
+                    dn.newelements.setdefault(typ, []).extend(
+                        name for name in names if name not in new.get(typ, []))
+        if dn is None and outermost:
+            # nothing will replot or clear this
+            elementsRegistry.reclaim(new)
+        return dn
+
+    def __plotTracked(self, arglist, keyargs, mark):
 
         # This routine has five arguments in arglist from _determine_arg_list
         # It adds one for bg and passes those on to Canvas.plot as its sixth
         # arguments.
 
-        # First of all let's remember which elements we have before coming in here
-        # so that anything added (temp objects) can be removed at clear
-        # time
-        original_elts = {}
-        new_elts = {}
-        for k in list(vcs.elements.keys()):
-            original_elts[k] = list(vcs.elements[k].keys())
-            new_elts[k] = []
         # First of all try some cleanup
         assert len(arglist) == 6
         xtrakw = arglist.pop(5)
@@ -3807,7 +3963,7 @@ class Canvas(vcs.bestMatch):
                     delattr(arglist[0], p)
                 else:
                     setattr(arglist[0], p, tmp)
-            dn.newelements = self.__new_elts(original_elts, new_elts)
+            dn.newelements = elementsRegistry.created(mark)
             dn._parent = self
 
             """
@@ -4092,8 +4248,9 @@ class Canvas(vcs.bestMatch):
                 if dn is not None:
                     dn._template_origin = template_origin
                     dn.ratio = keyargs.get("ratio", None)
+                    dn.lod = keyargs.get("lod", None)
                     dn.continents_line = self.getcontinentsline()
-                    dn.newelements = self.__new_elts(original_elts, new_elts)
+                    dn.newelements = elementsRegistry.created(mark)
 
             if self.mode != 0:
                 # self.update()
@@ -4188,12 +4345,18 @@ class Canvas(vcs.bestMatch):
                 >>> a.return_display_names() # should be empty again
                 []
 
+        The displays stay in vcs.elements["display"]. The temporary elements
+        their plot created and they do not use (e.g. texts) are deleted.
+
         :param args: Any number of display names to remove.
         :type args: list of `str`_
         """
         for a in args:
             if a in self.display_names:
                 self.display_names.remove(a)
+                dn = vcs.elements["display"].get(a)
+                if dn is not None:
+                    dn.newelements = elementsRegistry.reclaim(getattr(dn, "newelements", {}))
         self.update()
 
     def cgm(self, file, mode='w'):
@@ -4254,8 +4417,7 @@ class Canvas(vcs.bestMatch):
                     if e == "display":
                         continue
                     for k in new_elts[e]:
-                        if k in list(vcs.elements[e].keys()):
-                            del(vcs.elements[e][k])
+                        vcs.elements[e].pop(k, None)
             if not preserve_display:
                 del(vcs.elements["display"][nm])
         self.display_names = []
@@ -4902,6 +5064,21 @@ class Canvas(vcs.bestMatch):
             *args,
             **kargs)
 
+    def _add_provenance(self, provenance, args):
+        """Adds the provenance to the png metadata in args"""
+        if provenance is True:
+            provenance = cdat_info.generateProvenance(history=True)
+        if isinstance(provenance, dict):
+            metadata = args.get("metadata", {})
+            provenance_in = metadata.get("provenance", None)
+            if provenance_in is not None:
+                provenance["user_provenance"] = provenance_in
+            metadata["provenance"] = provenance
+            args["metadata"] = metadata
+        elif provenance is not False:
+            raise RuntimeError(
+                "provenance to vcs png must be boolean or dict, you passed: {}".format(provenance))
+
     def png(self, file, width=None, height=None,
             units=None, draw_white_background=True, provenance=False, **args):
         """PNG output, dimensions set via setbgoutputdimensions
@@ -4936,18 +5113,7 @@ class Canvas(vcs.bestMatch):
 
         W, H = self._compute_width_height(
             width, height, units, background=True)
-        if provenance is True:
-            provenance = cdat_info.generateProvenance(history=True)
-        if isinstance(provenance, dict):
-            metadata = args.get("metadata", {})
-            provenance_in = metadata.get("provenance", None)
-            if provenance_in is not None:
-                provenance["user_provenance"] = provenance_in
-            metadata["provenance"] = provenance
-            args["metadata"] = metadata
-        elif provenance is not False:
-            raise RuntimeError(
-                "provenance to vcs png must be boolean or dict, you passed: {}".format(provenance))
+        self._add_provenance(provenance, args)
         return self.backend.png(
             file, W, H, units, draw_white_background, **args)
     png.__doc__ = png.__doc__ % (xmldocs.output_file,
@@ -4955,6 +5121,58 @@ class Canvas(vcs.bestMatch):
                                  xmldocs.output_height,
                                  xmldocs.output_units)
 
+    def to_buffer(self, format="rgba", width=None, height=None,
+                  units=None, draw_white_background=True, provenance=False, **args):
+        """Returns the canvas image in memory, nothing is written to disk
+
+        :Example:
+
+            .. doctest:: canvas_to_buffer
+
+                >>> a=vcs.init(bg=True)
+                >>> array = [range(1, 11) for _ in range(1, 11)]
+                >>> a.plot(array)
+                <vcs.displayplot.Dp ...>
+                >>> pixels = a.to_buffer() # (height, width, 4) uint8 array
+                >>> data = a.to_buffer("png") # png encoded bytes
+
+        :param format: "rgba" or "rgb" for a (height, width, 4|3) uint8 numpy
+            array of the window pixels, top row first, or "png" for the bytes
+            of a png file. Arrays are views on the vtk image, copy them to
+            keep them past the next render.
+        :type format: str
+
+        %s
+        %s
+        %s
+
+        :param draw_white_background: Boolean value indicating if the
+            background should be white (png only). Defaults to True.
+        :type draw_white_background: bool
+
+        :param provenance: Add provenance to the png metadata, as for png.
+        :type provenance: bool or dict
+
+        :returns: The image pixels or png bytes
+        :rtype: numpy.ndarray or bytes
+        """
+        if format not in ["rgba", "rgb", "png"]:
+            raise vcsError("format must be one of rgba, rgb or png, you passed: %s" % format)
+        if units not in [
+                'inches', 'in', 'cm', 'mm',
+                None, 'pixel', 'pixels', 'dot', 'dots']:
+            raise Exception(
+                "units must be on of inches, in, cm, mm, pixel(s) or dot(s)")
+
+        W, H = self._compute_width_height(
+            width, height, units, background=True)
+        self._add_provenance(provenance, args)
+        return self.backend.to_buffer(
+            format, W, H, draw_white_background, **args)
+    to_buffer.__doc__ = to_buffer.__doc__ % (xmldocs.output_width,
+                                             xmldocs.output_height,
+                                             xmldocs.output_units)
+
     def pdf(self, file, width=None, height=None, units='inches',
             textAsPaths=True):
         """PDF output is another form of vector graphics.
@@ -50,16 +50,7 @@ def color2vcs(col):
 
 
 def matchVcsColor(r, g, b, colormap="default"):
-    rmsmin = 100000000.
-    color = None
-    cmap = vcs.elements["colormap"][colormap]
-    for i in range(256):
-        r2, g2, b2 = cmap.index[i][:3]
-        rms = numpy.sqrt((r2 - r) ** 2 + (g2 - g) ** 2 + (b2 - b) ** 2)
-        if rms < rmsmin:
-            rmsmin = rms
-            color = i
-    return color
+    return vcs.utils.match_color([r, g, b], vcs.elements["colormap"][colormap])
 
 
 def checkedRaise(self, value, ex, err):
@@ -537,6 +528,22 @@ def checkBoxfillType(self, name, value):
             ' attribute must be either: linear, log10 or custom')
 
 
+def checkDecimate(self, name, value):
+    checkName(self, name, value)
+    if value is None:
+        return value
+    if isinstance(value, basestring) and value.lower() in ('minmax', 'lttb'):
+        return str(value.lower())
+    else:
+        checkedRaise(
+            self,
+            value,
+            ValueError,
+            'The ' +
+            name +
+            ' attribute must be either: None, minmax or lttb')
+
+
 def checkIntFloat(self, name, value):
     try:
         value = value.tolist()  # converts MA/MV/numpy
@@ -5,9 +5,10 @@ from . import animate_helper
 import time
 import random
 import hashlib
+import multiprocessing
 import os
 import shutil
-import glob
+import subprocess
 import vcs
 
 
@@ -44,6 +45,47 @@ def update_input(canvas, dimensions, frame_num, update=True):
                 update=update)
 
 
+def frame_image(canvas):
+    """Renders the canvas and returns its pixels as a (height, width, 3) uint8 array, top row first"""
+    return canvas.backend.to_buffer("rgb")
+
+
+class FFMPEGPipe(object):
+    """ffmpeg process encoding the raw RGB frames written to its stdin"""
+
+    def __init__(self, movie, rate=None, options=None):
+        self.movie = movie
+        self.rate = rate
+        self.options = options
+        self.process = None
+
+    def write(self, image):
+        if self.process is None:
+            height, width = image.shape[:2]
+            args = ["ffmpeg", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", "%dx%d" % (width, height)]
+            if self.rate is not None:
+                args.extend(("-framerate", str(self.rate)))
+            args.extend(("-i", "-", "-pix_fmt", "yuv420p"))
+            # H264 requires even numbered heights and widths
+            args.extend(("-vf", "scale=%d:%d" % (width + width % 2, height + height % 2)))
+            if self.options is not None:
+                args.append(self.options)
+            args.append(self.movie)
+            self.process = subprocess.Popen(args, stdin=subprocess.PIPE)
+        self.process.stdin.write(image.tobytes())
+
+    def close(self):
+        """Waits for ffmpeg and returns its exit code (None if nothing was written)"""
+        if self.process is None:
+            return None
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError):
+            # ffmpeg exited early, its exit code tells why
+            pass
+        return self.process.wait()
+
+
 class VTKAnimationCreate(animate_helper.StoppableThread):
 
     def __init__(self, controller):
@@ -56,6 +98,8 @@ class VTKAnimationCreate(animate_helper.StoppableThread):
         # space to work with.
         self.canvas.width *= 2
         self.canvas.height *= 2
+        self._frame_files = None
+        self._frame_files_set = set()
         self.controller.animation_created = True
         import atexit
         atexit.register(self.close)
@@ -84,14 +128,22 @@ class VTKAnimationCreate(animate_helper.StoppableThread):
         if not os.path.exists(png_name):
             self.draw_frame(frame_num, png_name)
 
-        self.controller.animation_files = sorted(
-            glob.glob(
-                os.path.join(
-                    os.path.dirname(png_name),
-                    "*.png")))
-
+        self.add_frame_file(png_name)
         return png_name
 
+    def add_frame_file(self, png_name):
+        """
+        Adds png_name to the controller's animation_files if it is not there yet
+        """
+        files = self.controller.animation_files
+        if self._frame_files is not files:
+            # the list was reset or replaced
+            self._frame_files = files
+            self._frame_files_set = set(files)
+        if png_name not in self._frame_files_set:
+            self._frame_files_set.add(png_name)
+            files.append(png_name)
+
     def draw_frame(self, frame_num, png_name):
         """
         Draw the specified frame on the offscreen canvas, render to png_name, add to controller's animation_files
@@ -104,6 +156,96 @@ class VTKAnimationCreate(animate_helper.StoppableThread):
 
         self.canvas.png(png_name)
 
+    def render_frames(self, frames, workers=1):
+        """
+        Renders the frames that are not on disk yet, split in contiguous blocks across
+        'workers' processes, returns the frame file names in the order of 'frames'
+        """
+        names = [self.get_frame_name(frame_num) for frame_num in frames]
+        missing = [frame_num for frame_num, png_name in zip(frames, names) if not os.path.exists(png_name)]
+        workers = max(1, min(workers, len(missing)))
+        # Workers inherit the data and the vcs elements, nothing is pickled
+        if "fork" not in multiprocessing.get_all_start_methods():
+            workers = 1
+        if workers == 1:
+            if missing:
+                self.draw_frames(missing)
+            return names
+        context = multiprocessing.get_context("fork")
+        processes = []
+        for i in range(workers):
+            block = missing[i * len(missing) // workers:(i + 1) * len(missing) // workers]
+            processes.append(context.Process(target=self.draw_frames, args=(block,)))
+            processes[-1].start()
+        failed = 0
+        for process in processes:
+            process.join()
+            if process.exitcode != 0:
+                failed += 1
+        if failed:
+            raise RuntimeError("%i of the %i animation workers failed" % (failed, workers))
+        return names
+
+    def stream_frames(self, frames, output, workers=1):
+        """
+        Renders 'frames' and writes their images in order to output (an FFMPEGPipe), without
+        going through png files. Workers take every workers-th frame and send their images back
+        """
+        workers = max(1, min(workers, len(frames)))
+        if "fork" not in multiprocessing.get_all_start_methods():
+            workers = 1
+        if workers == 1:
+            self.draw_frames(frames, output.write)
+            return
+        context = multiprocessing.get_context("fork")
+        processes = []
+        connections = []
+        for i in range(workers):
+            receiver, sender = context.Pipe(duplex=False)
+            processes.append(context.Process(target=self.draw_frames, args=(frames[i::workers], sender.send)))
+            processes[-1].start()
+            sender.close()
+            connections.append(receiver)
+        try:
+            for i in range(len(frames)):
+                output.write(connections[i % workers].recv())
+        except EOFError:
+            raise RuntimeError("An animation worker failed")
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+    def draw_frames(self, frames, write=None):
+        """
+        Replots the animated displays on a new offscreen canvas and renders 'frames' in order,
+        so that a frame is the same whichever process draws it. Frames go to their png file,
+        or their image is passed to write
+        """
+        controller = self.controller
+        dims = controller.canvas_info
+        canvas = vcs.init(bg=True, geometry={"width": dims["width"], "height": dims["height"]})
+        try:
+            vcs_self = controller.vcs_self
+            canvas.setcolormap(vcs_self.getcolormapname())
+            canvas.setantialiasing(vcs_self.getantialiasing())
+            # canvas level settings, so that the frames look like the ones drawn on vcs_self
+            canvas.backgroundcolor = vcs_self.backgroundcolor
+            canvas.logo_transparentcolor = vcs_self.logo_transparentcolor
+            canvas.enableLogo = vcs_self.enableLogo
+            canvas.drawLogo = vcs_self.drawLogo
+            controller.plot_to_canvas(canvas, vcs_self.display_names, bg=1)
+            for frame_num in frames:
+                update_input(canvas, controller._number_of_dims_used_for_plot, frame_num, update=False)
+                if write is None:
+                    canvas.png(self.get_frame_name(frame_num))
+                else:
+                    write(frame_image(canvas))
+        finally:
+            canvas.clear()
+            canvas.close()
+
     def describe(self):
         for info in self.controller.animate_info:
             disp = info[0]
@@ -199,10 +341,15 @@ class VTKAnimate(animate_helper.AnimationController):
             parg.append(d._template_origin)
             parg.append(d.g_type)
             parg.append(d.g_name)
+            # same keywords as the replot of VTKVCSBackend.configureEvent
             karg = {}
             karg.update(kargs)
             if d.ratio is not None:
-                karg.update({"ratio": d.ratio})
+                karg["ratio"] = d.ratio
+            if d.lod is not None:
+                karg["lod"] = d.lod
+            karg["continents"] = d.continents
+            karg["continents_line"] = d.continents_line
 
             canvas.plot(*parg, **karg)
 
@@ -321,15 +468,48 @@ class VTKAnimate(animate_helper.AnimationController):
             if main_window_png or self.playback_params.zoom_factor != 1:
                 png_name = self.create_thread.get_frame_name(self.frame_num)
                 self.vcs_self.png(png_name)
-                self.animation_files = sorted(
-                    glob.glob(
-                        os.path.join(
-                            os.path.dirname(png_name),
-                            "*.png")))
+                self.create_thread.add_frame_file(png_name)
 
         if self.signals is not None:
             self.signals.drawn.emit(self.frame_num)
 
+    def save(self, movie, bitrate=1024, rate=None, options=None, workers=None, frames=False):
+        """Save animation to a file, the missing frames are rendered by 'workers'
+        processes (defaults to the workers() setting)
+
+        Unless frames is True (or all the frames are already on disk) the frames are
+        piped to ffmpeg as raw images, without writing the png files, a RuntimeError
+        is raised if ffmpeg fails. As in Canvas.ffmpeg, bitrate is ignored"""
+        if not self.created():
+            return
+        if workers is None:
+            workers = self.create_params.workers()
+        all_frames = list(range(self.number_of_frames()))
+        on_disk = len(self.animation_files) == len(all_frames)
+        if frames or on_disk:
+            self.animation_files = self.create_thread.render_frames(all_frames, workers)
+            super(VTKAnimate, self).save(movie, bitrate, rate, options)
+            return
+        if rate is None:
+            rate = self.playback_params.fps()
+        output = FFMPEGPipe(movie, rate, options)
+        try:
+            self.create_thread.stream_frames(all_frames, output, workers)
+        except Exception:
+            # ffmpeg exiting early breaks the pipe, its exit code tells why
+            if not output.close():
+                raise
+        result = output.close()
+        if result:
+            raise RuntimeError("ffmpeg failed to encode %s (exit code %i)" % (movie, result))
+
+    def close(self, preserve_pngs=False):
+        # saving streams the frames, render the pngs that are asked for
+        if preserve_pngs and self.created() and self.create_thread is not None:
+            self.create_thread.render_frames(list(range(self.number_of_frames())),
+                                             self.create_params.workers())
+        return super(VTKAnimate, self).close(preserve_pngs)
+
     def stop(self):
         super(VTKAnimate, self).stop()
         self.reclaim_renderers()
@@ -1,9 +1,9 @@
-import cdutil
 import warnings
 import vtk
 from vtk.util import numpy_support as VN
 import vcs
 from . import vcs2vtk
+from . import dataStatistics
 import numpy
 import math
 import os
@@ -13,6 +13,7 @@ import cdms2
 import cdtime
 import inspect
 import json
+import collections
 import subprocess
 import tempfile
 import shutil
@@ -26,16 +27,6 @@ def _makeEven(val):
     return val
 
 
-def updateNewElementsDict(display, master):
-    newelts = getattr(display, "newelements", {})
-    for key in newelts:
-        if key in master:
-            master[key] += newelts[key]
-        else:
-            master[key] = newelts[key]
-    return master
-
-
 class ImageDataWrapperItem(object):
     def __init__(self, image, scale=1.0, offset=[0.0, 0.0]):
         self.scale = scale
@@ -257,6 +248,9 @@ class VTKVCSBackend(object):
         self.antialiasing = 8
 
         self.popupInfoContextArea = None
+        # Canvas.batch nesting depth, renders are held back while > 0
+        self._renderHolds = 0
+        self._renderPending = False
 
         if renWin is not None:
             self.renWin = renWin
@@ -313,6 +307,132 @@ class VTKVCSBackend(object):
             self.configureEvent(caller, evt)
             self.renderWindowSize = window_size
 
+    def getCellLocator(self, display):
+        """Returns a cell locator over the display's vtk_backend_grid.
+        It is built once and reused until the grid changes."""
+        dataset = display.backend['vtk_backend_grid']
+        cached = display.backend.get('vtk_backend_cell_locator')
+        if cached is None or cached[0] is not dataset:
+            cellLocator = vtk.vtkCellLocator()
+            cellLocator.SetDataSet(dataset)
+            cellLocator.BuildLocator()
+            cached = (dataset, cellLocator)
+            display.backend['vtk_backend_cell_locator'] = cached
+        return cached[1]
+
+    def getProbeFilter(self, display):
+        """Returns a vtkProbeFilter over the display's vtk_backend_grid,
+        giving the id of the cell containing each probed point ("CellIds").
+        It is built once and reused until the grid changes."""
+        dataset = display.backend['vtk_backend_grid']
+        cached = display.backend.get('vtk_backend_probe_filter')
+        if cached is None or cached[0] is not dataset:
+            source = dataset.NewInstance()
+            source.ShallowCopy(dataset)
+            cellIds = vcs2vtk.numpy_to_vtk_wrapper(numpy.arange(dataset.GetNumberOfCells()), deep=True,
+                                                   array_type=vtk.VTK_ID_TYPE)
+            cellIds.SetName("CellIds")
+            source.GetCellData().AddArray(cellIds)
+            probeFilter = vtk.vtkProbeFilter()
+            probeFilter.SetSourceData(source)
+            if hasattr(vtk, "vtkCellLocatorStrategy"):
+                # find the cells with the cached locator instead of
+                # building one on each probe
+                strategy = vtk.vtkCellLocatorStrategy()
+                strategy.SetCellLocator(self.getCellLocator(display))
+                probeFilter.SetFindCellStrategy(strategy)
+            # point ids of the cells, computed on the first point data probe
+            cached = [dataset, probeFilter, None]
+            display.backend['vtk_backend_probe_filter'] = cached
+        return cached[1]
+
+    def probe(self, display, xs, ys, screen=False):
+        """Values and lon/lat at world (or screen if 'screen') coordinates
+        xs, ys of a display, see Canvas.probe"""
+        dataset = display.backend.get('vtk_backend_grid')
+        if display.array[0] is None or dataset is None:
+            raise RuntimeError("Display %s has no data to probe" % display.name)
+        globalIds = dataset.GetCellData().GetGlobalIds()
+        if not globalIds:
+            raise RuntimeError("Display %s has no GlobalIds, cannot probe it" % display.name)
+        xs = numpy.ravel(numpy.asarray(xs, dtype=numpy.float64))
+        ys = numpy.ravel(numpy.asarray(ys, dtype=numpy.float64))
+        if len(xs) != len(ys):
+            raise ValueError("xs and ys must have the same length")
+        if screen:
+            # See leftButtonPressEvent: the first item knows the screen to
+            # world transformation once rendered. It is affine, map the
+            # window corners and apply it to all the points at once
+            self.renWin.Render()
+            item = display.backend['vtk_backend_actors'][0][0]
+            width, height = self.renWin.GetSize()
+            corners = [item.MapFromScene(vtk.vtkVector2f(x, y))
+                       for x, y in [(0, 0), (width, 0), (0, height)]]
+            origin, right, top = [numpy.array([c[0], c[1]], dtype=numpy.float64) for c in corners]
+            world = origin + numpy.outer(xs / width, right - origin) + \
+                numpy.outer(ys / height, top - origin)
+            xs = world[:, 0]
+            ys = world[:, 1]
+
+        probeFilter = self.getProbeFilter(display)
+        queryPoints = vtk.vtkPoints()
+        queryPoints.SetDataTypeToDouble()
+        queryPoints.SetData(vcs2vtk.numpy_to_vtk_wrapper(
+            numpy.column_stack((xs, ys, numpy.zeros(len(xs)))), deep=True))
+        query = vtk.vtkPolyData()
+        query.SetPoints(queryPoints)
+        probeFilter.SetInputData(query)
+        probeFilter.Update()
+        probed = probeFilter.GetOutput().GetPointData()
+        found = VN.vtk_to_numpy(probed.GetArray(probeFilter.GetValidPointMaskArrayName())) != 0
+        cellIds = VN.vtk_to_numpy(probed.GetArray("CellIds")).astype(numpy.int64)
+        elementIds = numpy.zeros(len(xs), dtype=numpy.int64)
+        elementIds[found] = VN.vtk_to_numpy(globalIds)[cellIds[found]]
+
+        attributes = dataset.GetCellData().GetScalars()
+        if (attributes is None):
+            attributes = dataset.GetCellData().GetVectors()
+        if (attributes is None):
+            # point dataset, value of the closest point of the cell
+            cached = display.backend['vtk_backend_probe_filter']
+            if cached[2] is None:
+                cached[2] = vcs2vtk.cellConnectivity(dataset)
+            offsets, connectivity = cached[2]
+            inside = numpy.flatnonzero(found)
+            if len(inside):
+                cells = cellIds[inside]
+                starts = offsets[cells]
+                counts = offsets[cells + 1] - starts
+                corner = numpy.arange(counts.max())
+                valid = corner < counts[:, None]
+                ids = connectivity[numpy.where(valid, starts[:, None] + corner, starts[:, None])]
+                points = VN.vtk_to_numpy(dataset.GetPoints().GetData())
+                distances = numpy.hypot(points[ids, 0] - xs[inside, None],
+                                        points[ids, 1] - ys[inside, None])
+                distances[~valid] = numpy.inf
+                elementIds[inside] = ids[numpy.arange(len(ids)), numpy.argmin(distances, axis=1)]
+            attributes = dataset.GetPointData().GetScalars()
+            if (attributes is None):
+                attributes = dataset.GetPointData().GetVectors()
+        values = VN.vtk_to_numpy(attributes)[elementIds]
+        # points outside of the data are masked
+        values = numpy.ma.masked_array(values, mask=numpy.broadcast_to(
+            ~found.reshape((-1,) + (1,) * (values.ndim - 1)), values.shape))
+
+        geoTransform = display.backend.get('vtk_backend_geo')
+        if (geoTransform):
+            lonLatPoints = vtk.vtkPoints()
+            lonLatPoints.SetDataTypeToDouble()
+            # the transform is shared with other plots, do not invert it in place
+            geoTransform.GetInverse().TransformPoints(queryPoints, lonLatPoints)
+            lonLat = VN.vtk_to_numpy(lonLatPoints.GetData())
+            lons, lats = lonLat[:, 0], lonLat[:, 1]
+        else:
+            lons, lats = xs, ys
+        lons = numpy.ma.masked_invalid(lons)
+        lats = numpy.ma.masked_invalid(lats)
+        return values, lons, lats
+
     def leftButtonPressEvent(self, obj, event):
         pipelineItems = None
         dataset = None
@@ -347,9 +467,7 @@ class VTKVCSBackend(object):
             screenPos = vtk.vtkVector2f(xy[0], xy[1])
             worldCoords = item.MapFromScene(screenPos)
 
-            cellLocator = vtk.vtkCellLocator()
-            cellLocator.SetDataSet(dataset)
-            cellLocator.BuildLocator()
+            cellLocator = self.getCellLocator(targetDisplay)
 
             testPoint = [worldCoords[0], worldCoords[1], 0.0]
             closestPoint = [0, 0, 0]
@@ -376,8 +494,6 @@ class VTKVCSBackend(object):
             elementId = globalId
 
             geoTransform = targetDisplay.backend['vtk_backend_geo']
-            if (geoTransform):
-                geoTransform.Inverse()
 
             worldCoords = [worldCoords[0], worldCoords[1], 0.0]
             lonLat = worldCoords
@@ -399,9 +515,9 @@ class VTKVCSBackend(object):
                     attributes = dataset.GetPointData().GetVectors()
                 elementId = pointId
             if (geoTransform):
-                geoTransform.InternalTransformPoint(
-                    worldCoords, lonLat)
-                geoTransform.Inverse()
+                # the transform is shared with other plots, do not
+                # invert it in place
+                lonLat = list(geoTransform.GetInverse().TransformPoint(worldCoords))
             if (float("inf") not in lonLat):
                 st += "X=%4.1f\nY=%4.1f\n" % (
                     lonLat[0], lonLat[1])
@@ -467,16 +583,9 @@ class VTKVCSBackend(object):
         plots_args = []
         key_args = []
 
-        new = {}
         original_displays = list(self.canvas.display_names)
         for dnm in self.canvas.display_names:
             d = vcs.elements["display"][dnm]
-            # displays keep a reference of objects that were internally created
-            # so that we can clean them up
-            # it is stored in display.newelements
-            # here we compile the list of all these objects
-            new = updateNewElementsDict(d, new)
-
             # Now we need to save all that was plotted so that we can replot
             # on the new sized template
             # that includes keywords passed
@@ -494,6 +603,8 @@ class VTKVCSBackend(object):
             key = {"display_name": dnm}
             if d.ratio is not None:
                 key["ratio"] = d.ratio
+            if d.lod is not None:
+                key["lod"] = d.lod
             key["continents"] = d.continents
             key["continents_line"] = d.continents_line
             key_args.append(key)
@@ -510,36 +621,11 @@ class VTKVCSBackend(object):
         # so that we can replot on same display object
         self.canvas.clear(render=False, preserve_display=True)
 
-        # replots on new sized canvas
+        # replots on new sized canvas, the objects created internally by the
+        # previous plots are reclaimed when their display is plotted again
         for i, pargs in enumerate(plots_args):
             self.canvas.plot(*pargs, render=False, **key_args[i])
 
-        # compiled updated list of all objects created internally
-        for dnm in self.canvas.display_names:
-            d = vcs.elements["display"][dnm]
-            new = updateNewElementsDict(d, new)
-
-        # Now clean the object created internally that are no longer
-        # in use
-        for e in new:
-            if e == "display":
-                continue
-            # Loop for all types
-            for k in new[e]:
-                # Loop through all elements created internally for that type
-                if k in vcs.elements[e]:
-                    found = False
-                    # Loop through all existing displays
-                    for d in list(vcs.elements["display"].values()):
-                        if d.g_type == e and d.g_name == k:
-                            # Ok this is still in use on some display
-                            found = True
-                    # object is no longer associated with any display
-                    # and it was created internally
-                    # we can safely remove it
-                    if not found:
-                        del(vcs.elements[e][k])
-
         # Only keep original displays since we replotted on them
         for dnm in self.canvas.display_names:
             if dnm not in original_displays:
@@ -596,7 +682,7 @@ class VTKVCSBackend(object):
         self.showGUI(render=False)
 
         if hasValidRenderer and self.renWin.IsDrawable() and render:
-            self.renWin.Render()
+            self.render()
         self.numberOfPlotCalls = 0
         self.logoRenderer = None
         self.createLogo()
@@ -826,6 +912,25 @@ class VTKVCSBackend(object):
     def flush(self):
         if self.renWin is not None:
             self.renWin.Render()
+            self._renderPending = False
+
+    def render(self):
+        """Renders the window, or only marks it for rendering while
+        Canvas.batch holds back the renders"""
+        if self._renderHolds > 0:
+            self._renderPending = True
+        else:
+            self.flush()
+
+    def holdRendering(self):
+        self._renderHolds += 1
+
+    def releaseRendering(self, render=True):
+        self._renderHolds = max(self._renderHolds - 1, 0)
+        if self._renderHolds == 0 and self._renderPending:
+            self._renderPending = False
+            if render:
+                self.flush()
 
     def plot(self, data1, data2, template, gtype, gname, bg, *args, **kargs):
         self.numberOfPlotCalls += 1
@@ -985,7 +1090,7 @@ class VTKVCSBackend(object):
 
         if not kargs.get("donotstoredisplay", False) and kargs.get(
                 "render", True):
-            self.renWin.Render()
+            self.render()
 
         return returned
 
@@ -1039,19 +1144,9 @@ class VTKVCSBackend(object):
         continents_path = self.canvas._continentspath(continentType)
         if continents_path is None:
             return (None, 1, 1)
-        xforward = vcs.utils.axisConvertFunctions[kargs.get(
-            'xaxisconvert', 'linear')]['forward']
-        yforward = vcs.utils.axisConvertFunctions[kargs.get(
-            'yaxisconvert', 'linear')]['forward']
-        contData = vcs2vtk.prepContinents(continents_path, xforward, yforward)
-        contData = vcs2vtk.doWrapData(contData, wc, fastClip=False)
-
-        if projection.type != "linear":
-            cpts = contData.GetPoints()
-            # we use plotting coordinates for doing the projection so
-            # that parameters such that central meridian are set correctly.
-            _, gcpts = vcs2vtk.project(cpts, projection, wc)
-            contData.SetPoints(gcpts)
+        contData = vcs2vtk.prepProjectedContinents(continents_path, wc, projection,
+                                                   kargs.get('xaxisconvert', 'linear'),
+                                                   kargs.get('yaxisconvert', 'linear'))
 
         contLine = self.canvas.getcontinentsline()
 
@@ -1084,17 +1179,13 @@ class VTKVCSBackend(object):
 
         vcs2vtk.configureContextArea(area, contBounds, geom)
 
-        color_arr = vtk.vtkUnsignedCharArray()
-        color_arr.SetNumberOfComponents(4)
+        if len(color) != 4:
+            color = [color[0], color[1], color[2], 255]
+        colors = numpy.empty((contData.GetNumberOfCells(), 4), dtype=numpy.uint8)
+        colors[:] = color
+        color_arr = vcs2vtk.numpy_to_vtk_wrapper(colors, deep=True)
         color_arr.SetName("Colors")
 
-        for i in range(contData.GetNumberOfCells()):
-            if len(color) == 4:
-                color_arr.InsertNextTypedTuple(color)
-            else:
-                color_arr.InsertNextTypedTuple(
-                    [color[0], color[1], color[2], 255])
-
         contData.GetCellData().AddArray(color_arr)
 
         # Handle line drawing properties (line width + stipple)
@@ -1118,28 +1209,12 @@ class VTKVCSBackend(object):
 
     def renderTemplate(self, tmpl, data, gm, taxis,
                        zaxis, X=None, Y=None, **kargs):
-        # view and interactive area
-        view = self.contextView
-
-        area = vtk.vtkContextArea()
-        view.GetScene().AddItem(area)
-
-        vp = self.canvas._viewport
-
-        [renWinWidth, renWinHeight] = self.renWin.GetSize()
-        geom = vtk.vtkRecti(int(round(vp[0] * renWinWidth)),
-                            int(round(vp[2] * renWinHeight)),
-                            int(round((vp[1] - vp[0]) * renWinWidth)),
-                            int(round((vp[3] - vp[2]) * renWinHeight)))
-
-        rect = vtk.vtkRectd(0.0, 0.0, float(renWinWidth), float(renWinHeight))
-
-        vcs2vtk.configureContextArea(area, rect, geom)
-
-        # ok first basic template stuff, let's store the displays
-        # because we need to return actors for min/max/mean
+        # ok first basic template stuff, the texts and boxes are collected
+        # in decorations and drawn in one pass once we know the time/z ones
+        # (we need to return actors for min/max/mean)
         kargs["taxis"] = taxis
         kargs["zaxis"] = zaxis
+        decorations = []
         displays = tmpl.plot(
             self.canvas,
             data,
@@ -1147,22 +1222,11 @@ class VTKVCSBackend(object):
             bg=self.bg,
             X=X,
             Y=Y,
+            decorations=decorations,
             **kargs)
-        returned = {}
         for d in displays:
             if d is None:
                 continue
-            texts = d.backend.get("vtk_backend_text_actors", [])
-            for t in texts:
-                # ok we had a text actor, let's see if it's min/max/mean
-                txt = t.GetInput()
-                s0 = txt.split()[0]
-                if s0 in ["Min", "Max", "Mean"]:
-                    returned["vtk_backend_%s_text_actor" % s0] = t
-                else:
-                    returned[
-                        "vtk_backend_%s_text_actor" %
-                        d.backend["vtk_backend_template_attribute"]] = t
             self.canvas.display_names.remove(d.name)
             del(vcs.elements["display"][d.name])
         # Sometimes user passes "date" as an attribute to replace date
@@ -1181,70 +1245,101 @@ class VTKVCSBackend(object):
                         taxis.units).tocomp(
                         taxis.getCalendar()))
                 # ok we have a time axis let's display the time
-                crdate = vcs2vtk.applyAttributesFromVCStmpl(tmpl, "crdate")
-                crdate.string = tstr.split()[0].replace("-", "/")
-                crtime = vcs2vtk.applyAttributesFromVCStmpl(tmpl, "crtime")
-                crtime.string = tstr.split()[1]
-                tt, to = crdate.name.split(":::")
-                tt = vcs.elements["texttable"][tt]
-                to = vcs.elements["textorientation"][to]
-                if crdate.priority > 0:
-                    actors = vcs2vtk.genTextActor(area, to=to, tt=tt)
-                    returned["vtk_backend_crdate_text_actor"] = actors[0]
-                del(vcs.elements["texttable"][tt.name])
-                del(vcs.elements["textorientation"][to.name])
-                del(vcs.elements["textcombined"][crdate.name])
-                tt, to = crtime.name.split(":::")
-                tt = vcs.elements["texttable"][tt]
-                to = vcs.elements["textorientation"][to]
-                if crtime.priority > 0:
-                    actors = vcs2vtk.genTextActor(area, to=to, tt=tt)
-                    returned["vtk_backend_crtime_text_actor"] = actors[0]
-                del(vcs.elements["texttable"][tt.name])
-                del(vcs.elements["textorientation"][to.name])
-                del(vcs.elements["textcombined"][crtime.name])
+                crdate = vcs.template.detachedText(tmpl.crdate)
+                crdate[0].string = tstr.split()[0].replace("-", "/")
+                crtime = vcs.template.detachedText(tmpl.crtime)
+                crtime[0].string = tstr.split()[1]
+                decorations += [("text", "crdate") + crdate, ("text", "crtime") + crtime]
             except:  # noqa
                 pass
         if zaxis is not None:
             try:
                 # ok we have a zaxis to draw
-                zname = vcs2vtk.applyAttributesFromVCStmpl(tmpl, "zname")
-                zname.string = zaxis.id
-                zvalue = vcs2vtk.applyAttributesFromVCStmpl(tmpl, "zvalue")
+                zname = vcs.template.detachedText(tmpl.zname)
+                zname[0].string = zaxis.id
+                zvalue = vcs.template.detachedText(tmpl.zvalue)
                 if zaxis.isTime():
-                    zvalue.string = str(zaxis.asComponentTime()[0])
+                    zvalue[0].string = str(zaxis.asComponentTime()[0])
                 else:
-                    zvalue.string = "%g" % zaxis[0]
-                tt, to = zname.name.split(":::")
-                tt = vcs.elements["texttable"][tt]
-                to = vcs.elements["textorientation"][to]
-                if zname.priority > 0:
-                    vcs2vtk.genTextActor(area, to=to, tt=tt)
-                del(vcs.elements["texttable"][tt.name])
-                del(vcs.elements["textorientation"][to.name])
-                del(vcs.elements["textcombined"][zname.name])
+                    zvalue[0].string = "%g" % zaxis[0]
+                decorations.append(("text", None) + zname)
                 if hasattr(zaxis, "units"):
-                    zunits = vcs2vtk.applyAttributesFromVCStmpl(tmpl, "zunits")
-                    zunits.string = zaxis.units
-                    if zunits.priority > 0:
-                        tt, to = zunits.name.split(":::")
-                        tt = vcs.elements["texttable"][tt]
-                        to = vcs.elements["textorientation"][to]
-                        vcs2vtk.genTextActor(area, to=to, tt=tt)
-                        del(vcs.elements["texttable"][tt.name])
-                        del(vcs.elements["textorientation"][to.name])
-                        del(vcs.elements["textcombined"][zunits.name])
-                tt, to = zvalue.name.split(":::")
-                tt = vcs.elements["texttable"][tt]
-                to = vcs.elements["textorientation"][to]
-                if zvalue.priority > 0:
-                    actors = vcs2vtk.genTextActor(area, to=to, tt=tt)
-                    returned["vtk_backend_zvalue_text_actor"] = actors[0]
-                del(vcs.elements["texttable"][tt.name])
-                del(vcs.elements["textorientation"][to.name])
-                del(vcs.elements["textcombined"][zvalue.name])
+                    zunits = vcs.template.detachedText(tmpl.zunits)
+                    zunits[0].string = zaxis.units
+                    decorations.append(("text", None) + zunits)
+                decorations.append(("text", "zvalue") + zvalue)
             except:  # noqa
                 pass
+        return self.renderDecorations(decorations, **kargs)
+
+    def renderDecorations(self, decorations, bg=False, render=False, **kargs):
+        """Draws the texts and lines collected by template.P.plot, without
+        going through Canvas.plot: the texts in one context area, the lines
+        merged into one vcs2vtk.prepLine call per projection/viewport.
+
+        'decorations' are ("text", attribute, texttable, textorientation)
+        and ("line", line) tuples of unregistered elements.
+        Returns the text actors of the template attributes (title, min, ...)
+        as "vtk_backend_<attribute>_text_actor" entries."""
+        returned = {}
+        if not decorations:
+            return returned
+        if self.bg is None:
+            self.bg = bool(bg)
+        self.createRenWin(**kargs)
+        if self.bg:
+            self.renWin.SetOffScreenRendering(True)
+
+        bounds = kargs.get("vtk_dataset_bounds_no_mask", None)
+        area = None
+        lines = collections.OrderedDict()
+        for decoration in decorations:
+            if decoration[0] == "line":
+                ln = decoration[1]
+                n = vcs2vtk.prepPrimitive(ln)
+                if ln.priority == 0 or n == 0:
+                    continue
+                key = (ln.projection, tuple(ln.viewport), tuple(ln.worldcoordinate), ln.colormap)
+                merged = lines.setdefault(key, ln)
+                if merged is not ln:
+                    for att in ["x", "y", "color", "width", "type"]:
+                        setattr(merged, "_" + att, getattr(merged, att) + getattr(ln, att)[:n])
+                continue
+
+            _, attribute, tt, to = decoration
+            if tt.priority == 0:
+                continue
+            if area is None:
+                area = vtk.vtkContextArea()
+                self.contextView.GetScene().AddItem(area)
+                [renWinWidth, renWinHeight] = self.renWin.GetSize()
+                vcs2vtk.configureContextArea(area,
+                                             vtk.vtkRectd(0.0, 0.0, float(renWinWidth), float(renWinHeight)),
+                                             vtk.vtkRecti(0, 0, renWinWidth, renWinHeight))
+            geoBounds = bounds
+            if vcs.elements["projection"][tt.projection].type != "linear":
+                plotting_bounds = kargs.get("plotting_dataset_bounds", None)
+                if plotting_bounds:
+                    newbounds = vcs2vtk.getProjectedBoundsForWorldCoords(
+                        plotting_bounds, tt.projection)
+                    if all([not math.isinf(b) for b in newbounds]):
+                        geoBounds = newbounds
+            actors = vcs2vtk.genTextActor(area, to=to, tt=tt, cmap=self.canvas.colormap,
+                                          geoBounds=geoBounds, geo=kargs.get("vtk_backend_geo", None))
+            if attribute is None:
+                continue
+            for t in actors:
+                # min/max/mean are known by their first word
+                s0 = t.GetInput().split()[:1]
+                if s0 and s0[0] in ["Min", "Max", "Mean"]:
+                    returned["vtk_backend_%s_text_actor" % s0[0]] = t
+                else:
+                    returned["vtk_backend_%s_text_actor" % attribute] = t
+
+        for ln in lines.values():
+            vcs2vtk.prepLine(self, ln, cmap=self.canvas.colormap)
+        if render:
+            self.render()
         return returned
 
     def renderColorBar(self, tmpl, levels, colors, legend, cmap,
@@ -1342,7 +1437,7 @@ class VTKVCSBackend(object):
         area.GetDrawAreaItem().AddItem(item)
 
         self.showGUI(render=False)
-        self.renWin.Render()
+        self.render()
         return
 
     def hideGUI(self):
@@ -1454,20 +1549,10 @@ class VTKVCSBackend(object):
             geometry='1600x1200'):
         raise RuntimeError("gif method not implemented in VTK backend yet")
 
-    def png(self, file, width=None, height=None,
-            units=None, draw_white_background=True, **args):
-
-        if self.renWin is None:
-            raise Exception("Nothing to dump aborting")
-
-        if not file.split('.')[-1].lower() in ['png']:
-            file += '.png'
-
-        try:
-            os.remove(file)
-        except Exception:
-            pass
-
+    def _window_image(self, width, height, rgb, render=True):
+        """Grabs the window pixels at the requested size into a
+        vtkWindowToImageFilter, returns the filter and the window size to
+        restore (None if the window was not resized)"""
         user_dims = None
 
         sz = self.renWin.GetSize()
@@ -1490,30 +1575,85 @@ x.geometry(1200,800)
 
         imgfiltr = vtk.vtkWindowToImageFilter()
         imgfiltr.SetInput(self.renWin)
-        ignore_alpha = args.get('ignore_alpha', False)
-        if ignore_alpha or draw_white_background:
+        if rgb:
             imgfiltr.SetInputBufferTypeToRGB()
         else:
             imgfiltr.SetInputBufferTypeToRGBA()
 
-        self.hideGUI()
-        self.renWin.Render()
-        self.showGUI(render=False)
+        if render:
+            self.hideGUI()
+            self.renWin.Render()
+            self.showGUI(render=False)
+            # exporting renders the page, nothing left to render for a batch
+            self._renderPending = False
+        return imgfiltr, user_dims
 
+    def _restore_size(self, user_dims):
+        if user_dims is not None:
+            self.canvas.width, self.canvas.height = user_dims
+            self.setsize(self.canvas.width, self.canvas.height)
+            self.renWin.Render()
+
+    def _png_writer(self, imgfiltr, **args):
         writer = vtk.vtkPNGWriter()
         compression = args.get('compression', 5)  # get compression from user
         writer.SetCompressionLevel(compression)  # set compression level
         writer.SetInputConnection(imgfiltr.GetOutputPort())
-        writer.SetFileName(file)
         # add text chunks to the writer
         m = args.get('metadata', {})
         for k, v in m.items():
             writer.AddText(k, json.dumps(v))
+        return writer
+
+    def png(self, file, width=None, height=None,
+            units=None, draw_white_background=True, **args):
+
+        if self.renWin is None:
+            raise Exception("Nothing to dump aborting")
+
+        if not file.split('.')[-1].lower() in ['png']:
+            file += '.png'
+
+        try:
+            os.remove(file)
+        except Exception:
+            pass
+
+        ignore_alpha = args.get('ignore_alpha', False)
+        imgfiltr, user_dims = self._window_image(
+            width, height, ignore_alpha or draw_white_background)
+
+        writer = self._png_writer(imgfiltr, **args)
+        writer.SetFileName(file)
         writer.Write()
-        if user_dims is not None:
-            self.canvas.width, self.canvas.height = user_dims
-            self.setsize(self.canvas.width, self.canvas.height)
-            self.renWin.Render()
+        self._restore_size(user_dims)
+
+    def to_buffer(self, format="rgba", width=None, height=None,
+                  draw_white_background=True, **args):
+        if self.renWin is None:
+            raise Exception("Nothing to dump aborting")
+
+        if format == "png":
+            rgb = args.get('ignore_alpha', False) or draw_white_background
+        else:
+            rgb = format == "rgb"
+        imgfiltr, user_dims = self._window_image(width, height, rgb)
+        try:
+            if format == "png":
+                writer = self._png_writer(imgfiltr, **args)
+                writer.WriteToMemoryOn()
+                writer.Write()
+                return VN.vtk_to_numpy(writer.GetResult()).tobytes()
+            imgfiltr.Update()
+            image = imgfiltr.GetOutput()
+            w, h, _ = image.GetDimensions()
+            scalars = image.GetPointData().GetScalars()
+            # vtk_to_numpy keeps a reference to the vtk array, the view stays
+            # valid after the filter is gone. VTK images start at the bottom.
+            pixels = VN.vtk_to_numpy(scalars)
+            return pixels.reshape(h, w, scalars.GetNumberOfComponents())[::-1]
+        finally:
+            self._restore_size(user_dims)
 
     def cgm(self, file):
         if self.renWin is None:
@@ -1731,25 +1871,54 @@ x.geometry(1200,800)
 
         return (xScale, yScale, xc, yc, yd, flipX, flipY)
 
+    def updateDisplay(self, display, array1, array2=None, render=True):
+        """Shows new data on a plotted display, in place when possible,
+        replotting the canvas otherwise."""
+        if not self.update_input(display.backend, array1, array2, update=False):
+            # replots the displays from their (new) arrays
+            self.update()
+        if render and self.renWin is not None:
+            self.render()
+
     def update_input(self, vtkobjects, array1, array2=None, update=True):
-        if "vtk_backend_grid" in vtkobjects:
+        """Puts new data on a plotted display, reusing its vtk pipeline.
+
+        Returns False if the plot is not fully up to date and should be
+        redone: the new data changes automatic levels (and the legend), the
+        vector legend or projected vectors, or the plot type is not updated
+        in place (1D).
+        """
+        # the arrays may have been refilled in place since last shown
+        dataStatistics.invalidate(array1)
+        dataStatistics.invalidate(array2)
+        inPlace = "vtk_backend_grid" in vtkobjects
+        if inPlace:
             # Ok ths is where we update the input data
             vg = vtkobjects["vtk_backend_grid"]
-            vcs2vtk.setArray(vg, array1.filled(0).flat, "scalar",
-                             isCellData=vg.GetCellData().GetScalars(),
-                             isScalars=True)
+            pipeline = vtkobjects.get("vtk_backend_pipeline")
+            data1 = array1
+            if pipeline is not None:
+                # same preprocessing as the plot (e.g. log10 boxfill)
+                data1, inPlace = pipeline.updateData(array1, array2)
+            # the cell locator and probe filter are rebuilt on next use
+            vtkobjects.pop("vtk_backend_cell_locator", None)
+            vtkobjects.pop("vtk_backend_probe_filter", None)
+            # vectors are put on the grid by updateData
+            vectors = pipeline is not None and (
+                "vtk_backend_glyphfilters" in vtkobjects or "vtk_backend_streamer" in vtkobjects)
+            if not vectors:
+                vcs2vtk.setArray(vg, data1.filled(0).ravel(), "scalar",
+                                 isCellData=vg.GetCellData().GetScalars(),
+                                 isScalars=True)
 
             if "vtk_backend_filter" in vtkobjects:
                 vtkobjects["vtk_backend_filter"].Update()
             if "vtk_backend_missing_mapper" in vtkobjects:
                 missingMapper, color, cellData = vtkobjects[
                     "vtk_backend_missing_mapper"]
-                missingMapper2 = vcs2vtk.putMaskOnVTKGrid(
-                    array1,
-                    vg,
-                    color,
-                    cellData,
-                    deep=False)
+                # hides the masked cells, the missing values item is
+                # left as is (updateData reports mask changes)
+                vcs2vtk.putMaskOnVTKGrid(data1, vg, None, cellData, deep=False)
             else:
                 missingMapper = None
             if "vtk_backend_contours" in vtkobjects:
@@ -1759,45 +1928,48 @@ x.geometry(1200,800)
             elif "vtk_backend_geofilters" in vtkobjects:
                 ports = vtkobjects["vtk_backend_geofilters"]
             else:
-                # Vector plot
-                # TODO: this does not work with wrapping
-                ports = vtkobjects["vtk_backend_glyphfilters"]
-                w = vcs2vtk.generateVectorArray(array1, array2, vg)
-                vg.GetPointData().AddArray(w)
-                ports[0].SetInputData(vg)
-
-            if "vtk_backend_actors" in vtkobjects:
+                # Vector and streamline items are redrawn by their pipeline
+                ports = None
+                if not vectors:
+                    inPlace = False
+                elif inPlace:
+                    inPlace = pipeline.updateVectorItems()
+
+            if ports is not None and "vtk_backend_actors" in vtkobjects:
                 i = 0
+                # cut out of the data by their pipeline
+                patternItems = vtkobjects.get("vtk_backend_pattern_items", [])
+                # Labeled contours are a different kind
+                labeled = "vtk_backend_labeled_luts" in vtkobjects
+                if labeled:
+                    luts = vtkobjects["vtk_backend_labeled_luts"]
+                    strippers = vtkobjects.setdefault("vtk_backend_strippers", {})
+                else:
+                    luts = vtkobjects["vtk_backend_luts"]
                 for a in vtkobjects["vtk_backend_actors"]:
                     beItem = a[0]
-                    if a[1] is missingMapper:
+                    if any(beItem is item for item in patternItems):
+                        continue
+                    if beItem is None:
+                        # patterned levels without a solid fill
+                        pass
+                    elif a[1] is missingMapper:
                         i -= 1
-                        mapper = missingMapper2
                     else:
-                        # Labeled contours are a different kind
-                        if "vtk_backend_luts" in vtkobjects:
-                            lut, rg = vtkobjects["vtk_backend_luts"][i]
-                            mapper = vtk.vtkPolyDataMapper()
-                        elif "vtk_backend_labeled_luts" in vtkobjects:
-                            lut, rg = vtkobjects["vtk_backend_labeled_luts"][i]
-                            mapper = vtk.vtkLabeledContourMapper()
+                        lut, rg = luts[i]
 
                         algo_i = ports[i]
                         coloring = None
                         scalarRange = None
 
                         if lut is not None:
-                            if mapper.IsA("vtkPolyDataMapper"):
-                                coloring = 'points'
-                            else:
-                                stripper = vtk.vtkStripper()
-                                stripper.SetInputConnection(
-                                    ports[i].GetOutputPort())
-                                mapper.SetInputConnection(
-                                    stripper.GetOutputPort())
-                                algo_i = stripper
-                                coloring = 'points'
-                                scalarRange = rg
+                            coloring = 'points'
+                            if labeled:
+                                if i not in strippers:
+                                    strippers[i] = vtk.vtkStripper()
+                                    strippers[i].SetInputConnection(
+                                        ports[i].GetOutputPort())
+                                algo_i = strippers[i]
 
                             if rg[2]:
                                 coloring = 'cells'
@@ -1806,6 +1978,9 @@ x.geometry(1200,800)
 
                         algo_i.Update()
                         new_pd = algo_i.GetOutput()
+                        if "vtk_backend_custom_levels" in vtkobjects:
+                            new_pd = vcs2vtk.classifyCells(
+                                new_pd, **vtkobjects["vtk_backend_custom_levels"])
 
                         beItem.SetPolyData(new_pd)
 
@@ -1830,6 +2005,8 @@ x.geometry(1200,800)
                             mappedColors.FastDelete()
 
                     i += 1
+                if patternItems:
+                    pipeline.updatePatternItems()
 
         taxis = array1.getTime()
         if taxis is not None:
@@ -1841,27 +2018,25 @@ x.geometry(1200,800)
         else:
             tstr = None
         # Min/Max/Mean
+        tmpl = vtkobjects.get("vtk_backend_template")
         for att in ["Min", "Max", "Mean", "crtime", "crdate", "zvalue"]:
             if "vtk_backend_%s_text_actor" % att in vtkobjects:
                 t = vtkobjects["vtk_backend_%s_text_actor" % att]
-                if att == "Min":
-                    t.SetInput("Min %g" % array1.min())
+                if att in ["Min", "Max", "Mean"]:
+                    # min, max and mean of the frame, computed once
+                    stats = dataStatistics.statistics(array1)
+                if tmpl is not None and att in ["Min", "Max", "Mean"]:
+                    # same text as a new plot
+                    t.SetInput(tmpl.dataAttributeString(att.lower(), array1, stats.minmax()))
+                elif att == "Min":
+                    t.SetInput("Min %g" % stats.min)
                 elif att == "Max":
-                    t.SetInput("Max %g" % array1.max())
+                    t.SetInput("Max %g" % stats.max)
                 elif att == "Mean":
                     if not inspect.ismethod(getattr(array1, 'mean')):
                         meanstring = "Mean: %s" % getattr(array1, "mean")
                     else:
-                        try:
-                            meanstring = 'Mean %.4g' % \
-                                float(cdutil.averager(array1, axis=" ".join(["(%s)" %
-                                                                             S for S in array1.getAxisIds()])))
-                        except Exception:
-                            try:
-                                meanstring = 'Mean %.4g' % array1.mean()
-                            except Exception:
-                                meanstring = 'Mean %.4g' % numpy.mean(
-                                    array1.filled())
+                        meanstring = 'Mean %.4g' % stats.mean()
                     t.SetInput(meanstring)
                 elif att == "crdate" and tstr is not None:
                     t.SetInput(tstr.split()[0].replace("-", "/"))
@@ -1876,7 +2051,8 @@ x.geometry(1200,800)
                             t.SetInput("%g" % tmp_l[0])
 
         if update:
-            self.renWin.Render()
+            self.render()
+        return inPlace
 
     def png_dimensions(self, path):
         reader = vtk.vtkPNGReader()
@@ -131,36 +131,16 @@ install_vcs._files()
 #
 #
 
+# Every type of elements is an ElementsDict, so that the elements created
+# while plotting are known without comparing the registry
+from .elementsRegistry import ElementsDict  # noqa
 elements = collections.OrderedDict()
-elements["list"] = {}
-elements["projection"] = {}
-elements["texttable"] = {}
-elements["textorientation"] = {}
-elements["textcombined"] = {}
-elements["line"] = {}
-elements["marker"] = {}
-elements["fillarea"] = {}
-elements["font"] = {}
-elements["fontNumber"] = {}
-elements["boxfill"] = {}
-elements["isofill"] = {}
-elements["isoline"] = {}
-elements["meshfill"] = {}
-elements["3d_scalar"] = {}
-elements["3d_dual_scalar"] = {}
-elements["3d_vector"] = {}
-elements["template"] = {}
-elements["taylordiagram"] = {}
-elements["1d"] = {}
-elements["vector"] = {}
-elements["streamline"] = {}
-elements["yxvsx"] = {}
-elements["xyvsy"] = {}
-elements["xvsy"] = {}
-elements["scatter"] = {}
-elements["colormap"] = {}
-elements["display"] = {}
-elements["format"] = {}
+for _typ in ["list", "projection", "texttable", "textorientation", "textcombined", "line",
+             "marker", "fillarea", "font", "fontNumber", "boxfill", "isofill", "isoline",
+             "meshfill", "3d_scalar", "3d_dual_scalar", "3d_vector", "template", "taylordiagram",
+             "1d", "vector", "streamline", "yxvsx", "xyvsy", "xvsy", "scatter", "colormap",
+             "display", "format"]:
+    elements[_typ] = ElementsDict(_typ)
 
 _protected_elements = {}
 for k in list(elements.keys()):
@@ -320,23 +300,33 @@ t = taylor.Gtd("default")
 
 
 pth = [vcs_egg_path, 'initial.attributes']
-try:
-    vcs.scriptrun(os.path.join(*pth))
-except BaseException:
-    pass
-
-for typ in list(elements.keys()):
-    elts = elements[typ]
-    for k in vcs.listelements(typ):  # let's save which elements should be saved and untouched
-        _protected_elements[typ].add(k)
-
 _dotdir, _dotdirenv = vcs.getdotdirectory()
 user_init = os.path.join(
     os.path.expanduser("~"),
     _dotdir,
     'initial.attributes')
-if os.path.exists(user_init):
-    vcs.scriptrun(user_init)
+
+# Replaying initial.attributes is slow, reuse the registry saved by a
+# previous import when none of the files changed since
+from . import elementsSnapshot  # noqa
+_snapshotKey = elementsSnapshot.snapshotKey([os.path.join(*pth), user_init])
+_snapshotRestored = elementsSnapshot.restore(_snapshotKey)
+if not _snapshotRestored:
+    _registry = elementsSnapshot.registry()
+    try:
+        vcs.scriptrun(os.path.join(*pth))
+    except BaseException:
+        pass
+
+    for typ in list(elements.keys()):
+        elts = elements[typ]
+        for k in vcs.listelements(typ):  # let's save which elements should be saved and untouched
+            _protected_elements[typ].add(k)
+
+    if os.path.exists(user_init):
+        vcs.scriptrun(user_init)
+    elementsSnapshot.save(_snapshotKey, [os.path.join(*pth), user_init], _registry)
+    del _registry
 
 canvaslist = []
 
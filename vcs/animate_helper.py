@@ -8,6 +8,7 @@ import _thread
 import threading
 import glob
 from .error import vcsError
+from . import dataStatistics
 
 
 def showerror(msg):
@@ -58,7 +59,6 @@ class animate_obj_old(vcs.bestMatch):
     ##########################################################################
     def create(self, parent=None, min=None, max=None, save_file=None,
                thread_it=1, rate=None, bitrate=None, ffmpegoptions=''):
-        from vcs import minmax
         from numpy.ma import maximum, minimum
 
         # Cannot "Run" or "Create" an animation while already creating an
@@ -111,7 +111,7 @@ class animate_obj_old(vcs.bestMatch):
                     maxv.append(-1.0e77)
                 for i in range(len(self.vcs_self.animate_info)):
                     dpy, slab = self.vcs_self.animate_info[i]
-                    mins, maxs = minmax(slab)
+                    mins, maxs = dataStatistics.minmax(slab)
                     minv[i] = float(minimum(float(minv[i]), float(mins)))
                     maxv[i] = float(maximum(float(maxv[i]), float(maxs)))
             if isinstance(min, list) or isinstance(max, list):
@@ -372,7 +372,7 @@ class animate_obj_old(vcs.bestMatch):
     ##########################################################################
     def return_animation_min_max(self):
         dpy, slab = self.vcs_self.animate_info[0]
-        return vcs.minmax(slab)
+        return dataStatistics.minmax(slab)
 
     ##########################################################################
     # Load animation from a stored Raster file.   				#
@@ -634,6 +634,17 @@ class AnimationCreateParams(vcs.bestMatch):
         self.a_min = a_min
         self.a_max = a_max
         self.axis = axis
+        self.number_of_workers = 1
+
+    def workers(self, value=None):
+        """Number of processes rendering the frames when saving the animation"""
+        if value is not None:
+            value = int(value)
+            if value < 1:
+                raise ValueError("The number of workers must be at least 1")
+            self.number_of_workers = value
+            return self
+        return self.number_of_workers
 
 
 class AnimationCreate(StoppableThread):
@@ -882,7 +893,7 @@ class AnimationController(animate_obj_old):
                 maxv.append(-1.0e77)
             for i in range(len(self.animate_info)):
                 dpy, slab = self.animate_info[i]
-                mins, maxs = vcs.minmax(slab)
+                mins, maxs = dataStatistics.minmax(slab)
                 minv[i] = float(numpy.minimum(float(minv[i]), float(mins)))
                 maxv[i] = float(numpy.maximum(float(maxv[i]), float(maxs)))
         elif (isinstance(self.create_params.a_min, list) or
@@ -1056,6 +1067,13 @@ class AnimationController(animate_obj_old):
         """
         return self.playback_params.fps(value)
 
+    def workers(self, value=None):
+        """Number of processes rendering the frames when saving the animation
+        (frames are split across processes, the files are the same)
+
+        """
+        return self.create_params.workers(value)
+
     def zoom(self, value):
         """Zoom factor for the animation"""
         self.playback_params.zoom(value)
@@ -39,8 +39,15 @@ except Exception:
     from UserDict import UserDict
 import vcs
 import copy
+import itertools
+import numpy
 from . import xmldocs
 
+# Every state of a colormap table gets a new version, copies of a table share
+# its version, so (version, colors) identifies a list of rgba values
+_versions = itertools.count()
+_cells = frozenset(range(256))
+
 
 def process_src(nm, code):
     numbers = eval(code)
@@ -53,11 +60,35 @@ def process_src(nm, code):
     cp.index.data.update(d)
 
 
-class RGB_Table(UserDict):
-    __slots__ = ["data", ]
+def cell_values(row):
+    """Returns the values of a cell as a list, integral values as ints"""
+    return [int(v) if v == int(v) else v for v in row.tolist()]
+
+
+class TableData(dict):
+    """Dictionary of the cells of a RGB_Table, writing back to the table"""
+
+    def __init__(self, table):
+        dict.__init__(self, enumerate(cell_values(row) for row in table.array))
+        self.table = table
+
+    def __setitem__(self, key, value):
+        value = self.table.store(key, value)
+        dict.__setitem__(self, int(key), value)
+
+    def update(self, *args, **kargs):
+        for key, value in dict(*args, **kargs).items():
+            self[key] = value
+
+
+class RGB_Table(UserDict, object):
+    """The 256 R,G,B,A cells (0 to 100) of a colormap, stored in the (256, 4)
+    float array ``array``. ``version`` changes with every modification.
+    Cells are returned as lists, integral values as ints."""
+    __slots__ = []
 
     def __init__(self, name, dict=None):
-        self.data = {
+        data = {
                 0: [26, 0, 32, 100], 1: [26, 0, 33, 100], 2: [26, 1, 34, 100],
                 3: [27, 1, 34, 100], 4: [27, 2, 35, 100], 5: [27, 3, 35, 100],
                 6: [27, 3, 36, 100], 7: [27, 4, 37, 100], 8: [27, 5, 37, 100],
@@ -145,16 +176,39 @@ class RGB_Table(UserDict):
                 252: [96, 90, 12, 100], 253: [97, 90, 13, 100], 254: [98, 90, 13, 100],
                 255: [99, 90, 14, 100]}
 
+        self.array = numpy.array([data[i] for i in range(256)], dtype=float)
+        self.version = next(_versions)
         self.name = name
         if dict is not None:
             self.update(dict)
 
+    def getdata(self):
+        return TableData(self)
+    data = property(getdata)
+
+    def cell(self, key):
+        """Returns key as a cell index"""
+        try:
+            if key in _cells:
+                return int(key)
+        except TypeError:
+            pass
+        raise ValueError('Cell index must be in the range 0 to 255.')
+
+    def store(self, key, value):
+        """Sets a cell without validating the value, returns it as a list"""
+        value = list(value)
+        if len(value) == 3:
+            value.append(100.)
+        self.array[int(key)] = value
+        self.version = next(_versions)
+        return value
+
     def __setitem__(self, key, value):
         if (self.name == 'default'):
             raise ValueError('You cannot modify the default colormap.')
-        if (key not in list(range(0, 256))):
-            raise ValueError('Cell index must be in the range 0 to 255.')
-        if isinstance(value, (list, tuple)):
+        key = self.cell(key)
+        if isinstance(value, (list, tuple, numpy.ndarray)):
             value = list(value)
             if len(value) not in [3, 4]:
                 raise ValueError('Must be a tuple or list of size 3 or 4')
@@ -167,12 +221,31 @@ class RGB_Table(UserDict):
         else:
             raise ValueError(
                 'Must be either a list object, tuple object, or integer value.')
-        self.data[key] = value
+        self.store(key, value)
 
     def __getitem__(self, key):
-        if (key not in list(range(0, 256))):
-            raise ValueError('Cell index must be in the range 0 to 255.')
-        return self.data[key]
+        return cell_values(self.array[self.cell(key)])
+
+    def __delitem__(self, key):
+        raise ValueError('You cannot remove a colormap cell.')
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(range(len(self.array)))
+
+    def __contains__(self, key):
+        try:
+            return key in _cells
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return repr(self.data)
+
+    def __copy__(self):
+        return copy.deepcopy(self)
 #
 #
 #############################################################################
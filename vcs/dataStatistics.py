@@ -0,0 +1,121 @@
+"""
+Statistics (min, max, count, sum, mean) of the arrays being plotted.
+
+One plot reduces the same array several times: the scalar range of the
+pipeline, the min/max/mean strings of the template, the min/max of the
+animation. The statistics of an array are computed in one pass, chunked
+over its first (animation) axis, kept as long as the array exists and
+shared by all of these. Arrays modified in place must be invalidated,
+Canvas.plot does it for the arrays it is given.
+"""
+import weakref
+import numpy
+import cdutil
+import vcs
+
+# number of values reduced at once
+CHUNK_SIZE = 2 ** 20
+
+# id(array) -> Statistics, removed when the array is garbage collected
+_cache = {}
+
+
+class Statistics(object):
+    """min, max, count (of valid values) and sum of an array, min and max
+    are numpy.ma.masked if there are no valid values"""
+    __slots__ = ["min", "max", "count", "sum", "_mean", "_data"]
+
+    def __init__(self, data):
+        self.min = numpy.ma.masked
+        self.max = numpy.ma.masked
+        self.count = 0
+        self.sum = 0.
+        self._mean = None
+        self._data = None
+        values = numpy.ma.getdata(data)
+        mask = numpy.ma.getmask(data)
+        if values.ndim == 0:
+            values = values.reshape((1,))
+            if mask is not numpy.ma.nomask:
+                mask = mask.reshape((1,))
+        frame = max(values[0].size, 1) if len(values) else 1
+        step = max(CHUNK_SIZE // frame, 1)
+        for start in range(0, len(values), step):
+            chunk = values[start:start + step]
+            if mask is not numpy.ma.nomask:
+                chunk = chunk[~mask[start:start + step]]
+            if chunk.size == 0:
+                continue
+            mn = chunk.min()
+            mx = chunk.max()
+            if self.count == 0 or mn < self.min:
+                self.min = mn
+            if self.count == 0 or mx > self.max:
+                self.max = mx
+            self.count += chunk.size
+            self.sum += float(chunk.sum(dtype=numpy.float64))
+
+    def minmax(self):
+        """Returns (min, max) as floats, like vcs.minmax"""
+        if self.count == 0:
+            return 1.E20, 1.E20
+        return float(self.min), float(self.max)
+
+    def mean(self):
+        """Returns the area weighted mean (cdutil.averager over all the axes)
+        or the mean of the valid values if it cannot be computed"""
+        if self._mean is None:
+            data = self._data() if self._data is not None else None
+            try:
+                tmp = data(squeeze=1)
+                axes = " ".join(["(%s)" % S for S in tmp.getAxisIds()])
+                self._mean = float(cdutil.averager(tmp, axis=axes))
+            except Exception:
+                if self.count == 0:
+                    return numpy.ma.masked
+                self._mean = self.sum / self.count
+        return self._mean
+
+
+def statistics(data):
+    """Returns the Statistics of data, computed once per array"""
+    if not isinstance(data, numpy.ndarray):
+        return Statistics(numpy.ma.asarray(data))
+    key = id(data)
+    stats = _cache.get(key)
+    if stats is not None and stats._data() is data:
+        return stats
+    stats = Statistics(data)
+    stats._data = weakref.ref(data, lambda ref, key=key: _forget(key, ref))
+    _cache[key] = stats
+    return stats
+
+
+def _forget(key, ref):
+    stats = _cache.get(key)
+    if stats is not None and stats._data is ref:
+        del _cache[key]
+
+
+def invalidate(data):
+    """Forgets the statistics of data (e.g. after modifying it in place)"""
+    stats = _cache.get(id(data))
+    if stats is not None and stats._data() is data:
+        del _cache[id(data)]
+
+
+def minmax(*data):
+    """vcs.minmax, using the cached statistics of arrays (alone or in a
+    list/tuple)"""
+    if len(data) == 1:
+        data = data[0]
+    if isinstance(data, numpy.ndarray):
+        return statistics(data).minmax()
+    if isinstance(data, (list, tuple)) and \
+            all(d is None or isinstance(d, numpy.ndarray) for d in data):
+        ranges = [statistics(d).minmax() for d in data
+                  if d is not None and statistics(d).count]
+        if not ranges:
+            return 1.E20, 1.E20
+        return min(r[0] for r in ranges), max(r[1] for r in ranges)
+    return vcs.minmax(data)
@@ -25,7 +25,6 @@
 #
 from . import VCS_validation_functions
 import vcs
-import tempfile
 from .xmldocs import listdoc  # noqa
 from functools import partial
 
@@ -154,6 +153,7 @@ class Dp(vcs.bestMatch):
                  "_widget",
                  "extradisplays",
                  "ratio",
+                 "lod",
                  "_display_target"
                  ]
 
@@ -255,11 +255,7 @@ class Dp(vcs.bestMatch):
         if debug:
             with self._parent._display_target_out:
                 print("Ok about to dump png")
-        tmp = tempfile.mktemp() + ".png"
-        self._parent.png(tmp)
-        f = open(tmp, "rb")
-        st = f.read()
-        f.close()
+        st = self._parent.to_buffer("png")
         if debug:
             IPython.display.display(self._parent._display_target_out)
         IPython.display.display(*widgets)
@@ -318,11 +314,7 @@ class Dp(vcs.bestMatch):
         debug = False
         if not HAVE_IPYWIDGETS:
             debug = False
-        tmp = tempfile.mktemp() + ".png"
-        self._parent.png(tmp)
-        f = open(tmp, "rb")
-        st = f.read()
-        f.close()
+        st = self._parent.to_buffer("png")
         if HAVE_IPY:
             sidecar_on = True
             if HAVE_SIDECAR:
@@ -524,6 +516,7 @@ class Dp(vcs.bestMatch):
             self._continents = 1
             self._continents_line = "default"
             self.ratio = None
+            self.lod = None
         else:
             src = vcs.elements["display"][Dp_name_src]
             self.off = src.off
@@ -536,6 +529,7 @@ class Dp(vcs.bestMatch):
             self.continents_line = src.continents_line
             self.priority = src.priority
             self.ratio = src.ratio
+            self.lod = src.lod
 
         vcs.elements["display"][self._name] = self
     ##########################################################################
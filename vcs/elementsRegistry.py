@@ -0,0 +1,126 @@
+"""
+Tracking of the vcs elements created while plotting.
+
+Plotting creates temporary elements (copies of templates and graphics
+methods, text tables...) that belong to the display it makes. Every sub
+dictionary of vcs.elements is an ElementsDict, which logs the names added
+to it while a plot is tracked, so the elements a plot created are read
+from the log instead of comparing the whole registry before and after.
+The log is emptied once no plot is tracked anymore.
+"""
+import vcs
+
+# (type, name) of the elements added while tracking
+_log = []
+# number of plots being tracked (plots nest, e.g. template decorations)
+_tracking = [0]
+_counters = {"created": 0, "reclaimed": 0}
+
+_1d_types = ["xvsy", "xyvsy", "yxvsx", "scatter"]
+
+
+class ElementsDict(dict):
+    """Elements of one type (vcs.elements[type]), logging the names added
+    while a plot is tracked"""
+
+    def __init__(self, typ, *args, **kargs):
+        dict.__init__(self, *args, **kargs)
+        self.type = typ
+
+    def __setitem__(self, name, value):
+        if _tracking[0] and name not in self:
+            _log.append((self.type, name))
+            _counters["created"] += 1
+        dict.__setitem__(self, name, value)
+
+    def setdefault(self, name, value=None):
+        if name not in self:
+            self[name] = value
+        return self[name]
+
+    def update(self, *args, **kargs):
+        for name, value in dict(*args, **kargs).items():
+            self[name] = value
+
+    def __reduce__(self):
+        return (ElementsDict, (self.type, dict(self)))
+
+
+def track():
+    """Starts logging the elements created, returns the mark to pass to
+    created and untrack"""
+    _tracking[0] += 1
+    return len(_log)
+
+
+def created(mark):
+    """Returns {type: [names]} of the elements created since mark that
+    still exist"""
+    new = {}
+    seen = set()
+    for typ, name in _log[mark:]:
+        if (typ, name) not in seen and name in vcs.elements[typ]:
+            seen.add((typ, name))
+            new.setdefault(typ, []).append(name)
+    return new
+
+
+def untrack(mark):
+    """Stops the tracking started at mark, returns created(mark)"""
+    new = created(mark)
+    _tracking[0] -= 1
+    if _tracking[0] == 0:
+        del _log[:]
+    return new
+
+
+def isTracking():
+    return _tracking[0] > 0
+
+
+def usedElements():
+    """Returns the set of (type, name) of the elements used by displays"""
+    used = set()
+    for d in vcs.elements["display"].values():
+        if d.g_type in _1d_types:
+            used.add(("1d", d.g_name))
+        used.add((d.g_type, d.g_name))
+        used.add(("template", d.template))
+        used.add(("template", getattr(d, "_template_origin", None)))
+    return used
+
+
+def reclaim(elements, used=None):
+    """Deletes the {type: [names]} elements, except displays, protected
+    elements and the ones in used (usedElements() by default).
+    Returns {type: [names]} of the elements kept because they are used."""
+    if used is None:
+        used = usedElements()
+    kept = {}
+    for typ, names in elements.items():
+        if typ == "display":
+            continue
+        registry = vcs.elements[typ]
+        protected = vcs._protected_elements[typ]
+        for name in names:
+            if name not in registry or name in protected:
+                continue
+            if (typ, name) in used:
+                kept.setdefault(typ, []).append(name)
+            else:
+                del registry[name]
+                _counters["reclaimed"] += 1
+    return kept
+
+
+def info():
+    """Returns the size of the registry and the tracking counters:
+    size (number of elements), types (number of elements per type),
+    created (elements created by plots), reclaimed (temporary elements
+    deleted automatically) and pending (log entries of tracked plots)"""
+    types = dict((typ, len(elts)) for typ, elts in vcs.elements.items())
+    return {"size": sum(types.values()),
+            "types": types,
+            "created": _counters["created"],
+            "reclaimed": _counters["reclaimed"],
+            "pending": len(_log)}
@@ -0,0 +1,165 @@
+"""
+Startup snapshot of the vcs elements registry.
+
+Replaying the initial.attributes files at import time goes through every
+validated property setter of every default element. Once done, the
+elements the files created or modified are pickled to the user's .uvcdat
+directory, keyed by a hash of the attributes files and of the vcs
+sources, so the next imports load them in one go instead.
+
+The snapshot file starts with its key on a line of its own, followed by
+the pickle, so that a stale snapshot is never unpickled. Elements that
+already exist when the snapshot is loaded (the defaults created in code)
+get the saved state in place, references to them stay valid.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import vcs
+
+_protocol = 2
+
+
+def snapshotFile():
+    """Returns the path of the snapshot in the user's .uvcdat directory"""
+    dotdir, dotdirenv = vcs.getdotdirectory()
+    fn = os.environ.get(dotdirenv, os.path.join(os.path.expanduser("~"), dotdir))
+    return os.path.join(fn, "elements.snapshot")
+
+
+def snapshotKey(scripts):
+    """Returns the snapshot key for the attributes files 'scripts'
+
+    The key changes with the content of any of the files (a missing file
+    counts), the vcs sources and the python version."""
+    h = hashlib.sha1()
+    h.update(repr((sys.version_info[:2], _protocol, vcs.vcs_egg_path)).encode("utf-8"))
+    pkg = os.path.dirname(os.path.abspath(__file__))
+    h.update(pkg.encode("utf-8"))
+    try:
+        for nm in sorted(os.listdir(pkg)):
+            if nm.endswith(".py"):
+                st = os.stat(os.path.join(pkg, nm))
+                h.update(repr((nm, st.st_size, st.st_mtime)).encode("utf-8"))
+    except OSError:
+        # zipped egg, its path changes with the version
+        pass
+    for script in scripts:
+        h.update(script.encode("utf-8"))
+        if os.path.exists(script):
+            with open(script, "rb") as f:
+                h.update(f.read())
+        else:
+            h.update(b"-")
+    return h.hexdigest()
+
+
+def registry():
+    """Returns the state of vcs.elements before the attributes files are
+    replayed, to pass to save: {type: {name: (element, pickled element)}}"""
+    state = {}
+    for typ, elts in vcs.elements.items():
+        state[typ] = {}
+        for nm, obj in elts.items():
+            try:
+                state[typ][nm] = (obj, pickle.dumps(obj, _protocol))
+            except Exception:
+                state[typ][nm] = (obj, None)
+    return state
+
+
+def restore(key):
+    """Loads the snapshot 'key' into vcs.elements and vcs._protected_elements
+
+    Returns False (and leaves the registry untouched) if there is no
+    usable snapshot for this key."""
+    try:
+        with open(snapshotFile(), "rb") as f:
+            if f.readline().rstrip(b"\n") != key.encode("ascii"):
+                return False
+            elements, protected = pickle.load(f)
+    except Exception:
+        return False
+    for typ, elts in elements.items():
+        registered = vcs.elements[typ]
+        for nm, obj in elts.items():
+            current = registered.get(nm)
+            if type(current) is type(obj) and _isElement(obj):
+                _setState(current, obj)
+            else:
+                registered[nm] = obj
+    for typ, names in protected.items():
+        vcs._protected_elements[typ].update(names)
+    return True
+
+
+def _isElement(obj):
+    return hasattr(obj, "__dict__") or hasattr(obj, "__slots__")
+
+
+def _setState(obj, saved):
+    """Gives obj the state of saved, the way unpickling it would"""
+    state = saved.__reduce_ex__(_protocol)[2]
+    setstate = getattr(obj, "__setstate__", None)
+    if setstate is not None:
+        setstate(state)
+        return
+    slots = None
+    if isinstance(state, tuple) and len(state) == 2:
+        state, slots = state
+    if state:
+        obj.__dict__.update(state)
+    if slots:
+        for k, v in slots.items():
+            setattr(obj, k, v)
+
+
+def save(key, scripts, before):
+    """Saves the elements the attributes files 'scripts' created or
+    modified since 'before' (see registry) and vcs._protected_elements
+    under 'key'
+
+    Elements that cannot be pickled (3d graphics methods hold live
+    configuration objects) are left to the defaults created at import
+    time, no snapshot is written if one of them comes from 'scripts'.
+    Errors are ignored, the snapshot is only a shortcut."""
+    elements = {}
+    skipped = set()
+    for typ, elts in vcs.elements.items():
+        elements[typ] = {}
+        previous = before.get(typ, {})
+        for nm, obj in elts.items():
+            try:
+                pickled = pickle.dumps(obj, _protocol)
+            except Exception:
+                skipped.add(type(obj).__name__)
+                continue
+            old = previous.get(nm)
+            if old is not None and old[0] is obj and old[1] == pickled:
+                continue
+            elements[typ][nm] = obj
+    try:
+        for script in scripts:
+            if skipped and os.path.exists(script):
+                with open(script) as f:
+                    if skipped.intersection(json.load(f).keys()):
+                        return False
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(snapshotFile()))
+    except Exception:
+        return False
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(key.encode("ascii") + b"\n")
+            # one pickle so that elements registered under several names
+            # are still shared once restored
+            pickle.dump((elements, vcs._protected_elements), f, _protocol)
+        # concurrent imports each write their own file, the last one wins
+        getattr(os, "replace", os.rename)(tmp, snapshotFile())
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    return True
@@ -47,7 +47,7 @@ from .Pboxeslines import *  # noqa
 from .Plegend import *  # noqa
 from .Pdata import *  # noqa
 import inspect
-import cdutil
+from . import dataStatistics
 from .projection import round_projections
 from .projection import elliptical_projections
 from .xmldocs import scriptdocs, listdoc
@@ -120,6 +120,28 @@ def epsilon_lte(a, b):
     return float_epsilon > a - b
 
 
+def detachedElement(typ, source):
+    """Returns a copy of the 'typ' element 'source' (name or object) that is
+    not registered in vcs.elements, for decorations drawn once and dropped."""
+    if isinstance(source, str):
+        source = vcs.elements[typ][source]
+    element = copy.deepcopy(source)
+    # the copy of a default element must still be modifiable
+    element._name = "__decoration__"
+    return element
+
+
+def detachedText(sub):
+    """Returns unregistered copies of the texttable and textorientation of
+    the template member 'sub', placed and prioritized like 'sub'."""
+    tt = detachedElement("texttable", sub.texttable)
+    to = detachedElement("textorientation", sub.textorientation)
+    tt.x = [sub.x]
+    tt.y = [sub.y]
+    tt.priority = sub.priority
+    return tt, to
+
+
 # read .scr file
 def process_src(nm, code):
 
@@ -1053,30 +1075,36 @@ class P(vcs.bestMatch):
     # Adding the drawing functionnality to plot all these attributes on the
     # Canvas
     def drawTicks(self, slab, gm, x, axis, number,
-                  vp, wc, bg=False, X=None, Y=None, mintic=False, **kargs):
+                  vp, wc, bg=False, X=None, Y=None, mintic=False,
+                  decorations=None, **kargs):
         """Draws the ticks for the axis x number number
         using the label passed by the graphic  method
         vp and wc are from the actual canvas, they have
         been reset when they get here...
+        The tick line and labels are appended to 'decorations' if passed,
+        drawn by the backend otherwise.
 
         .. pragma: skip-doctest TODO add example/doctest
+
+        :return: The ("text", name, texttable, textorientation) and
+            ("line", line) decorations of the ticks. They are not
+            displays, nothing is registered in vcs.elements.
+        :rtype: `list`_
         """
 
-        kargs["donotstoredisplay"] = True
         if X is None:
             X = slab.getAxis(-1)
         if Y is None:
             Y = slab.getAxis(-2)
-        displays = []
         dx = wc[1] - wc[0]
         dy = wc[3] - wc[2]
         dx = dx / (vp[1] - vp[0])
         dy = dy / (vp[3] - vp[2])
         # get the actual labels
         if mintic is False:
-            loc = copy.copy(getattr(gm, axis + 'ticlabels' + number))
+            loc = getattr(gm, axis + 'ticlabels' + number)
         else:
-            loc = copy.copy(getattr(gm, axis + 'mtics' + number))
+            loc = getattr(gm, axis + 'mtics' + number)
         # Are they set or do we need to it ?
         if (loc is None or loc == '*'):
             # well i guess we have to do it !
@@ -1092,41 +1120,34 @@ class P(vcs.bestMatch):
                 for t in list(loc.keys()):
                     loc[t] = ''
         if isinstance(loc, str):
-            loc = copy.copy(vcs.elements["list"].get(loc, {}))
-        # Make sure the label passed are not outside the world coordinates
-        dw1 = 1.E20
-        dw2 = 1.E20
-
+            loc = vcs.elements["list"].get(loc, {})
+        # Only keep the labels within the world coordinates
         if axis == 'x':
-            dw1, dw2 = wc[0], wc[1]
+            dw1, dw2 = vcs.minmax(wc[0], wc[1])
         else:
-            dw1, dw2 = wc[2], wc[3]
-        for k in list(loc.keys()):
-            if dw2 > dw1:
-                if not(dw1 <= k <= dw2):
-                    del(loc[k])
-            else:
-                if not (dw1 >= k >= dw2):
-                    del(loc[k])
+            dw1, dw2 = vcs.minmax(wc[2], wc[3])
+        values = list(loc.keys())
+        locations = numpy.array(values, dtype=float)
+        inside = numpy.flatnonzero((dw1 <= locations) & (locations <= dw2))
+        locations = locations[inside]
+        n = len(locations)
         # The ticks
         if mintic is False:
             obj = getattr(self, axis + 'tic' + number)
         else:
             obj = getattr(self, axis + 'mintic' + number)
-        # the following to make sure we have a unique name,
-        # i put them together assuming it would be faster
-        ticks = x.createline(source=obj.line)
+        ticks = detachedElement("line", obj.line)
         ticks.projection = gm.projection
         ticks.priority = obj.priority
         if mintic is False:
             # the labels
             objlabl = getattr(self, axis + 'label' + number)
-            tt = x.createtext(
-                Tt_source=objlabl.texttable,
-                To_source=objlabl.textorientation)
+            tt = detachedElement("texttable", objlabl.texttable)
+            to = detachedElement("textorientation", objlabl.textorientation)
             tt.projection = gm.projection
             tt.priority = objlabl.priority
-        if vcs.elements["projection"][gm.projection].type != "linear":
+        projection = vcs.elements["projection"][gm.projection].type
+        if projection != "linear":
             ticks.viewport = vp
             ticks.worldcoordinate = wc
             if mintic is False:
@@ -1137,12 +1158,10 @@ class P(vcs.bestMatch):
                     # In that case the if goes and only the statement stays
                     if ("ratio_autot_viewport" not in kargs):
                         tt.viewport[0] = objlabl.x
-                    if vcs.elements["projection"][
-                            tt.projection].type in round_projections:
+                    if projection in round_projections:
                         tt.priority = 0
                 else:
-                    if vcs.elements["projection"][
-                            tt.projection].type in round_projections:
+                    if projection in round_projections:
                         xmn, xmx = vcs.minmax(self.data.x1, self.data.x2)
                         ymn, ymx = vcs.minmax(self.data.y1, self.data.y2)
                         xwiden = .02
@@ -1154,7 +1173,6 @@ class P(vcs.bestMatch):
                         vp = [
                             max(0., xmn), min(xmx, 1.), max(0, ymn), min(ymx, 1.)]
                         tt.viewport = vp
-                        pass
                     else:
                         tt.viewport = vp
                         # TODO: Transform axes names through geographic projections
@@ -1162,95 +1180,56 @@ class P(vcs.bestMatch):
                         if ("ratio_autot_viewport" not in kargs):
                             tt.viewport[2] = objlabl.y
 
-        # initialize the list of values
-        tstring = []
-        xs = []
-        ys = []
-        tys = []
-        txs = []
-        loc2 = loc
-        if mintic is False:
-            loc = getattr(gm, axis + 'ticlabels' + number)
+        # set the x/y/text values of all the ticks at once, one [start, end]
+        # segment per tick, and one label position per tick
+        if axis == 'x' and projection in elliptical_projections:
+            n = 0
+        if axis == 'x':
+            if projection == "linear":
+                txs = (locations - wc[0]) / dx + vp[0]
+                xs = numpy.repeat(txs[:, None], 2, axis=1)
+                ys = numpy.tile([obj.y1, obj.y2], (n, 1))
+                if mintic is False:
+                    tys = numpy.repeat(float(objlabl.y), n)
+            else:
+                txs = locations
+                xs = numpy.repeat(txs[:, None], 2, axis=1)
+                end = wc[2] + (wc[3] - wc[2]) * (obj.y2 - obj.y1) / \
+                    (self.data._y2 - self._data.y1)
+                ys = numpy.tile([wc[2], end], (n, 1))
+                tys = numpy.repeat(float(wc[3]), n)
         else:
-            loc = getattr(gm, axis + "mtics" + number)
-        if loc == '*' or loc is None:
-            loc = loc2
-        if isinstance(loc, str):
-            loc = vcs.elements["list"].get(loc, {})
-        # set the x/y/text values
-        xmn, xmx = vcs.minmax(wc[0], wc[1])
-        ymn, ymx = vcs.minmax(wc[2], wc[3])
-        for l_tmp in list(loc.keys()):
-            if axis == 'x':
-                if xmn <= l_tmp <= xmx:
-                    if vcs.elements["projection"][
-                            gm.projection].type == "linear":
-                        xs.append(
-                            [(l_tmp - wc[0]) / dx +
-                                vp[0], (l_tmp - wc[0]) / dx +
-                                vp[0]])
-                        ys.append([obj.y1, obj.y2])
-                        if mintic is False:
-                            txs.append((l_tmp - wc[0]) / dx + vp[0])
-                            tys.append(objlabl.y)
-                    elif vcs.elements["projection"][gm.projection].type in elliptical_projections:
-                        pass
-                    else:
-                        xs.append([l_tmp, l_tmp])
-                        end = wc[
-                            2] + (wc[3] - wc[2]) *\
-                            (obj.y2 - obj.y1) /\
-                            (self.data._y2 - self._data.y1)
-                        ys.append([wc[2], end])
-                        if mintic is False:
-                            txs.append(l_tmp)
-                            tys.append(wc[3])
-                    if mintic is False:
-                        tstring.append(loc[l_tmp])
-            elif axis == 'y':
-                if ymn <= l_tmp <= ymx:
-                    if vcs.elements["projection"][
-                            gm.projection].type == "linear":
-                        ys.append(
-                            [(l_tmp - wc[2]) / dy +
-                                vp[2], (l_tmp - wc[2]) / dy + vp[2]])
-                        xs.append([obj.x1, obj.x2])
-                        if mintic is False:
-                            tys.append((l_tmp - wc[2]) / dy + vp[2])
-                            txs.append(objlabl.x)
-                    else:
-                        ys.append([l_tmp, l_tmp])
-                        end = wc[
-                            0] + (wc[1] - wc[0]) *\
-                            (obj._x2 - obj._x1) /\
-                            (self._data._x2 - self._data.x1)
-                        if vcs.elements["projection"][
-                            gm.projection].type != "linear" and\
-                                end < -180.:
-                            end = wc[0]
-                        xs.append([wc[0], end])
-                        if mintic is False:
-                            tys.append(l_tmp)
-                            txs.append(wc[0])
-                    if mintic is False:
-                        tstring.append(loc[l_tmp])
-        if mintic is False and txs != []:
-            tt.string = tstring
-            tt.x = txs
-            tt.y = tys
-            displays.append(x.text(tt, bg=bg, ratio="none", **kargs))
-        if xs != []:
-            ticks._x = xs
-            ticks._y = ys
-            displays.append(x.line(ticks, bg=bg, **kargs))
-
-        del(vcs.elements["line"][ticks.name])
-        if mintic is False:
-            sp = tt.name.split(":::")
-            del(vcs.elements["texttable"][sp[0]])
-            del(vcs.elements["textorientation"][sp[1]])
-            del(vcs.elements["textcombined"][tt.name])
-        return displays
+            if projection == "linear":
+                tys = (locations - wc[2]) / dy + vp[2]
+                ys = numpy.repeat(tys[:, None], 2, axis=1)
+                xs = numpy.tile([obj.x1, obj.x2], (n, 1))
+                if mintic is False:
+                    txs = numpy.repeat(float(objlabl.x), n)
+            else:
+                tys = locations
+                ys = numpy.repeat(tys[:, None], 2, axis=1)
+                end = wc[0] + (wc[1] - wc[0]) * (obj._x2 - obj._x1) / \
+                    (self._data._x2 - self._data.x1)
+                if end < -180.:
+                    end = wc[0]
+                xs = numpy.tile([wc[0], end], (n, 1))
+                txs = numpy.repeat(float(wc[0]), n)
+
+        ticksAndLabels = []
+        if mintic is False and n > 0:
+            tt.string = [loc[values[i]] for i in inside]
+            tt.x = txs[:n].tolist()
+            tt.y = tys[:n].tolist()
+            ticksAndLabels.append(("text", None, tt, to))
+        if n > 0:
+            ticks._x = xs[:n].tolist()
+            ticks._y = ys[:n].tolist()
+            ticksAndLabels.append(("line", ticks))
+        if decorations is not None:
+            decorations += ticksAndLabels
+        elif ticksAndLabels:
+            x.backend.renderDecorations(ticksAndLabels, bg=bg, **kargs)
+        return ticksAndLabels
 
     def blank(self, attribute=None):
         """This function turns off elements of a template object.
@@ -1620,6 +1599,32 @@ class P(vcs.bestMatch):
                                                    strings, scratched, stringscolors, stacking, bg,
                                                    render, smallestfontsize, backgroundcolor)
 
+    def dataAttributeString(self, s, slab, minmax=None):
+        """Returns the text drawn for the data attribute 's' of 'slab'
+        (e.g. 'min', 'max', 'mean', 'title'), minmax is vcs.minmax(slab)
+        if already known."""
+        if s in ["min", "max"]:
+            if minmax is None:
+                minmax = dataStatistics.minmax(slab)
+            fmt = getattr(self, s).format
+            if fmt == "default":  # backward compatibility
+                fmt = ":g"
+            value = minmax[0] if s == "min" else minmax[1]
+            return '{} {}'.format(s.capitalize(), applyFormat(value, fmt))
+        elif s == 'mean':
+            fmt = self.mean.format
+            if fmt == "default":  # backward compatibility
+                fmt = ":.4g"
+            if not inspect.ismethod(getattr(slab, 'mean')):
+                meanstring = getattr(slab, s)
+            else:
+                meanstring = dataStatistics.statistics(slab).mean()
+            return "Mean {}".format(applyFormat(meanstring, fmt))
+        sub = self.dataname if s == "id" else getattr(self, s)
+        if hasattr(sub, "format"):
+            return applyFormat(getattr(slab, s), sub.format)
+        return str(getattr(slab, s))
+
     def drawAttributes(self, x, slab, gm, bg=False, **kargs):
         """Draws attributes of slab onto a canvas
 
@@ -1641,10 +1646,20 @@ class P(vcs.bestMatch):
 
         :param slab: slab to get attributes from
         :type slab: cdms2.tvariable.TransientVariable or numpy.ndarray
+
+        :return: The ("text", name, texttable, textorientation) decorations
+            of the attributes. The texts are drawn by the backend, they are
+            not displays and nothing is registered in vcs.elements.
+        :rtype: `list`_
         """
-        displays = []
+        # texts are collected in 'decorations' when the template is being
+        # plotted and drawn by the backend in one pass
+        decorations = kargs.pop("decorations", None)
+        own = decorations is None
+        if own:
+            decorations = []
         # figures out the min and max and set them as atributes...
-        smn, smx = vcs.minmax(slab)
+        smn, smx = dataStatistics.minmax(slab)
 
         attributes = ['file', 'function', 'logicalmask', 'transformation',
                       'source', 'id', 'title', 'units', 'crdate', 'crtime',
@@ -1656,6 +1671,7 @@ class P(vcs.bestMatch):
         if isinstance(gm, vcs.taylor.Gtd):
             attributes = attributes[:-5]
 
+        drawn = []
         # loop through various section of the template object
         for s in attributes:
             if hasattr(slab, s):
@@ -1663,67 +1679,16 @@ class P(vcs.bestMatch):
                     sub = self.dataname
                 else:
                     sub = getattr(self, s)
-                tt = x.createtext(
-                    None,
-                    sub.texttable,
-                    None,
-                    sub.textorientation)
-
-                # Now for the min/max/mean add the name in front
-                kargs["donotstoredisplay"] = False
-                if s == 'min':
-                    fmt = self.min.format
-                    if fmt == "default":  # backward compatibility
-                        fmt = ":g"
-                    tt.string = 'Min {}'.format(applyFormat(smn, fmt))
-                elif s == 'max':
-                    fmt = self.max.format
-                    if fmt == "default":  # backward compatibility
-                        fmt = ":g"
-                    tt.string = 'Max {}'.format(applyFormat(smx, fmt))
-                elif s == 'mean':
-                    fmt = self.mean.format
-                    if fmt == "default":  # backward compatibility
-                        fmt = ":.4g"
-                    if not inspect.ismethod(getattr(slab, 'mean')):
-                        meanstring = getattr(slab, s)
-                    else:
-                        try:
-                            tmp = slab(squeeze=1)
-                            meanstring = float(cdutil.averager(tmp,
-                                                               axis=" ".join(["(%s)" %
-                                                                              S for S in tmp.getAxisIds()])))
-                        except Exception:
-                            try:
-                                meanstring = slab.mean()
-                            except Exception:
-                                meanstring = slab.filled()
-                    tt.string = "Mean {}".format(applyFormat(meanstring, fmt))
-                else:
-                    if hasattr(sub, "format"):
-                        tt.string = applyFormat(getattr(slab, s), sub.format)
-                    else:
-                        tt.string = str(getattr(slab, s))
-                    kargs["donotstoredisplay"] = False
-                tt.x = [sub.x]
-                tt.y = [sub.y]
-                tt.priority = sub.priority
+                tt, to = detachedText(sub)
+                tt.string = self.dataAttributeString(s, slab, (smn, smx))
                 # this is text such as variable name, min/max
                 # that does not have to follow ratio=atot
-                dp = x.text(tt, bg=bg, **kargs)
-                if dp is not None:
-                    if s != "id":
-                        dp.backend["vtk_backend_template_attribute"] = s
-                    else:
-                        dp.backend[
-                            "vtk_backend_template_attribute"] = "dataname"
-                    displays.append(dp)
-                sp = tt.name.split(":::")
-                if kargs.get("donotstoredisplay", True):
-                    del(vcs.elements["texttable"][sp[0]])
-                    del(vcs.elements["textorientation"][sp[1]])
-                    del(vcs.elements["textcombined"][tt.name])
-        return displays
+                drawn.append(("text", s if s != "id" else "dataname", tt, to))
+        decorations += drawn
+        if own:
+            kargs.setdefault("render", True)
+            x.backend.renderDecorations(decorations, bg=bg, **kargs)
+        return drawn
 
     def plot(self, x, slab, gm, bg=False, min=None,
              max=None, X=None, Y=None, **kargs):
@@ -1746,7 +1711,12 @@ class P(vcs.bestMatch):
         x._worldcoordinate = [0, 1, 0, 1]
         # x.mode=0 # this should disable the replot but it doesn't work....
 
-        displays += self.drawAttributes(x, slab, gm, bg=bg, **kargs)
+        # titles, axis names and boxes are drawn together at the end
+        decorations = kargs.pop("decorations", None)
+        own = decorations is None
+        if own:
+            decorations = []
+        self.drawAttributes(x, slab, gm, bg=bg, decorations=decorations, **kargs)
 
         kargs["donotstoredisplay"] = True
         if not isinstance(gm, vcs.taylor.Gtd):
@@ -1760,11 +1730,7 @@ class P(vcs.bestMatch):
                 for att in ["name", "units", "value"]:
                     nm = nms[i] + att
                     sub = getattr(self, nm)
-                    tt = x.createtext(
-                        None,
-                        sub.texttable,
-                        None,
-                        sub.textorientation)
+                    tt, to = detachedText(sub)
                     if att == "name":
                         if i == 0 and gm.g_name == "G1d":
                             if gm.flip or hasattr(slab, "_yname"):
@@ -1780,16 +1746,9 @@ class P(vcs.bestMatch):
                             tt.string = [ax.id]
                     elif att == "units":
                         tt.string = [getattr(ax, "units", "")]
-                    tt.x = [sub.x, ]
-                    tt.y = [sub.y, ]
-                    tt.priority = sub._priority
                     # This is the name of the axis. It should be transformed
                     # through geographic projection but it is not at the moment
-                    displays.append(x.text(tt, bg=bg, **kargs))
-                    sp = tt.name.split(":::")
-                    del(vcs.elements["texttable"][sp[0]])
-                    del(vcs.elements["textorientation"][sp[1]])
-                    del(vcs.elements["textcombined"][tt.name])
+                    decorations.append(("text", None, tt, to))
 
         if X is None:
             X = slab.getAxis(-1)
@@ -1805,18 +1764,19 @@ class P(vcs.bestMatch):
             for axis in ["x", "y"]:
                 for number in ["1", "2"]:
                     for mintic in [False, True]:
-                        displays += self.drawTicks(slab,
-                                                   gm,
-                                                   x,
-                                                   axis=axis,
-                                                   number=number,
-                                                   vp=vp2,
-                                                   wc=wc2,
-                                                   bg=bg,
-                                                   X=X,
-                                                   Y=Y,
-                                                   mintic=mintic,
-                                                   **kargs)
+                        self.drawTicks(slab,
+                                       gm,
+                                       x,
+                                       axis=axis,
+                                       number=number,
+                                       vp=vp2,
+                                       wc=wc2,
+                                       bg=bg,
+                                       X=X,
+                                       Y=Y,
+                                       mintic=mintic,
+                                       decorations=decorations,
+                                       **kargs)
 
         if X is None:
             X = slab.getAxis(-1)
@@ -1831,7 +1791,7 @@ class P(vcs.bestMatch):
             for num in ["1", "2"]:
                 e = getattr(self, tp + num)
                 if e.priority != 0:
-                    ln_tmp = x.createline(source=e.line)
+                    ln_tmp = detachedElement("line", e.line)
                     if hasattr(gm, "projection"):
                         ln_tmp.projection = gm.projection
                     if vcs.elements["projection"][
@@ -1865,8 +1825,10 @@ class P(vcs.bestMatch):
                         ln_tmp._x = [e._x1, e._x2, e._x2, e._x1, e._x1]
                         ln_tmp._y = [e._y1, e._y1, e._y2, e._y2, e._y1]
                     ln_tmp._priority = e._priority
-                    displays.append(x.plot(ln_tmp, bg=bg, ratio="none", **kargs))
-                    del(vcs.elements["line"][ln_tmp.name])
+                    decorations.append(("line", ln_tmp))
+
+        if own:
+            x.backend.renderDecorations(decorations, bg=bg, **kargs)
 
         # x.mode=m
         # I think i have to use dict here because it's a valid value
@@ -323,6 +323,18 @@ class G1d(vcs.bestMatch):
                     yxx.markersize=300
                     yxx.markersize=None
 
+            * To plot very long series faster, keeping about two points per pixel
+              of the line (markers are still drawn at every point):
+
+                .. code-block:: python
+
+                    # min and max of each pixel column
+                    yxx.decimate='minmax'
+                    # Largest Triangle Three Buckets
+                    yxx.decimate='lttb'
+                    # Plot all points (default)
+                    yxx.decimate=None
+
     %s
     %s
     %s
@@ -359,6 +371,7 @@ class G1d(vcs.bestMatch):
         '_datawc_calendar',
         '_flip',
         '_smooth',
+        '_decimate',
     ]
 
     def _getname(self):
@@ -643,6 +656,18 @@ class G1d(vcs.bestMatch):
         None,
         "beta parameter for kaiser smoothing")
 
+    def _getdecimate(self):
+        return self._decimate
+
+    def _setdecimate(self, value):
+        value = VCS_validation_functions.checkDecimate(self, "decimate", value)
+        self._decimate = value
+    decimate = property(
+        _getdecimate,
+        _setdecimate,
+        None,
+        "None, 'minmax' or 'lttb', reduces the line of long series to about two points per pixel")
+
     def _gtype(self):
         if self.flip:
             return "xyvsy"
@@ -667,6 +692,7 @@ class G1d(vcs.bestMatch):
         self._name = name
         if name == 'default':
             self._smooth = None
+            self._decimate = None
             self._flip = False
             self._projection = "linear"
             self._xticlabels1 = "*"
@@ -703,7 +729,8 @@ class G1d(vcs.bestMatch):
             for att in ['projection', 'colormap', 'xticlabels1', 'xticlabels2', 'xmtics1', 'xmtics2',
                         'yticlabels1', 'yticlabels2', 'ymtics1', 'ymtics2', 'datawc_y1', 'datawc_y2', 'datawc_x1',
                         'datawc_x2', 'xaxisconvert', 'yaxisconvert', 'linetype', 'linecolor', 'linewidth', 'marker',
-                        'markercolor', 'markersize', 'datawc_timeunits', 'datawc_calendar', 'smooth', 'flip']:
+                        'markercolor', 'markersize', 'datawc_timeunits', 'datawc_calendar', 'smooth', 'flip',
+                        'decimate']:
                 setattr(self, att, getattr(src, att))
         # Ok now we need to stick in the elements
         vcs.elements["1d"][name] = self
@@ -776,6 +803,7 @@ class G1d(vcs.bestMatch):
         print("markercolor = ", self.markercolor)
         print("markersize = ", self.markersize)
         print("flip = ", self.flip)
+        print("decimate = ", self.decimate)
     list.__doc__ = xmldocs.listdoc.format(name="1d", parent="'default'")
 
     ###########################################################################
@@ -893,6 +921,7 @@ class G1d(vcs.bestMatch):
             fp.write("%s.markercolor = %s\n" % (unique_name, self.markercolor))
             fp.write("%s.markersize = %s\n\n" % (unique_name, self.markersize))
             fp.write("%s.flip = %s\n\n" % (unique_name, repr(self.flip)))
+            fp.write("%s.decimate = %s\n\n" % (unique_name, repr(self.decimate)))
             if self.colormap is not None:
                 fp.write("%s.colormap = %s\n\n" % (unique_name, repr(self.colormap)))
             else:
@@ -2195,21 +2195,12 @@ def match_color(color, colormap=None):
     # Now gets the colormap to look in
     if colormap is None:
         colormap = 'default'
-    cmap = vcs.getcolormap(colormap)
-
-    # Now tries determines the min rms diff
-    rmsmin = 2.E40
-    match = None
-    for i in list(cmap.index.keys()):
-        col = cmap.index[i]
-        rms = numpy.sqrt((vals[0] - col[0]) ** 2 +
-                         (vals[1] - col[1]) ** 2 +
-                         (vals[2] - col[2]) ** 2
-                         )
-        if rms < rmsmin:
-            rmsmin = rms
-            match = i
-    return match
+    if isinstance(colormap, basestring):
+        colormap = vcs.getcolormap(colormap)
+
+    # Now determines the min rms diff
+    diff = colormap.index.array[:, :3] - numpy.asarray(vals[:3], dtype=float)
+    return int(numpy.argmin((diff * diff).sum(axis=1)))
 
 
 def monotonic(x):
@@ -2533,6 +2524,54 @@ def rgba_color(color, colormap):
     return [r / 2.55, g / 2.55, b / 2.55, 100]
 
 
+_rgba_colors_cache = {}
+_rgba_colors_cache_size = 128
+
+
+def rgba_colors(colors, colormap):
+    """Converts a list of colors (any syntax accepted by
+    :py:func:`vcs.utils.rgba_color`) to a (len(colors), 4) array of 0-100
+    RGBA values.
+
+    Results are cached until the colormap is modified, the returned array
+    is read-only.
+
+    :param colors: The colors to get the rgba values for.
+    :type colors: `list`_ or `tuple`_
+
+    :param colormap: A VCS colormap
+    :type colormap: vcs.colormap.Cp
+
+    :returns: Array of shape (len(colors), 4)
+    :rtype: numpy.ndarray
+    """
+    table = colormap.index
+    try:
+        key = (table.version, tuple(tuple(c) if isinstance(c, (list, tuple)) else c
+                                    for c in colors))
+        hash(key)
+    except TypeError:
+        key = None
+    if key is not None and key in _rgba_colors_cache:
+        return _rgba_colors_cache[key]
+    try:
+        indices = numpy.asarray(colors)
+    except ValueError:  # mix of indices and rgb(a) values
+        indices = numpy.asarray(colors, dtype=object)
+    if indices.ndim == 1 and indices.dtype.kind in "iu" and \
+            ((indices >= 0) & (indices < len(table))).all():
+        rgba = table.array[indices]
+    else:
+        rgba = numpy.array([rgba_color(c, colormap) for c in colors],
+                           dtype=float).reshape((len(colors), 4))
+    rgba.setflags(write=False)
+    if key is not None:
+        if len(_rgba_colors_cache) >= _rgba_colors_cache_size:
+            _rgba_colors_cache.clear()
+        _rgba_colors_cache[key] = rgba
+    return rgba
+
+
 def png_read_metadata(path):
     if not HAS_VTK:
         warnings.warn("You need vtk to read metadata from png")
@@ -14,6 +14,8 @@ from .projection import round_projections, no_over_proj4_parameter_projections
 from .vcsvtk import fillareautils
 import sys
 import numbers
+import collections
+import itertools
 
 
 DEBUG_MODE = False
@@ -151,6 +153,20 @@ def configureContextArea(area, dataBounds, screenGeom):
     axisTop.SetMargins(0, 0)
 
 
+def setupContextAreaTransform(area, dataBounds, screenGeom):
+    """Sets the data to screen transform of a configured context area.
+
+    vtkContextArea only computes it when painted, items that map to scene
+    coordinates before the first render (e.g. isoline labels) need it now.
+    The axes are hidden with no margins so the draw area is screenGeom."""
+    transform = area.GetDrawAreaItem()
+    transform.Identity()
+    transform.Translate(screenGeom[0], screenGeom[1])
+    transform.Scale(screenGeom[2] / float(dataBounds[2]),
+                    screenGeom[3] / float(dataBounds[3]))
+    transform.Translate(-dataBounds[0], -dataBounds[1])
+
+
 def growBounds(previousBounds, newBounds):
     nextBounds = [i for i in previousBounds]
 
@@ -209,6 +225,27 @@ def numpy_to_vtk_wrapper(numpyArray, deep=False, array_type=None):
     return result
 
 
+# Returns a vtkLookupTable with one value per row of 'rgba' (0-100 values).
+# 'opacities' (0-100, None keeps the color's) replace the alphas, with
+# 'transparent' every value is transparent white (patterns are drawn over it)
+def createLookupTable(rgba, opacities=None, transparent=False):
+    rgba = numpy.array(rgba, dtype=float).reshape((-1, 4))
+    if transparent:
+        rgba[:] = [100., 100., 100., 0.]
+    elif opacities is not None:
+        for k, opacity in enumerate(opacities):
+            if opacity is not None:
+                rgba[k, 3] = opacity
+    if len(rgba) == 0:
+        rgba = numpy.zeros((1, 4))
+    # same rounding as vtkLookupTable.SetTableValue
+    table = numpy.floor(numpy.clip(rgba, 0., 100.) / 100. * 255. + .5)
+    lut = vtk.vtkLookupTable()
+    lut.SetTable(numpy_to_vtk_wrapper(table.astype(numpy.uint8), deep=True,
+                                      array_type=vtk.VTK_UNSIGNED_CHAR))
+    return lut
+
+
 # Adds 'array' to 'grid' as cell or point attribute based on 'isCellData'
 # It also sets it as the active scalar if 'isScalars'.
 # If the grid has pedigree ids (it was wrapped) we use them to set the array.
@@ -218,8 +255,12 @@ def setArray(grid, array, arrayName, isCellData, isScalars):
     if (pedigreeId):
         vtkarray = attributes.GetArray(arrayName)
         if vtkarray is not None:
-            for i in range(0, vtkarray.GetNumberOfTuples()):
-                vtkarray.SetValue(i, array[pedigreeId.GetValue(i)])
+            # one value (or tuple, e.g. vectors) per original point or cell
+            values = numpy.asarray(array)
+            if vtkarray.GetNumberOfComponents() == 1:
+                values = values.ravel()
+            VN.vtk_to_numpy(vtkarray)[:] = values[VN.vtk_to_numpy(pedigreeId)]
+            vtkarray.Modified()
     else:
         vtkarray = numpy_to_vtk_wrapper(array, deep=False)
         vtkarray.SetName(arrayName)
@@ -247,11 +288,8 @@ def putMaskOnVTKGrid(data, grid, actorColor=None, cellData=True, deep=True):
                     attributes = grid.GetPointData()
                 if (attributes.GetPedigreeIds()):
                     attributes2.SetPedigreeIds(attributes.GetPedigreeIds())
-                    pedigreeId = attributes2.GetPedigreeIds()
-                    vtkmask = vtk.vtkDoubleArray()
-                    vtkmask.SetNumberOfTuples(attributes2.GetPedigreeIds().GetNumberOfTuples())
-                    for i in range(0, vtkmask.GetNumberOfTuples()):
-                        vtkmask.SetValue(i, flatIMask[pedigreeId.GetValue(i)])
+                    pedigreeId = VN.vtk_to_numpy(attributes2.GetPedigreeIds())
+                    vtkmask = numpy_to_vtk_wrapper(flatIMask[pedigreeId], deep=False, array_type=vtk.VTK_DOUBLE)
                 else:
                     # the unstructured grid is not wrapped
                     vtkmask = numpy_to_vtk_wrapper(flatIMask, deep=deep, array_type=vtk.VTK_DOUBLE)
@@ -260,21 +298,17 @@ def putMaskOnVTKGrid(data, grid, actorColor=None, cellData=True, deep=True):
             attributes2.SetScalars(vtkmask)
             grid2.CopyStructure(grid)
             geoFilter = vtk.vtkDataSetSurfaceFilter()
-            lut = vtk.vtkLookupTable()
-            r, g, b, a = actorColor
             geoFilter.SetInputData(grid2)
             if not cellData:
                 pointToCell = vtk.vtkPointDataToCellData()
                 pointToCell.SetInputConnection(geoFilter.GetOutputPort())
                 geoFilter = pointToCell
-                lut.SetNumberOfTableValues(256)
-                lut.SetTableValue(0, 1., 1., 1., 0.)
-                for i in range(1, 256):
-                    lut.SetTableValue(i, r / 100., g / 100., b / 100., a / 100.)
+                rgba = numpy.tile(numpy.asarray(actorColor, dtype=float), (256, 1))
+                rgba[0] = [100., 100., 100., 0.]
             else:
-                lut.SetNumberOfTableValues(2)
-                lut.SetTableValue(0, r / 100., g / 100., b / 100., 0.)
-                lut.SetTableValue(1, r / 100., g / 100., b / 100., a / 100.)
+                rgba = numpy.tile(numpy.asarray(actorColor, dtype=float), (2, 1))
+                rgba[0, 3] = 0.
+            lut = createLookupTable(rgba)
             geoFilter.Update()
             mapper = vtk.vtkPolyDataMapper()
             mapper.SetInputConnection(geoFilter.GetOutputPort())
@@ -286,13 +320,9 @@ def putMaskOnVTKGrid(data, grid, actorColor=None, cellData=True, deep=True):
         # The ghost array now stores information about hidden (blanked)
         # points/cells. Setting an array entry to the bitwise value
         # `vtkDataSetAttributes.HIDDEN(CELL|POINT)` will blank the cell/point.
-        flatMask = msk.flat
-        ghost = numpy.zeros(len(flatMask), dtype=numpy.uint8)
         invalidMaskValue = vtk.vtkDataSetAttributes.HIDDENCELL if cellData else \
             vtk.vtkDataSetAttributes.HIDDENPOINT
-        for i, isInvalid in enumerate(flatMask):
-            if isInvalid:
-                ghost[i] = invalidMaskValue
+        ghost = numpy.asarray(msk, dtype=bool).ravel() * numpy.uint8(int(invalidMaskValue))
         attributes = grid.GetCellData() if cellData else grid.GetPointData()
         pedigreeIds = attributes.GetPedigreeIds()
         if (pedigreeIds):
@@ -361,28 +391,41 @@ def setInfToValid(_geoPoints, ghost=None, validPoint=None):
         geoPoints = _geoPoints.GetData()
     else:
         geoPoints = _geoPoints
-    anyInfinity = False
+    points = VN.vtk_to_numpy(geoPoints)
+    isInf = numpy.isinf(points[:, :2])
+    infPoints = isInf.any(axis=1)
+    if (not infPoints.any()):
+        return False
     if (validPoint is None):
         validPoint = [0, 0, 0]
-        for i in range(geoPoints.GetNumberOfTuples()):
-            point = geoPoints.GetTuple(i)
-            if (not math.isinf(point[0]) and not math.isinf(point[1])):
-                validPoint[0] = point[0]
-                validPoint[1] = point[1]
-                break
-    for i in range(geoPoints.GetNumberOfTuples()):
-        point = geoPoints.GetTuple(i)
-        if (math.isinf(point[0]) or math.isinf(point[1])):
-            anyInfinity = True
-            newPoint = list(point)
-            if (math.isinf(point[0])):
-                newPoint[0] = validPoint[0]
-            if (math.isinf(point[1])):
-                newPoint[1] = validPoint[1]
-            geoPoints.SetTuple(i, newPoint)
-            if (ghost):
-                ghost.SetValue(i, vtk.vtkDataSetAttributes.HIDDENPOINT)
-    return anyInfinity
+        valid = numpy.flatnonzero(~infPoints)
+        if (len(valid)):
+            validPoint = points[valid[0]]
+    validPoint = numpy.array(validPoint[:2], dtype=numpy.float64)
+    points[isInf[:, 0], 0] = validPoint[0]
+    points[isInf[:, 1], 1] = validPoint[1]
+    geoPoints.Modified()
+    if (ghost):
+        ghostValues = VN.vtk_to_numpy(ghost)
+        ghostValues[infPoints] |= int(vtk.vtkDataSetAttributes.HIDDENPOINT)
+        ghost.Modified()
+    return True
+
+
+def getVisibleBounds(pts, ghost):
+    '''
+    Returns [xm, xM, ym, yM] for the points in 'pts' (vtkPoints) that
+    are not hidden in the point 'ghost' array.
+    If all points are hidden, xm, ym are float max and xM, yM -float max.
+    '''
+    visible = (VN.vtk_to_numpy(ghost) & int(vtk.vtkDataSetAttributes.HIDDENPOINT)) == 0
+    if (not visible.any()):
+        return [sys.float_info.max, - sys.float_info.max,
+                sys.float_info.max, - sys.float_info.max]
+    xy = VN.vtk_to_numpy(pts.GetData())[visible, :2]
+    xm, ym = xy.min(axis=0)
+    xM, yM = xy.max(axis=0)
+    return [float(xm), float(xM), float(ym), float(yM)]
 
 
 def removeHiddenPointsOrCells(grid, celldata=False):
@@ -397,72 +440,271 @@ def removeHiddenPointsOrCells(grid, celldata=False):
     celldata -- If True, this method will remove cells, else points
     """
 
-    # Since this method involves deleting points or cells from the polydata, the
-    # first step is to build "upward" links from points to cells.
-    grid.BuildLinks()
-
     ghost = grid.GetCellGhostArray() if celldata else grid.GetPointGhostArray()
     if (not ghost):
         return
-    minScalar = sys.float_info.max
-    minVector = [0, 0, 0]
-    minVectorNorm = sys.float_info.max
-    num = grid.GetNumberOfCells() if celldata else grid.GetNumberOfPoints()
-    hidden = vtk.vtkDataSetAttributes.HIDDENCELL if celldata else vtk.vtkDataSetAttributes.HIDDENPOINT
-    if not celldata:
+    hidden = VN.vtk_to_numpy(ghost) & int(vtk.vtkDataSetAttributes.HIDDENCELL if celldata else
+                                          vtk.vtkDataSetAttributes.HIDDENPOINT) != 0
+    cellArrays = [(grid.GetVerts(), grid.SetVerts), (grid.GetLines(), grid.SetLines),
+                  (grid.GetPolys(), grid.SetPolys), (grid.GetStrips(), grid.SetStrips)]
+    cells = [vtkCellArray_to_numpy(c) for c, _ in cellArrays]
+    if celldata:
+        hiddenCells = hidden
+    else:
+        # point hidden, remove all cells used by this point
+        hiddenCells = numpy.concatenate(
+            [numpy.logical_or.reduceat(hidden[connectivity],
+                                       numpy.minimum(offsets[:-1], len(connectivity) - 1))
+             if len(connectivity) else numpy.zeros(len(offsets) - 1, dtype=bool)
+             for offsets, connectivity in cells])
+        # empty cells do not use any point
+        counts = numpy.concatenate([numpy.diff(offsets) for offsets, _ in cells])
+        hiddenCells[counts == 0] = False
+        # hidden points are not removed. This causes problems
+        # because it changes the scalar range.
+        visible = ~hidden
         scalars = grid.GetPointData().GetScalars()
         vectors = grid.GetPointData().GetVectors()
-    else:
-        scalars = grid.GetCellData().GetScalars()
-        vectors = grid.GetCellData().GetVectors()
-    if (scalars or vectors):
-        vector = [0, 0, 0]
-        for i in range(num):
-            if (not (ghost.GetValue(i) & hidden)):
-                if (scalars):
-                    scalar = scalars.GetValue(i)
-                    if (scalar < minScalar):
-                        minScalar = scalar
-                if (vectors):
-                    vectors.GetTypedTuple(i, vector)
-                    vectorNorm = numpy.linalg.norm(vector)
-                    if (vectorNorm < minVectorNorm):
-                        minVector = vector
-                        minVectorNorm = vectorNorm
-    hiddenScalars = False
-    hiddenVectors = False
-    for i in range(num):
-        if (ghost.GetValue(i) & hidden):
-            if not celldata:
-                cells = vtk.vtkIdList()
-                # point hidden, remove all cells used by this point
-                grid.GetPointCells(i, cells)
-                for j in range(cells.GetNumberOfIds()):
-                    grid.DeleteCell(cells.GetId(j))
-                # hidden points are not removed. This causes problems
-                # because it changes the scalar range.
-                if(scalars):
-                    hiddenScalars = True
-                    scalars.SetValue(i, minScalar)
-                if(vectors):
-                    hiddenVectors = True
-                    vectors.SetTypedTuple(i, minVector)
-            else:
-                grid.DeleteCell(i)
-    # SetValue does not call modified - we'll have to call it after all calls.
-    if (hiddenScalars):
-        scalars.Modified()
-    if (hiddenVectors):
-        vectors.Modified()
-    # ensure that GLOBALIDS are copied
-    attributes = grid.GetCellData()
-    attributes.SetActiveAttribute(-1, attributes.GLOBALIDS)
-    grid.RemoveDeletedCells()
-    # set GLOBALIDS attribute
+        if (scalars and hidden.any()):
+            scalarValues = VN.vtk_to_numpy(scalars)
+            scalarValues[hidden] = scalarValues[visible].min() if visible.any() else sys.float_info.max
+            scalars.Modified()
+        if (vectors and hidden.any()):
+            vectorValues = VN.vtk_to_numpy(vectors)
+            minVector = [0, 0, 0]
+            if visible.any():
+                visibleVectors = vectorValues[visible]
+                minVector = visibleVectors[numpy.argmin(numpy.linalg.norm(visibleVectors, axis=1))]
+            vectorValues[hidden] = minVector
+            vectors.Modified()
+    if (not hiddenCells.any()):
+        return
+    keep = ~hiddenCells
+    # Keep the unmasked cells of each cell array in one pass
+    takeCells(cells, [setCells for _, setCells in cellArrays], keep, skipUnchanged=True)
+    grid.DeleteCells()
+    grid.DeleteLinks()
+    # and the matching cell attributes (GlobalIds, PedigreeIds, ...)
     attributes = grid.GetCellData()
-    globalIdsIndex = vtk.mutable(-1)
-    attributes.GetArray("GlobalIds", globalIdsIndex)
-    attributes.SetActiveAttribute(globalIdsIndex, attributes.GLOBALIDS)
+    takeAttributes(attributes, attributes, keep)
+
+
+def takeCells(cells, setters, keep, skipUnchanged=False):
+    '''
+    Calls each of 'setters' with a vtkCellArray holding the cells of
+    the matching (offsets, connectivity) in 'cells' for which 'keep' is
+    True. 'keep' runs over all 'cells' back to back, as the cell ids of
+    a vtkPolyData (verts, lines, polys then strips)
+    '''
+    start = 0
+    for (offsets, connectivity), setCells in zip(cells, setters):
+        numberOfCells = len(offsets) - 1
+        keepCells = keep[start:start + numberOfCells]
+        start += numberOfCells
+        if (skipUnchanged and keepCells.all()):
+            continue
+        counts = numpy.diff(offsets)
+        newOffsets = numpy.zeros(keepCells.sum() + 1, dtype=offsets.dtype)
+        numpy.cumsum(counts[keepCells], out=newOffsets[1:])
+        setCells(numpy_to_vtkCellArray(newOffsets, connectivity[numpy.repeat(keepCells, counts)]))
+
+
+def extractCells(poly, keep, compact=False):
+    '''
+    Returns a new vtkPolyData with only the cells of 'poly' for which
+    'keep' is True, along with their cell attributes. Points are shared
+    with 'poly' unless 'compact', in which case only the points used by
+    the kept cells are copied (bounds are then those of the kept cells)
+    '''
+    result = vtk.vtkPolyData()
+    cells = [vtkCellArray_to_numpy(c) for c in
+             [poly.GetVerts(), poly.GetLines(), poly.GetPolys(), poly.GetStrips()]]
+    if compact:
+        used = numpy.zeros(poly.GetNumberOfPoints(), dtype=bool)
+        start = 0
+        for offsets, connectivity in cells:
+            numberOfCells = len(offsets) - 1
+            used[connectivity[numpy.repeat(keep[start:start + numberOfCells], numpy.diff(offsets))]] = True
+            start += numberOfCells
+        newIds = numpy.cumsum(used) - 1
+        cells = [(offsets, newIds[connectivity]) for offsets, connectivity in cells]
+        pointData = poly.GetPoints().GetData()
+        pts = vtk.vtkPoints()
+        pts.SetData(numpy_to_vtk_wrapper(numpy.ascontiguousarray(VN.vtk_to_numpy(pointData)[used]),
+                                         deep=True, array_type=pointData.GetDataType()))
+        result.SetPoints(pts)
+        takeAttributes(poly.GetPointData(), result.GetPointData(), used)
+    else:
+        result.SetPoints(poly.GetPoints())
+        result.GetPointData().ShallowCopy(poly.GetPointData())
+    takeCells(cells, [result.SetVerts, result.SetLines, result.SetPolys, result.SetStrips], keep)
+    takeAttributes(poly.GetCellData(), result.GetCellData(), keep)
+    return result
+
+
+def classifyValues(values, levels):
+    '''
+    Returns for each of 'values' the index of the [low, high] level
+    (bounds included) it falls in, -1 if none. Overlapping levels
+    resolve to the last one, which is the one drawn on top.
+    '''
+    values = numpy.asarray(values, dtype=numpy.float64)
+    levels = numpy.asarray(levels, dtype=numpy.float64).reshape(-1, 2)
+    if (len(levels) == 0):
+        return numpy.full(values.shape, -1, dtype=numpy.int32)
+    edges = numpy.unique(levels)
+    low = levels[:, :1]
+    high = levels[:, 1:]
+
+    def lastLevel(covered):
+        # index of the last level covering each column, -1 if none
+        last = len(levels) - 1 - numpy.argmax(covered[::-1], axis=0)
+        return numpy.where(covered.any(axis=0), last, -1)
+
+    # level of the values strictly between two edges, and exactly on an edge
+    # (-1 past the last edge)
+    betweenLevel = numpy.append(lastLevel((low <= edges[:-1]) & (high >= edges[1:])), -1)
+    edgeLevel = lastLevel((low <= edges) & (high >= edges))
+    position = numpy.digitize(values, edges) - 1
+    inside = position >= 0
+    position[~inside] = 0
+    result = numpy.where(values == edges[position], edgeLevel[position], betweenLevel[position])
+    result[~inside] = -1
+    return result.astype(numpy.int32)
+
+
+def classifyCells(poly, levels, bands=None, name="LevelIndex"):
+    '''
+    Bins the cell scalars of 'poly' into 'levels' (see classifyValues)
+    in a single pass. Returns a new vtkPolyData without the cells outside
+    every level, with the level index as its active cell scalars 'name'
+    (the original scalars are kept as a regular array).
+    'bands' are the sorted values contoured by the
+    vtkBandedPolyDataContourFilter (in value scalar mode) 'poly' comes
+    from: its cell scalars are then the lower value of each band and the
+    band is classified by its middle value.
+    '''
+    values = VN.vtk_to_numpy(poly.GetCellData().GetScalars())
+    if bands is not None:
+        bands = numpy.asarray(bands, dtype=numpy.float64)
+        middles = (bands[:-1] + bands[1:]) / 2.
+        # band values come in single precision, look for the nearest one
+        values = numpy.append(middles, bands[-1:])[numpy.searchsorted(middles, values)]
+    index = classifyValues(values, levels)
+    keep = index >= 0
+    result = extractCells(poly, keep)
+    levelIndex = numpy_to_vtk_wrapper(numpy.ascontiguousarray(index[keep]), deep=True)
+    levelIndex.SetName(name)
+    result.GetCellData().AddArray(levelIndex)
+    result.GetCellData().SetActiveScalars(name)
+    return result
+
+
+def takeAttributes(source, target, indices):
+    '''
+    Sets in 'target' the tuples 'indices' of all arrays in 'source'
+    (vtkDataSetAttributes, can be the same object). Arrays keep their
+    name and attribute role (scalars, GlobalIds, ...)
+    '''
+    arrays = []
+    for i in range(source.GetNumberOfArrays()):
+        array = source.GetArray(i)
+        newArray = numpy_to_vtk_wrapper(numpy.ascontiguousarray(VN.vtk_to_numpy(array)[indices]),
+                                        deep=True, array_type=array.GetDataType())
+        newArray.SetName(array.GetName())
+        arrays.append((newArray, source.IsArrayAnAttribute(i)))
+    target.Initialize()
+    for newArray, attributeType in arrays:
+        index = target.AddArray(newArray)
+        if (attributeType >= 0):
+            target.SetActiveAttribute(index, attributeType)
+
+
+def vtkCellArray_to_numpy(cells):
+    '''
+    Returns the (offsets, connectivity) numpy arrays describing 'cells',
+    see numpy_to_vtkCellArray.
+    '''
+    numberOfCells = cells.GetNumberOfCells()
+    idType = VN.get_vtk_to_numpy_typemap()[vtk.VTK_ID_TYPE]
+    if (numberOfCells == 0):
+        return numpy.zeros(1, dtype=idType), numpy.zeros(0, dtype=idType)
+    if hasattr(cells, "GetOffsetsArray"):
+        return (VN.vtk_to_numpy(cells.GetOffsetsArray()).astype(idType, copy=False),
+                VN.vtk_to_numpy(cells.GetConnectivityArray()).astype(idType, copy=False))
+    legacy = VN.vtk_to_numpy(cells.GetData())
+    cellSize = len(legacy) // numberOfCells - 1
+    if (len(legacy) % numberOfCells == 0 and (legacy[::cellSize + 1] == cellSize).all()):
+        # all cells have the same size (quads from structured grids)
+        counts = numpy.full(numberOfCells, cellSize, dtype=idType)
+    else:
+        counts = numpy.zeros(numberOfCells, dtype=idType)
+        i = 0
+        for c in range(numberOfCells):
+            counts[c] = legacy[i]
+            i += legacy[i] + 1
+    offsets = numpy.zeros(numberOfCells + 1, dtype=idType)
+    numpy.cumsum(counts, out=offsets[1:])
+    isCount = numpy.zeros(len(legacy), dtype=bool)
+    isCount[offsets[:-1] + numpy.arange(numberOfCells)] = True
+    return offsets, legacy[~isCount]
+
+
+def cellConnectivity(dataset):
+    '''
+    Returns the (offsets, connectivity) numpy arrays of the cells of a
+    vtkStructuredGrid (2D) or vtkUnstructuredGrid, see
+    numpy_to_vtkCellArray.
+    '''
+    if (dataset.IsA("vtkStructuredGrid")):
+        nx, ny, _ = dataset.GetDimensions()
+        i, j = numpy.meshgrid(numpy.arange(nx - 1), numpy.arange(ny - 1))
+        first = (j * nx + i).ravel()
+        connectivity = numpy.column_stack((first, first + 1, first + nx + 1, first + nx))
+        return numpy.arange(0, connectivity.size + 1, 4), connectivity.ravel()
+    return vtkCellArray_to_numpy(dataset.GetCells())
+
+
+def numpy_to_vtkCellArray(offsets, connectivity):
+    '''
+    Builds a vtkCellArray from two numpy arrays: 'offsets' has one entry
+    per cell plus one (cell i uses connectivity[offsets[i]:offsets[i + 1]])
+    and 'connectivity' has the point ids of all cells back to back.
+    With VTK >= 9 the arrays are handed to VTK without copy, older
+    versions get the legacy [n, id0, id1, ..., n, id0, ...] layout.
+    '''
+    idType = VN.get_vtk_to_numpy_typemap()[vtk.VTK_ID_TYPE]
+    offsets = numpy.ascontiguousarray(offsets, dtype=idType)
+    connectivity = numpy.ascontiguousarray(connectivity, dtype=idType)
+    cells = vtk.vtkCellArray()
+    if hasattr(cells, "GetOffsetsArray"):
+        cells.SetData(numpy_to_vtk_wrapper(offsets, deep=False, array_type=vtk.VTK_ID_TYPE),
+                      numpy_to_vtk_wrapper(connectivity, deep=False, array_type=vtk.VTK_ID_TYPE))
+    else:
+        numberOfCells = len(offsets) - 1
+        counts = numpy.diff(offsets)
+        legacy = numpy.empty(numberOfCells + len(connectivity), dtype=idType)
+        isCount = numpy.zeros(len(legacy), dtype=bool)
+        isCount[offsets[:-1] + numpy.arange(numberOfCells)] = True
+        legacy[isCount] = counts
+        legacy[~isCount] = connectivity
+        cells.SetCells(numberOfCells,
+                       numpy_to_vtk_wrapper(legacy, deep=False, array_type=vtk.VTK_ID_TYPE))
+    return cells
+
+
+def genPolygonCells(vertices, numberOfCells, nVertices):
+    '''
+    Returns the vtkCellArray of the polygons of a mesh.
+    'vertices' holds nVertices consecutive points for each cell,
+    vertices with a NaN x coordinate (missing values) are dropped from
+    their cell.
+    '''
+    valid = ~numpy.isnan(vertices[:, 0]).reshape(numberOfCells, nVertices)
+    offsets = numpy.zeros(numberOfCells + 1, dtype=numpy.int64)
+    numpy.cumsum(valid.sum(axis=1), out=offsets[1:])
+    connectivity = numpy.flatnonzero(valid)
+    return numpy_to_vtkCellArray(offsets, connectivity)
 
 
 def genGrid(data1, data2, gm, grid=None, geo=None, genVectors=False,
@@ -488,6 +730,7 @@ def genGrid(data1, data2, gm, grid=None, geo=None, genVectors=False,
                 ym = m[:, 0].min()
                 yM = m[:, 0].max()
                 numberOfCells = m.shape[0]
+                nVertices = m.shape[-1]
                 # For vtk we need to reorder things
                 m2 = numpy.ascontiguousarray(numpy.transpose(m, (0, 2, 1)))
                 m2.resize((m2.shape[0] * m2.shape[1], m2.shape[2]))
@@ -524,15 +767,9 @@ def genGrid(data1, data2, gm, grid=None, geo=None, genVectors=False,
     if m3 is not None:
         # Create unstructured grid points
         vg = vtk.vtkUnstructuredGrid()
-        for i in range(numberOfCells):
-            pt_ids = []
-            for j in range(nVertices):
-                indx = i * nVertices + j
-                if not numpy.isnan(m3[indx][0]):  # missing value means skip vertex
-                    pt_ids.append(indx)
-            vg.InsertNextCell(vtk.VTK_POLYGON,
-                              len(pt_ids),
-                              pt_ids)
+        # missing value means skip vertex
+        vg.SetCells(vtk.VTK_POLYGON,
+                    genPolygonCells(m3, numberOfCells, nVertices))
     else:
         # Ok a simple structured grid is enough
         if grid is None:
@@ -748,20 +985,7 @@ def genGrid(data1, data2, gm, grid=None, geo=None, genVectors=False,
             ghost = vg.AllocatePointGhostArray()
             if (setInfToValid(geopts, ghost)):
                 # if there are hidden points, we recompute the bounds
-                xm = ym = sys.float_info.max
-                xM = yM = - sys.float_info.max
-                for i in range(pts.GetNumberOfPoints()):
-                    if (ghost.GetValue(i) & vtk.vtkDataSetAttributes.HIDDENPOINT == 0):
-                        # point not hidden
-                        p = pts.GetPoint(i)
-                        if (p[0] < xm):
-                            xm = p[0]
-                        if (p[0] > xM):
-                            xM = p[0]
-                        if (p[1] < ym):
-                            ym = p[1]
-                        if (p[1] > yM):
-                            yM = p[1]
+                xm, xM, ym, yM = getVisibleBounds(pts, ghost)
                 # hidden point don't work for polys or unstructured grids.
                 # We remove the cells in this case.
                 if (vg.GetExtentType() == vtk.VTK_PIECES_EXTENT):
@@ -793,8 +1017,79 @@ def genGrid(data1, data2, gm, grid=None, geo=None, genVectors=False,
 
 
 # Continents first
-# Try to save time and memorize these continents
+# Try to save time and memorize these continents:
+# parsed lon/lat geometry per file (invalidated when the file changes)
+# and the final wrapped/projected polydata per plot settings (LRU)
 vcsContinents = {}
+vcsProjectedContinents = collections.OrderedDict()
+vcsProjectedContinentsSize = 32
+
+
+def _continentValues(ln):
+    # a line is either blank separated "lat lon lat lon ..."
+    # or fixed width 8 characters "lat lon" fields that can touch
+    sp = ln.split()
+    if len(sp) % 2 == 0:
+        try:
+            return [float(v) for v in sp]
+        except ValueError:
+            pass
+    ln = ln.rstrip("\r\n")
+    values = []
+    while len(ln) > 1:
+        values.append(float(ln[:8]))
+        values.append(float(ln[8:16]))
+        ln = ln[16:]
+    return values
+
+
+def readContinents(fnm):
+    """ Reads a vcs continent file
+    Input: vcs continent file name
+    Output: (lonlat, offsets) numpy arrays, line i of the file uses the
+    points lonlat[offsets[i]:offsets[i + 1]]
+    Results are cached until the file modification time changes
+    """
+    mtime = os.path.getmtime(fnm)
+    cached = vcsContinents.get(fnm)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(fnm) as f:
+        lines = f.readlines()
+    values = []
+    starts = []
+    sizes = []
+    i = 0
+    ln = lines[0]
+    while ln.strip().split() != ["-99", "-99"]:
+        # Many lines, need to know number of points
+        N = int(ln.split()[0])
+        starts.append(len(values) // 2)
+        sizes.append(N // 2)
+        n = 0
+        while n < N:
+            i += 1
+            sp = _continentValues(lines[i])
+            values += sp
+            n += len(sp)
+        i += 1
+        ln = lines[i]
+    latlon = numpy.array(values, dtype=numpy.float64).reshape((-1, 2))
+    lonlat = numpy.ascontiguousarray(latlon[:, ::-1])
+    starts = numpy.array(starts, dtype=numpy.int64)
+    sizes = numpy.array(sizes, dtype=numpy.int64)
+    vcsContinents[fnm] = (mtime, (lonlat, starts, sizes))
+    return lonlat, starts, sizes
+
+
+def _convertAxis(convertFunction, values):
+    try:
+        converted = numpy.asarray(convertFunction(values), dtype=numpy.float64)
+        if converted.shape == values.shape:
+            return converted
+    except Exception:
+        pass
+    return numpy.array([convertFunction(v) for v in values], dtype=numpy.float64)
 
 
 def prepContinents(fnm, xConvertFunction=lambda x: x, yConvertFunction=lambda y: y):
@@ -802,52 +1097,18 @@ def prepContinents(fnm, xConvertFunction=lambda x: x, yConvertFunction=lambda y:
     Author: Charles Doutriaux
     Input: vcs continent file name
     """
-    poly = vtk.vtkPolyData()
-    cells = vtk.vtkCellArray()
+    lonlat, starts, sizes = readContinents(fnm)
+    xyz = numpy.zeros((len(lonlat), 3))
+    xyz[:, 0] = _convertAxis(xConvertFunction, lonlat[:, 0])
+    xyz[:, 1] = _convertAxis(yConvertFunction, lonlat[:, 1])
     pts = vtk.vtkPoints()
-    f = open(fnm)
-    ln = f.readline()
-    while ln.strip().split() != ["-99", "-99"]:
-        # Many lines, need to know number of points
-        N = int(ln.split()[0])
-        # Now create and store these points
-        n = 0
-        npts = pts.GetNumberOfPoints()
-        while n < N:
-            ln = str(f.readline())
-            sp = ln.split()
-            sn = len(sp)
-            didIt = False
-            if sn % 2 == 0:
-                try:
-                    spts = []
-                    for i in range(sn // 2):
-                        l, L = float(sp[i * 2]), float(sp[i * 2 + 1])
-                        spts.append([l, L])
-                    for p in spts:
-                        x = xConvertFunction(p[1])
-                        y = yConvertFunction(p[0])
-                        pts.InsertNextPoint(x, y, 0.)
-                    n += sn
-                    didIt = True
-                except Exception:
-                    didIt = False
-            if didIt is False:
-                while len(ln) > 2:
-                    l, L = float(ln[:8]), float(ln[8:16])
-                    x = xConvertFunction(L)
-                    y = yConvertFunction(l)
-                    pts.InsertNextPoint(x, y, 0.)
-                    ln = ln[16:]
-                    n += 2
-        ln = vtk.vtkPolyLine()
-        ln.GetPointIds().SetNumberOfIds(N // 2)
-        for i in range(N // 2):
-            ln.GetPointIds().SetId(i, i + npts)
-        cells.InsertNextCell(ln)
-        ln = f.readline()
+    pts.SetData(numpy_to_vtk_wrapper(xyz, deep=True))
+    offsets = numpy.zeros(len(sizes) + 1, dtype=numpy.int64)
+    numpy.cumsum(sizes, out=offsets[1:])
+    connectivity = numpy.arange(offsets[-1]) + numpy.repeat(starts - offsets[:-1], sizes)
+    poly = vtk.vtkPolyData()
     poly.SetPoints(pts)
-    poly.SetLines(cells)
+    poly.SetLines(numpy_to_vtkCellArray(offsets, connectivity))
 
     # The dataset has some duplicate lines that extend
     # outside of x=[-180, 180],
@@ -867,6 +1128,44 @@ def prepContinents(fnm, xConvertFunction=lambda x: x, yConvertFunction=lambda y:
     return poly
 
 
+def projectionKey(projection):
+    """Hashable description of a projection: its type and parameters"""
+    if isinstance(projection, str):
+        projection = vcs.elements["projection"][projection]
+    parameters = projection.parameters
+    if isinstance(parameters, dict):
+        parameters = tuple(sorted(parameters.items()))
+    else:
+        parameters = tuple(parameters)
+    return (projection.type, parameters)
+
+
+def prepProjectedContinents(fnm, wc, projection, xaxisconvert="linear", yaxisconvert="linear"):
+    """ Continents polydata wrapped around wc and projected,
+    ready for plotting.
+    The last vcsProjectedContinentsSize results are kept, the caller
+    gets a shallow copy it can add its own arrays to.
+    """
+    key = (fnm, os.path.getmtime(fnm), tuple(float(v) for v in wc),
+           projectionKey(projection), xaxisconvert, yaxisconvert)
+    contData = vcsProjectedContinents.pop(key, None)
+    if contData is None:
+        xforward = vcs.utils.axisConvertFunctions[xaxisconvert]['forward']
+        yforward = vcs.utils.axisConvertFunctions[yaxisconvert]['forward']
+        contData = prepContinents(fnm, xforward, yforward)
+        contData = doWrapData(contData, wc, fastClip=False)
+        # we use plotting coordinates for doing the projection so
+        # that parameters such that central meridian are set correctly.
+        _, gcpts = project(contData.GetPoints(), projection, wc)
+        contData.SetPoints(gcpts)
+        while len(vcsProjectedContinents) >= vcsProjectedContinentsSize:
+            vcsProjectedContinents.popitem(last=False)
+    vcsProjectedContinents[key] = contData
+    out = vtk.vtkPolyData()
+    out.ShallowCopy(contData)
+    return out
+
+
 def apply_proj_parameters(pd, projection, x1, x2, y1, y2):
     pname = projDict.get(projection._type, projection.type)
     projName = pname
@@ -922,13 +1221,26 @@ def apply_proj_parameters(pd, projection, x1, x2, y1, y2):
             pd.SetOptionalParameter('lat_2', str(standardparallel2))
 
 
-def projectArray(w, projection, wc, geo=None):
-    x1, x2, y1, y2 = wc
+# Geo transforms are expensive to set up (proj initialization) and a
+# plot projects many times (grid, continents, template, labels, ...)
+# with the same projection and world coordinates: share them.
+vcsGeoTransforms = collections.OrderedDict()
+vcsGeoTransformsSize = 64
+
+
+def getGeoTransform(projection, wc):
+    '''
+    Returns the vtkGeoTransform from lon/lat to 'projection' for the
+    world coordinates 'wc'. The last vcsGeoTransformsSize transforms are
+    kept, keyed by the projection type and parameters (a modified Proj
+    gets a new transform) and 'wc'.
+    Callers must not modify the returned transform.
+    '''
     if isinstance(projection, str):
         projection = vcs.elements["projection"][projection]
-    if projection.type == "linear":
-        return None, w
-
+    x1, x2, y1, y2 = wc
+    key = (projectionKey(projection), float(x1), float(x2), float(y1), float(y2))
+    geo = vcsGeoTransforms.pop(key, None)
     if geo is None:
         geo = vtk.vtkGeoTransform()
         ps = vtk.vtkGeoProjection()
@@ -938,6 +1250,20 @@ def projectArray(w, projection, wc, geo=None):
 
         geo.SetSourceProjection(ps)
         geo.SetDestinationProjection(pd)
+        while len(vcsGeoTransforms) >= vcsGeoTransformsSize:
+            vcsGeoTransforms.popitem(last=False)
+    vcsGeoTransforms[key] = geo
+    return geo
+
+
+def projectArray(w, projection, wc, geo=None):
+    if isinstance(projection, str):
+        projection = vcs.elements["projection"][projection]
+    if projection.type == "linear":
+        return None, w
+
+    if geo is None:
+        geo = getGeoTransform(projection, wc)
 
     for i in range(0, w.GetNumberOfTuples()):
         tuple = [0, 0, 0]
@@ -948,20 +1274,12 @@ def projectArray(w, projection, wc, geo=None):
 
 # Geo projection
 def project(pts, projection, wc, geo=None):
-    x1, x2, y1, y2 = wc
     if isinstance(projection, str):
         projection = vcs.elements["projection"][projection]
     if projection.type == "linear":
         return None, pts
     if geo is None:
-        geo = vtk.vtkGeoTransform()
-        ps = vtk.vtkGeoProjection()
-        pd = vtk.vtkGeoProjection()
-
-        apply_proj_parameters(pd, projection, x1, x2, y1, y2)
-
-        geo.SetSourceProjection(ps)
-        geo.SetDestinationProjection(pd)
+        geo = getGeoTransform(projection, wc)
     geopts = vtk.vtkPoints()
     geo.TransformPoints(pts, geopts)
     return geo, geopts
@@ -1150,6 +1468,48 @@ def dump2VTK(obj, fnm=None):
     dsw.Write()
 
 
+def translatedCopies(data, translations):
+    '''
+    Returns a polydata with copies of 'data' translated by each
+    (dx, dy) in 'translations', the same as appending the outputs of
+    vtkTransformPolyDataFilter but without transforming any attribute.
+    '''
+    numberOfCopies = len(translations)
+    pts = VN.vtk_to_numpy(data.GetPoints().GetData())
+    numberOfPoints = len(pts)
+    xyz = numpy.tile(pts, (numberOfCopies, 1))
+    for i, (dx, dy) in enumerate(translations):
+        xyz[i * numberOfPoints:(i + 1) * numberOfPoints, 0] += dx
+        xyz[i * numberOfPoints:(i + 1) * numberOfPoints, 1] += dy
+    points = vtk.vtkPoints()
+    points.SetData(numpy_to_vtk_wrapper(xyz, deep=False))
+    result = vtk.vtkPolyData()
+    result.SetPoints(points)
+    takeAttributes(data.GetPointData(), result.GetPointData(),
+                   numpy.tile(numpy.arange(numberOfPoints), numberOfCopies))
+    # vtkAppendPolyData order: the verts of all copies, then the lines, ...
+    cellIds = []
+    start = 0
+    for getCells, setCells in [(data.GetVerts, result.SetVerts), (data.GetLines, result.SetLines),
+                               (data.GetPolys, result.SetPolys), (data.GetStrips, result.SetStrips)]:
+        offsets, connectivity = vtkCellArray_to_numpy(getCells())
+        numberOfCells = len(offsets) - 1
+        if (numberOfCells == 0):
+            continue
+        counts = numpy.tile(numpy.diff(offsets), numberOfCopies)
+        newOffsets = numpy.zeros(len(counts) + 1, dtype=offsets.dtype)
+        numpy.cumsum(counts, out=newOffsets[1:])
+        newConnectivity = (numpy.tile(connectivity, numberOfCopies) +
+                           numpy.repeat(numpy.arange(numberOfCopies, dtype=connectivity.dtype) * numberOfPoints,
+                                        len(connectivity)))
+        setCells(numpy_to_vtkCellArray(newOffsets, newConnectivity))
+        cellIds.append(numpy.tile(numpy.arange(start, start + numberOfCells), numberOfCopies))
+        start += numberOfCells
+    if (cellIds):
+        takeAttributes(data.GetCellData(), result.GetCellData(), numpy.concatenate(cellIds))
+    return result
+
+
 def doWrapData(data, wc, wrap=[0., 360], fastClip=True):
     '''
     Wrapping around and 'wrap' modulo' and clipping.
@@ -1195,9 +1555,6 @@ def doWrapData(data, wc, wrap=[0., 360], fastClip=True):
         else:
             ymx = bounds[3]
 
-    appendFilter = vtk.vtkAppendPolyData()
-    appendFilter.AddInputData(data)
-    appendFilter.Update()
     # X axis wrappping
     Amn, Amx = bounds[0], bounds[1]
     nX = [0, 0]  # number of translations needed (neg and pos)
@@ -1220,37 +1577,42 @@ def doWrapData(data, wc, wrap=[0., 360], fastClip=True):
 
     nNeg = -max(nX[0], nY[0])  # Number of negative translation needed
     nPos = max(nX[1], nY[1]) + 1  # Number of negative translation needed
-    # Negative translation
+    # Only the copies of the data that overlap the final window
+    # contribute to the result
+    translations = [(0., 0.)]
     for i in range(nNeg, nPos):
         for j in range(nNeg, nPos):
-            if i == 0 and j == 0:
-                continue
-            Tpf = vtk.vtkTransformPolyDataFilter()
-            Tpf.SetInputData(data)
-            T = vtk.vtkTransform()
-            T.Translate(i * wrap[1], j * wrap[0], 0)
-            Tpf.SetTransform(T)
-            Tpf.Update()
-            appendFilter.AddInputData(Tpf.GetOutput())
-            appendFilter.Update()
-
-    # Clip the data to the final window:
-    clipBox = vtk.vtkBox()
-    clipBox.SetXMin(xmn, ymn, -1.0)
-    clipBox.SetXMax(xmx, ymx, 1.0)
-    if fastClip:
-        clipper = vtk.vtkExtractPolyDataGeometry()
-        clipper.ExtractInsideOn()
-        clipper.SetImplicitFunction(clipBox)
-        clipper.ExtractBoundaryCellsOn()
-        clipper.PassPointsOff()
+            translation = (i * wrap[1], j * wrap[0])
+            if (translation not in translations and
+                    bounds[0] + translation[0] <= xmx and bounds[1] + translation[0] >= xmn and
+                    bounds[2] + translation[1] <= ymx and bounds[3] + translation[1] >= ymn):
+                translations.append(translation)
+    if (len(translations) > 1):
+        data = translatedCopies(data, translations)
+
+    if (bounds[4] >= -1. and bounds[5] <= 1. and
+            all(xmn <= bounds[0] + dx and bounds[1] + dx <= xmx and
+                ymn <= bounds[2] + dy and bounds[3] + dy <= ymx for dx, dy in translations)):
+        # every copy is inside the window, nothing to clip
+        result = data
     else:
-        clipper = vtk.vtkClipPolyData()
-        clipper.InsideOutOn()
-        clipper.SetClipFunction(clipBox)
-    clipper.SetInputConnection(appendFilter.GetOutputPort())
-    clipper.Update()
-    result = clipper.GetOutput()
+        # Clip the data to the final window:
+        clipBox = vtk.vtkBox()
+        clipBox.SetXMin(xmn, ymn, -1.0)
+        clipBox.SetXMax(xmx, ymx, 1.0)
+        if fastClip:
+            clipper = vtk.vtkExtractPolyDataGeometry()
+            clipper.ExtractInsideOn()
+            clipper.SetImplicitFunction(clipBox)
+            clipper.ExtractBoundaryCellsOn()
+            clipper.PassPointsOff()
+        else:
+            clipper = vtk.vtkClipPolyData()
+            clipper.InsideOutOn()
+            clipper.SetClipFunction(clipBox)
+        clipper.SetInputData(data)
+        clipper.Update()
+        result = clipper.GetOutput()
     if (globalIdsName):
         attributes = result.GetCellData()
         index = vtk.mutable(-1)
@@ -1425,20 +1787,35 @@ def prepTextProperty(p, winSize, to="default", tt="default", cmap=None,
     p.SetFontSize(int(to.height * winSize[1] / 800.))
 
 
-class TextActorWrapperItem(object):
-    def __init__(self, textActor):
-        self.textActor = textActor
+class TextActorsWrapperItem(object):
+    """Paints text actors in one context item. The actors have their own
+    copy of 'textProp', which is applied once per paint; an actor's own
+    property is only applied once it has been edited or replaced"""
+
+    def __init__(self, textActors, textProp=None):
+        self.textActors = textActors
+        self.textProp = textProp
+        # (property, modification time) of each actor when created
+        self.actorProps = [(a.GetTextProperty(), a.GetTextProperty().GetMTime()) for a in textActors]
 
     def Initialize(self, vtkSelf):
         return True
 
     def Paint(self, vtkSelf, context2D):
-        pos = self.textActor.GetPosition()
-        text = self.textActor.GetInput()
-        textProp = self.textActor.GetTextProperty()
-
-        context2D.ApplyTextProp(textProp)
-        context2D.DrawString(pos[0], pos[1], text)
+        applied = None
+        if self.textProp is not None:
+            applied = self.textProp
+            context2D.ApplyTextProp(applied)
+        for textActor, (prop, mtime) in zip(self.textActors, self.actorProps):
+            textProp = textActor.GetTextProperty()
+            if self.textProp is not None and textProp is prop and textProp.GetMTime() == mtime:
+                # untouched copy of the shared property
+                textProp = self.textProp
+            if textProp is not applied:
+                applied = textProp
+                context2D.ApplyTextProp(applied)
+            pos = textActor.GetPosition()
+            context2D.DrawString(pos[0], pos[1], textActor.GetInput())
 
         return False
 
@@ -1470,50 +1847,54 @@ def genTextActor(contextArea, string=None, x=None, y=None,
             a.append(a[-1])
 
     sz = renderer.GetRenderWindow().GetSize()
-    actors = []
-    pts = vtk.vtkPoints()
+    # the text property is prepared once and shared by the painting item,
+    # each actor gets its own copy so that editing one string does not
+    # change the others
+    p = vtk.vtkTextProperty()
+    prepTextProperty(p, sz, to, tt, cmap)
+    xyz = numpy.zeros((n, 3))
+    xyz[:, 0] = x[:n]
+    xyz[:, 1] = y[:n]
     if vcs.elements["projection"][tt.projection].type != "linear":
         if geoBounds is not None:
             wc = geoBounds[:4]
         else:
             wc = None
+        # project all the positions at once
+        pts = vtk.vtkPoints()
+        pts.SetData(numpy_to_vtk_wrapper(xyz, deep=True))
+        _, pts = project(pts, tt.projection, tt.worldcoordinate, geo=geo)
+        xyz = VN.vtk_to_numpy(pts.GetData())
+        if wc is None:
+            wc = tt.worldcoordinate
+            pts_wc = vtk.vtkPoints()
+            # Scan a bunch of points within wc
+            # In case the proj deformation bring origin close
+            # from each others
+            for wx in numpy.arange(wc[0], wc[1], (wc[1] - wc[0]) / 25.):
+                for wy in numpy.arange(wc[2], wc[3], (wc[3] - wc[2]) / 25.):
+                    pts_wc.InsertNextPoint(wx, wy, 0.)
+            _, pts_wc = project(pts_wc, tt.projection, tt.worldcoordinate, geo=geo)
+            as_numpy = VN.vtk_to_numpy(pts_wc.GetData())
+            wx = as_numpy[:, 0]
+            wy = as_numpy[:, 1]
+            wc = [wx.min(), wx.max(), wy.min(), wy.max()]
+    else:
+        wc = tt.worldcoordinate
+    X, Y = world2Renderer(renderer, xyz[:, 0], xyz[:, 1], tt.viewport, wc)
 
+    actors = []
     for i in range(n):
         t = vtk.vtkTextActor()
-        p = t.GetTextProperty()
-        prepTextProperty(p, sz, to, tt, cmap)
-        pts = vtk.vtkPoints()
-        pts.InsertNextPoint(x[i], y[i], 0.)
-        if vcs.elements["projection"][tt.projection].type != "linear":
-            _, pts = project(pts, tt.projection, tt.worldcoordinate, geo=geo)
-            X, Y, tz = pts.GetPoint(0)
-            if wc is None:
-                wc = tt.worldcoordinate
-                pts_wc = vtk.vtkPoints()
-                # Scan a bunch of points within wc
-                # In case the proj deformation bring origin close
-                # from each others
-                for wx in numpy.arange(wc[0], wc[1], (wc[1] - wc[0]) / 25.):
-                    for wy in numpy.arange(wc[2], wc[3], (wc[3] - wc[2]) / 25.):
-                        pts_wc.InsertNextPoint(wx, wy, 0.)
-                _, pts_wc = project(pts_wc, tt.projection, tt.worldcoordinate, geo=geo)
-                as_numpy = VN.vtk_to_numpy(pts_wc.GetData())
-                wx = as_numpy[:, 0]
-                wy = as_numpy[:, 1]
-                wc = [wx.min(), wx.max(), wy.min(), wy.max()]
-            X, Y = world2Renderer(renderer, X, Y, tt.viewport, wc)
-        else:
-            X, Y = world2Renderer(
-                renderer, x[i], y[i], tt.viewport, tt.worldcoordinate)
-        t.SetPosition(X, Y)
+        t.GetTextProperty().ShallowCopy(p)
+        t.SetPosition(X[i], Y[i])
         t.SetInput(string[i])
-
-        item = vtk.vtkPythonItem()
-        item.SetPythonObject(TextActorWrapperItem(t))
-        contextArea.GetDrawAreaItem().AddItem(item)
-
         actors.append(t)
 
+    item = vtk.vtkPythonItem()
+    item.SetPythonObject(TextActorsWrapperItem(actors, p))
+    contextArea.GetDrawAreaItem().AddItem(item)
+
     return actors
 
 
@@ -1555,13 +1936,21 @@ def prepPrimitive(prim):
     return n
 
 
-def __build_pd__():
+def genPolygonsPolyData(xyz, lengths, selected):
+    '''
+    Returns a polydata with the 'selected' polygons, where 'xyz' has the
+    points of all polygons back to back and 'lengths' their number of
+    points.
+    '''
+    counts = lengths[selected]
+    offsets = numpy.zeros(len(counts) + 1, dtype=numpy.int64)
+    numpy.cumsum(counts, out=offsets[1:])
     pts = vtk.vtkPoints()
-    polygons = vtk.vtkCellArray()
+    pts.SetData(numpy_to_vtk_wrapper(numpy.ascontiguousarray(xyz[numpy.repeat(selected, lengths)]), deep=True))
     polygonPolyData = vtk.vtkPolyData()
     polygonPolyData.SetPoints(pts)
-    polygonPolyData.SetPolys(polygons)
-    return pts, polygons, polygonPolyData
+    polygonPolyData.SetPolys(numpy_to_vtkCellArray(offsets, numpy.arange(offsets[-1])))
+    return polygonPolyData
 
 
 def prepFillarea(context, renWin, farea, cmap=None):
@@ -1613,89 +2002,53 @@ def prepFillarea(context, renWin, farea, cmap=None):
     if isinstance(cmap, str):
         cmap = vcs.elements["colormap"][cmap]
 
-    # Create data structures
-    pts, polygons, polygonPolyData = __build_pd__()
-    colors = vtk.vtkUnsignedCharArray()
-    colors.SetNumberOfComponents(4)
-    colors.SetNumberOfTuples(n)
-    colors.SetName("Colors")
-    polygonPolyData.GetCellData().SetScalars(colors)
-
-    pattern_polydatas = []
-
-    # Iterate through polygons:
+    # All polygons go in one points array, polygon i uses the points
+    # offsets[i]:offsets[i + 1]
+    lengths = numpy.array([len(x) for x in farea.x[:n]], dtype=numpy.int64)
+    assert(numpy.array_equal(lengths, [len(y) for y in farea.y[:n]]))
+    offsets = numpy.zeros(n + 1, dtype=numpy.int64)
+    numpy.cumsum(lengths, out=offsets[1:])
+    xyz = numpy.zeros((offsets[-1], 3))
+    xyz[:, 0] = numpy.fromiter(itertools.chain.from_iterable(farea.x[:n]), dtype=numpy.float64, count=offsets[-1])
+    xyz[:, 1] = numpy.fromiter(itertools.chain.from_iterable(farea.y[:n]), dtype=numpy.float64, count=offsets[-1])
+
+    # Colors: colored background for solid,
+    # the pattern color for hatches/patterns
+    styles = numpy.array(farea.style[:n])
+    isSolid = styles == "solid"
+    colors = []
     for i in range(n):
-        x = farea.x[i]
-        y = farea.y[i]
-        st = farea.style[i]
-        if st == "pattern":
+        if farea.style[i] == "pattern":
             c = (0., 0., 0., 100.)
         else:
             c = farea.color[i]
-
-        if st == "solid":
-            points, polys, pd, color_arr = pts, polygons, polygonPolyData, colors
-        else:
-            points, polys, pd = __build_pd__()
-            color_arr = vtk.vtkUnsignedCharArray()
-            color_arr.SetNumberOfComponents(4)
-            color_arr.SetNumberOfTuples(1)
-            color_arr.SetName("BackgroundColors")
-            pd.GetCellData().SetScalars(color_arr)
-            pattern_polydatas.append([i, pd])
-
-        N = max(len(x), len(y))
-
-        for a in [x, y]:
-            assert(len(a) == N)
-
-        polygon = vtk.vtkPolygon()
-        # Add current polygon
-        pid = polygon.GetPointIds()
-        pid.SetNumberOfIds(N)
-
-        for j in range(N):
-            pid.SetId(j, points.InsertNextPoint(x[j], y[j], 0.))
-        cellId = polys.InsertNextCell(polygon)
-
         if isinstance(c, int):
-            color = [C for C in cmap.index[c]]
-        else:
-            color = [C for C in c]
-        if len(farea.opacity) > i:
-            opacity = farea.opacity[i]
-            if opacity is not None:
-                opacity = farea.opacity[i]
-        else:
-            opacity = None
-        # Draw colored background for solid
-        # transparent/white background for hatches/patterns
-        # Add the color to the color array:
+            c = cmap.index[c]
+        if len(c) == 3:
+            c = list(c) + [100.]
+        colors.append(c)
+    colors = numpy.array(colors, dtype=numpy.float64)
+    for i, opacity in enumerate((farea.opacity or [])[:n]):
         if opacity is not None:
-            color[-1] = opacity
-        color = [int(C / 100. * 255) for C in color]
-        if st == 'solid':
-            # In this case, colors is our scalar array
-            # so, add the color at the cell index
-            color_arr.SetTypedTuple(cellId, color)
-        else:
-            # In this case, colors is a backup array that represents colors
-            # for the pattern in each polygon. Each tuple in the colors array
-            # should represent the pattern color for the indexed polygon
-            colors.SetTypedTuple(i, color)
-            # color_arr is our scalar array
-            color_arr.SetTypedTuple(cellId, [255, 255, 255, 0])
+            colors[i, -1] = opacity
+    colors = (colors / 100. * 255).astype(numpy.uint8)
 
     # Transform points
+    pts = vtk.vtkPoints()
+    pts.SetData(numpy_to_vtk_wrapper(xyz, deep=False))
     geo, pts = project(pts, farea.projection, farea.worldcoordinate)
-    polygonPolyData.SetPoints(pts)
-
-    # for concave polygons
-    tris = vtk.vtkTriangleFilter()
-    tris.SetInputData(polygonPolyData)
+    projected = VN.vtk_to_numpy(pts.GetData())
 
     # If we had at least one "solid" style area
-    if pts.GetNumberOfPoints() > 0:
+    if isSolid.any():
+        polygonPolyData = genPolygonsPolyData(projected, lengths, isSolid)
+        colorArray = numpy_to_vtk_wrapper(colors[isSolid], deep=True)
+        colorArray.SetName("Colors")
+        polygonPolyData.GetCellData().SetScalars(colorArray)
+
+        # for concave polygons
+        tris = vtk.vtkTriangleFilter()
+        tris.SetInputData(polygonPolyData)
         tris.Update()
         solidPoly = tris.GetOutput()
         item = vtk.vtkPolyDataItem()
@@ -1707,51 +2060,54 @@ def prepFillarea(context, renWin, farea, cmap=None):
         item.SetMappedColors(colorArray)
         area.GetDrawAreaItem().AddItem(item)
 
-    # Patterns/hatches support
-    for i, pd in pattern_polydatas:
-        st = farea.style[i]
-        if st != "solid":
-            geo, proj_points = project(
-                pd.GetPoints(), farea.projection, farea.worldcoordinate)
-            pd.SetPoints(proj_points)
-
-            cellcolor = [0, 0, 0, 0]
-            colors.GetTypedTuple(i, cellcolor)
-            pcolor = [indC * 100. / 255.0 for indC in cellcolor]
-
-            if len(farea.x[i]) >= 3:
-                screenGeom = [
-                    (farea.x[i][1] - farea.x[i][0]) * renWinWidth,
-                    (farea.y[i][2] - farea.y[i][1]) * renWinHeight
-                ]
-            else:
-                screenGeom = [
-                    (farea.viewport[1] - farea.viewport[0]) * renWinWidth,
-                    (farea.viewport[3] - farea.viewport[2]) * renWinHeight
-                ]
-
-            act = fillareautils.make_patterned_polydata(pd,
-                                                        st,
-                                                        fillareaindex=farea.index[i],
-                                                        fillareacolors=pcolor,
-                                                        fillareaopacity=pcolor[3],
-                                                        fillareapixelspacing=farea.pixelspacing,
-                                                        fillareapixelscale=farea.pixelscale,
-                                                        size=[renWinWidth, renWinHeight],
-                                                        screenGeom=screenGeom)
-            if act is not None:
-                patMapper = act.GetMapper()
-                patMapper.Update()
-                patPoly = patMapper.GetInput()
-
-                item = vtk.vtkPolyDataItem()
-                item.SetPolyData(patPoly)
-
-                item.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
-                colorArray = patPoly.GetCellData().GetArray('Colors')
-
-                item.SetMappedColors(colorArray)
-                area.GetDrawAreaItem().AddItem(item)
+    # Patterns/hatches support, one pattern per (style, index, color)
+    patternGroups = {}
+    for i in numpy.flatnonzero(~isSolid):
+        key = (farea.style[i], farea.index[i], tuple(colors[i]))
+        patternGroups.setdefault(key, []).append(i)
+    for (st, index, cellcolor), group in patternGroups.items():
+        selected = numpy.zeros(n, dtype=bool)
+        selected[group] = True
+        pd = genPolygonsPolyData(projected, lengths, selected)
+        backgroundColors = numpy_to_vtk_wrapper(
+            numpy.tile(numpy.array([255, 255, 255, 0], dtype=numpy.uint8), (len(group), 1)), deep=True)
+        backgroundColors.SetName("BackgroundColors")
+        pd.GetCellData().SetScalars(backgroundColors)
+        pcolor = [indC * 100. / 255.0 for indC in cellcolor]
+
+        # the pattern is sized on the extent of the group in world coordinates
+        groupXY = xyz[numpy.repeat(selected, lengths), :2]
+        extent = groupXY.max(axis=0) - groupXY.min(axis=0)
+        if extent[0] > 0 and extent[1] > 0:
+            screenGeom = [extent[0] * renWinWidth, extent[1] * renWinHeight]
+        else:
+            screenGeom = [
+                (farea.viewport[1] - farea.viewport[0]) * renWinWidth,
+                (farea.viewport[3] - farea.viewport[2]) * renWinHeight
+            ]
+
+        act = fillareautils.make_patterned_polydata(pd,
+                                                    st,
+                                                    fillareaindex=index,
+                                                    fillareacolors=pcolor,
+                                                    fillareaopacity=pcolor[3],
+                                                    fillareapixelspacing=farea.pixelspacing,
+                                                    fillareapixelscale=farea.pixelscale,
+                                                    size=[renWinWidth, renWinHeight],
+                                                    screenGeom=screenGeom)
+        if act is not None:
+            patMapper = act.GetMapper()
+            patMapper.Update()
+            patPoly = patMapper.GetInput()
+
+            item = vtk.vtkPolyDataItem()
+            item.SetPolyData(patPoly)
+
+            item.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
+            colorArray = patPoly.GetCellData().GetArray('Colors')
+
+            item.SetMappedColors(colorArray)
+            area.GetDrawAreaItem().AddItem(item)
 
     return actors
 
@@ -2027,18 +2383,6 @@ def prepMarker(marker, screenGeom, scale=None, cmap=None):
     return actors
 
 
-def __build_ld__():
-    pts = vtk.vtkPoints()
-    lines = vtk.vtkCellArray()
-    linePolyData = vtk.vtkPolyData()
-    linePolyData.SetPoints(pts)
-    linePolyData.SetLines(lines)
-    colors = vtk.vtkUnsignedCharArray()
-    colors.SetNumberOfComponents(4)
-    colors.SetName("Colors")
-    return pts, lines, linePolyData, colors
-
-
 def stippleLine(prop, line_type):
     if line_type == 'long-dash':
         prop.SetLineStipplePattern(int('0000111111111111', 2))
@@ -2104,6 +2448,27 @@ def getProjectedBoundsForWorldCoords(wc, proj, subdiv=50):
     return xformPts.GetBounds()
 
 
+def densifyLine(x, y, NPointsInterp):
+    '''
+    Returns the (n, 3) points of the line going through 'x', 'y' with
+    NPointsInterp points per segment (the segment end included) so that
+    it bends once projected. The shorter of x, y is extended by
+    repeating its last value.
+    '''
+    x = numpy.asarray(x, dtype=numpy.float64)
+    y = numpy.asarray(y, dtype=numpy.float64)
+    number_points = max(len(x), len(y))
+    xyz = numpy.zeros((number_points, 3))
+    xyz[:len(x), 0] = x
+    xyz[len(x):, 0] = x[-1]
+    xyz[:len(y), 1] = y
+    xyz[len(y):, 1] = y[-1]
+    if NPointsInterp > 1 and number_points > 1:
+        segments = numpy.linspace(xyz[:-1], xyz[1:], NPointsInterp + 1, axis=1)[:, 1:]
+        xyz = numpy.concatenate((xyz[:1], segments.reshape((-1, 3))))
+    return xyz
+
+
 def prepLine(plotsContext, line, geoBounds=None, cmap=None):
     numDivisions = 50
     if vcs.elements["projection"][line.projection].type == "aeqd":
@@ -2139,10 +2504,15 @@ def prepLine(plotsContext, line, geoBounds=None, cmap=None):
     if isinstance(cmap, str):
         cmap = vcs.elements["colormap"][cmap]
 
-    for i in range(number_lines):
+    projectionType = vcs.elements["projection"][line.projection].type
+    if projectionType == "linear":
+        NPointsInterp = 1
+    elif projectionType in round_projections:
+        NPointsInterp = 50
+    else:
+        NPointsInterp = 25
 
-        x = line.x[i]
-        y = line.y[i]
+    for i in range(number_lines):
         if isinstance(line.color[i], int):
             c = cmap.index[line.color[i]]
         else:
@@ -2150,56 +2520,29 @@ def prepLine(plotsContext, line, geoBounds=None, cmap=None):
         w = line.width[i]
         t = line.type[i]
 
-        if (t, w) not in line_data:
-            line_data[(t, w)] = __build_ld__()
-        pts, lines, linesPoly, colors = line_data[(t, w)]
+        xyz = densifyLine(line.x[i], line.y[i], NPointsInterp)
+        if len(xyz) < 2:
+            continue
         vtk_color = [int(component / 100. * 255) for component in c]
+        if len(vtk_color) == 3:
+            vtk_color.append(255)
 
-        number_points = max(len(x), len(y))
-
-        point_offset = pts.GetNumberOfPoints()
-        # Extend x or y to the length of the other by duplicating the last
-        # coord.
-        for a in [x, y]:
-            while len(a) < number_points:
-                a.append(a[-1])
-
-        if vcs.elements["projection"][line.projection].type == "linear":
-            for j in range(number_points):
-                pts.InsertNextPoint(x[j], y[j], 0.)
-            n2 = number_points - 1
-        else:
-            pts.InsertNextPoint(x[0], y[0], 0.)
-            n2 = 0
-            for j in range(1, number_points):
-                if vcs.elements["projection"][
-                        line.projection].type in round_projections:
-                    NPointsInterp = 50
-                else:
-                    NPointsInterp = 25
-                for i in range(1, NPointsInterp + 1):
-                    if x[j] != x[j - 1]:
-                        tmpx = x[j - 1] + \
-                            float(i) / NPointsInterp * (x[j] - x[j - 1])
-                    else:
-                        tmpx = x[j]
-                    if y[j] != y[j - 1]:
-                        tmpy = y[j - 1] + \
-                            float(i) / NPointsInterp * (y[j] - y[j - 1])
-                    else:
-                        tmpy = y[j]
-                    pts.InsertNextPoint(tmpx, tmpy, 0.)
-                    n2 += 1
-        for j in range(n2):
-            colors.InsertNextTypedTuple(vtk_color)
-            ln_tmp = vtk.vtkLine()
-            ln_tmp.GetPointIds().SetId(0, j + point_offset)
-            ln_tmp.GetPointIds().SetId(1, j + point_offset + 1)
-            lines.InsertNextCell(ln_tmp)
+        # one polyline per line
+        points, colors = line_data.setdefault((t, w), ([], []))
+        points.append(xyz)
+        colors.append(vtk_color)
 
     for t, w in line_data:
-        pts, _, linesPoly, colors = line_data[(t, w)]
-
+        points, lineColors = line_data[(t, w)]
+        counts = [len(xyz) for xyz in points]
+        pts = vtk.vtkPoints()
+        pts.SetData(numpy_to_vtk_wrapper(numpy.concatenate(points), deep=True))
+        offsets = numpy.zeros(len(counts) + 1, dtype=numpy.int64)
+        numpy.cumsum(counts, out=offsets[1:])
+        linesPoly = vtk.vtkPolyData()
+        linesPoly.SetLines(numpy_to_vtkCellArray(offsets, numpy.arange(offsets[-1])))
+        colors = numpy_to_vtk_wrapper(numpy.array(lineColors, dtype=numpy.uint8), deep=True)
+        colors.SetName("Colors")
         linesPoly.GetCellData().SetScalars(colors)
         geoTransform, pts = project(pts, line.projection, line.worldcoordinate)
         linesPoly.SetPoints(pts)
@@ -2329,18 +2672,17 @@ def starPoints(radius_outer, x, y, number_points=5):
     return points
 
 
+def generateVectorValues(data1, data2):
+    """Returns the (u, v, 0) vectors of data1, data2 as a (n, 3) array"""
+    u = numpy.ma.getdata(data1).ravel()
+    w = numpy.zeros((len(u), 3))
+    w[:, 0] = u
+    w[:, 1] = numpy.ma.getdata(data2).ravel()
+    return w
+
+
 def generateVectorArray(data1, data2):
-    u = numpy.ma.ravel(data1)
-    v = numpy.ma.ravel(data2)
-    sh = list(u.shape)
-    sh.append(1)
-    u = numpy.reshape(u, sh)
-    v = numpy.reshape(v, sh)
-    z = numpy.zeros(u.shape)
-    w = numpy.concatenate((u, v), axis=1)
-    w = numpy.concatenate((w, z), axis=1)
-
-    w = numpy_to_vtk_wrapper(w, deep=False)
+    w = numpy_to_vtk_wrapper(generateVectorValues(data1, data2), deep=False)
     w.SetName("vector")
     return w
 
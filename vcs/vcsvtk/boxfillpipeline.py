@@ -1,9 +1,9 @@
 from .pipeline2d import Pipeline2D
-from . import fillareautils
 
 import numpy
 import vcs
 import vtk
+from vtk.util import numpy_support as VN
 
 from .. import vcs2vtk
 
@@ -60,6 +60,18 @@ class BoxfillPipeline(Pipeline2D):
         # Use consecutive colors:
         self._contourColors = list(range(self._gm.color_1, self._gm.color_2 + 1))
 
+    def updateData(self, data1, data2=None):
+        """Overrides baseclass implementation."""
+        previous = (self._min, self._max)
+        data, unchanged = super(BoxfillPipeline, self).updateData(data1, data2)
+        if unchanged and self._gm.boxfill_type != "custom":
+            # open ended levels color from the data min/max
+            if numpy.allclose(self._contourLevels[0], -1.e20) and self._min != previous[0]:
+                unchanged = False
+            if numpy.allclose(self._contourLevels[-1], 1.e20) and self._max != previous[1]:
+                unchanged = False
+        return data, unchanged
+
     def _plotInternal(self):
         """Overrides baseclass implementation."""
         # Special case for custom boxfills:
@@ -85,9 +97,6 @@ class BoxfillPipeline(Pipeline2D):
 
         # And now we need actors to actually render this thing
         actors = []
-        cti = 0
-        ctj = 0
-        _colorMap = self.getColorMap()
         _style = self._gm.fillareastyle
         vp = self._resultDict.get(
             'ratio_autot_viewport',
@@ -166,45 +175,13 @@ class BoxfillPipeline(Pipeline2D):
                     actors.append([item, plotting_dataset_bounds])
 
             if mapper is not self._maskedDataMapper:
-                if self._gm.boxfill_type == "custom":
-                    # Patterns/hatches creation for custom boxfill plots
-                    patact = None
-
-                    tmpColors = self._customBoxfillArgs["tmpColors"]
-                    if ctj >= len(tmpColors[cti]):
-                        ctj = 0
-                        cti += 1
-                    # Since pattern creation requires a single color, assuming the first
-                    c = self.getColorIndexOrRGBA(_colorMap, tmpColors[cti][ctj])
-
-                    patact = fillareautils.make_patterned_polydata(
-                        poly,
-                        fillareastyle=_style,
-                        fillareaindex=self._customBoxfillArgs["tmpIndices"][cti],
-                        fillareacolors=c,
-                        fillareaopacity=self._customBoxfillArgs["tmpOpacities"][cti],
-                        fillareapixelspacing=fareapixelspacing,
-                        fillareapixelscale=fareapixelscale,
-                        size=self._context().renWin.GetSize(),
-                        screenGeom=self._context().renWin.GetSize())
-
-                    ctj += 1
-
-                    if patact is not None:
-                        patMapper = patact.GetMapper()
-                        patMapper.Update()
-                        patPoly = patMapper.GetInput()
-
-                        patItem = vtk.vtkPolyDataItem()
-                        patItem.SetPolyData(patPoly)
-
-                        patItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
-                        colorArray = patPoly.GetCellData().GetArray('Colors')
-
-                        patItem.SetMappedColors(colorArray)
-                        area.GetDrawAreaItem().AddItem(patItem)
-
-                        actors.append([patItem, plotting_dataset_bounds])
+                if self._gm.boxfill_type == "custom" and _style != "solid":
+                    # Patterns/hatches creation for custom boxfill plots,
+                    # one item per level
+                    actors.extend(self._addPatternItems(
+                        area, self._customBoxfillPatterns(fareapixelspacing, fareapixelscale),
+                        plotting_dataset_bounds))
+                    self._drawPatterns(poly, VN.vtk_to_numpy(poly.GetCellData().GetScalars()))
 
             midx += 1
 
@@ -317,12 +294,9 @@ class BoxfillPipeline(Pipeline2D):
         while len(self._contourColors) < numLevels:
             self._contourColors.append(self._contourColors[-1])
 
-        lut = vtk.vtkLookupTable()
-        lut.SetNumberOfTableValues(numLevels)
         _colorMap = self.getColorMap()
-        for i in range(numLevels):
-            r, g, b, a = self.getColorIndexOrRGBA(_colorMap, self._contourColors[i])
-            lut.SetTableValue(i, r / 100., g / 100., b / 100., a / 100.)
+        lut = vcs2vtk.createLookupTable(
+            self.getColorsRGBA(_colorMap, self._contourColors[:numLevels]))
 
         mapper.SetLookupTable(lut)
         if numpy.allclose(self._contourLevels[0], -1.e20):
@@ -338,58 +312,67 @@ class BoxfillPipeline(Pipeline2D):
 
     def _plotInternalCustomBoxfill(self):
         """Implements the logic to render a custom boxfill."""
-        self._mappers = []
-
         self._customBoxfillArgs = self._prepContours()
         tmpLevels = self._customBoxfillArgs["tmpLevels"]
         tmpColors = self._customBoxfillArgs["tmpColors"]
+        tmpIndices = self._customBoxfillArgs["tmpIndices"]
         tmpOpacities = self._customBoxfillArgs["tmpOpacities"]
 
         style = self._gm.fillareastyle
 
-        luts = []
-        geos = []
-        wholeDataMin, wholeDataMax = vcs.minmax(self._originalData1)
-        _colorMap = self.getColorMap()
+        # One [low, high] level per color, with what it needs for
+        # coloring and patterning
+        levels = []
+        customLevels = []
         for i, l in enumerate(tmpLevels):
-            # Ok here we are trying to group together levels can be, a join
-            # will happen if: next set of levels continues where one left off
-            # AND pattern is identical
-
-            # TODO this should really just be a single polydata/mapper/actor:
             for j, color in enumerate(tmpColors[i]):
-                mapper = vtk.vtkPolyDataMapper()
-                lut = vtk.vtkLookupTable()
-                th = vtk.vtkThreshold()
-                th.ThresholdBetween(l[j], l[j + 1])
-                # th.SetInputConnection(self._vtkPolyDataFilter.GetOutputPort())
-                th.SetInputData(self._vtkDataSetFittedToViewport)
-                geoFilter2 = vtk.vtkDataSetSurfaceFilter()
-                geoFilter2.SetInputConnection(th.GetOutputPort())
-                # Make the polydata output available here for patterning later
-                geoFilter2.Update()
-                geos.append(geoFilter2)
-                mapper.SetInputConnection(geoFilter2.GetOutputPort())
-                lut.SetNumberOfTableValues(1)
-                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, color)
-                if style == 'solid':
-                    tmpOpacity = tmpOpacities[j]
-                    if tmpOpacity is None:
-                        tmpOpacity = a / 100.
-                    else:
-                        tmpOpacity = tmpOpacities[j] / 100.
-                    lut.SetTableValue(0, r / 100., g / 100., b / 100., tmpOpacity)
-                else:
-                    lut.SetTableValue(0, 1., 1., 1., 0.)
-                mapper.SetLookupTable(lut)
-                mapper.SetScalarRange(l[j], l[j + 1])
-                luts.append([lut, [l[j], l[j + 1], False]])
-                # Store the mapper only if it's worth it?
-                # Need to do it with the whole slab min/max for animation
-                # purposes
-                if not (l[j + 1] < wholeDataMin or l[j] > wholeDataMax):
-                    self._mappers.append(mapper)
-
-        self._resultDict["vtk_backend_luts"] = luts
-        if len(geos) > 0:
-            self._resultDict["vtk_backend_geofilters"] = geos
+                levels.append([l[j], l[j + 1]])
+                customLevels.append({"color": color,
+                                     "index": tmpIndices[i],
+                                     "opacity": tmpOpacities[j],
+                                     "patternOpacity": tmpOpacities[i]})
+        self._customBoxfillArgs["levels"] = levels
+        self._customBoxfillArgs["customLevels"] = customLevels
+
+        # Bin all cells into their level in a single pass, cells outside
+        # of every level are dropped
+        poly = vcs2vtk.classifyCells(self._vtkDataSetFittedToViewport, levels)
+        mapper = vtk.vtkPolyDataMapper()
+        mapper.SetInputData(poly)
+        self._mappers = [mapper]
+
+        # and color them with a single lookup table, indexed by level
+        _colorMap = self.getColorMap()
+        lut = vcs2vtk.createLookupTable(
+            self.getColorsRGBA(_colorMap, [level["color"] for level in customLevels]),
+            opacities=[level["opacity"] for level in customLevels],
+            transparent=(style != 'solid'))
+        mapper.SetLookupTable(lut)
+        scalarRange = [-.5, len(levels) - .5]
+        mapper.SetScalarRange(scalarRange)
+
+        self._resultDict["vtk_backend_luts"] = [[lut, scalarRange + [True]]]
+        self._resultDict["vtk_backend_geofilters"] = [self._vtkPolyDataFilter]
+        self._resultDict["vtk_backend_custom_levels"] = {"levels": levels}
+
+    def _customBoxfillPatterns(self, fareapixelspacing, fareapixelscale):
+        """Returns the pattern/hatch of each level of a custom boxfill, as
+        fillareautils.make_patterned_polydata keywords."""
+        _colorMap = self.getColorMap()
+        patterns = {}
+        for k, level in enumerate(self._customBoxfillArgs["customLevels"]):
+            patterns[k] = dict(
+                fillareastyle=self._gm.fillareastyle,
+                fillareaindex=level["index"],
+                fillareacolors=self.getColorIndexOrRGBA(_colorMap, level["color"]),
+                fillareaopacity=level["patternOpacity"],
+                fillareapixelspacing=fareapixelspacing,
+                fillareapixelscale=fareapixelscale,
+                size=self._context().renWin.GetSize(),
+                screenGeom=self._context().renWin.GetSize())
+        return patterns
+
+    def updatePatternItems(self):
+        """Overrides baseclass implementation."""
+        poly = vcs2vtk.classifyCells(self._vtkDataSetFittedToViewport, self._customBoxfillArgs["levels"])
+        self._drawPatterns(poly, VN.vtk_to_numpy(poly.GetCellData().GetScalars()))
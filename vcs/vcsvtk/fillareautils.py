@@ -1,4 +1,5 @@
 
+import collections
 import vtk
 import vtk.util.numpy_support as ns
 import numpy as np
@@ -72,11 +73,77 @@ def computeMarkerScale(dataRange, screenGeom, pxScale=None):
     return scale
 
 
+# Glyphing the pattern lattice is the expensive part of a patterned fill,
+# redraws of the same plot ask for the same tiles again: keep the last
+# patternTilesSize glyphed lattices, keyed by everything they depend on
+patternTiles = collections.OrderedDict()
+patternTilesSize = 32
+
+
+def make_lattice(bounds, xres, yres, window=None):
+    """Returns the xres x yres lattice over 'bounds' as a vtkPolyData
+    (points, normals and texture coordinates, row by row from the bottom
+    left corner). 'window' = (i0, i1, j0, j1) keeps only the rows i0:i1
+    and columns j0:j1 of the lattice."""
+    if window is None:
+        window = (0, yres + 1, 0, xres + 1)
+    i0, i1, j0, j1 = window
+    tc0, tc1 = np.meshgrid(np.arange(i0, i1) / float(max(yres, 1)),
+                           np.arange(j0, j1) / float(max(xres, 1)),
+                           indexing="ij")
+    numPts = tc0.size
+    pts = np.zeros((numPts, 3), dtype=np.float32)
+    pts[:, 0] = bounds[0] + tc1.ravel() * (bounds[1] - bounds[0])
+    pts[:, 1] = bounds[2] + tc0.ravel() * (bounds[3] - bounds[2])
+    tc = np.empty((numPts, 2), dtype=np.float32)
+    tc[:, 0] = tc0.ravel()
+    tc[:, 1] = tc1.ravel()
+    nm = np.zeros((numPts, 3), dtype=np.float32)
+    nm[:, 2] = 1.0
+
+    patternPolyData = vtk.vtkPolyData()
+    patternPts = vtk.vtkPoints()
+    patternPts.SetData(ns.numpy_to_vtk(pts, deep=True))
+    patternPolyData.SetPoints(patternPts)
+    normals = ns.numpy_to_vtk(nm, deep=True)
+    normals.SetName("Normals")
+    patternPolyData.GetPointData().SetNormals(normals)
+    tcoords = ns.numpy_to_vtk(tc, deep=True)
+    tcoords.SetName("TextureCoordinates")
+    patternPolyData.GetPointData().SetTCoords(tcoords)
+    return patternPolyData
+
+
+def lattice_window(bounds, latticeBounds, xres, yres):
+    """Returns the (i0, i1, j0, j1) rows and columns of the latticeBounds
+    lattice needed to cover 'bounds' (with one lattice step of margin
+    so that glyphs overlapping the border are kept)."""
+    window = []
+    for lo, hi, llo, lhi, res in [(bounds[2], bounds[3], latticeBounds[2], latticeBounds[3], yres),
+                                  (bounds[0], bounds[1], latticeBounds[0], latticeBounds[1], xres)]:
+        if lhi == llo:
+            window += [0, res + 1]
+            continue
+        step = (lhi - llo) / float(max(res, 1))
+        first = int(np.floor((lo - llo) / step)) - 1
+        last = int(np.ceil((hi - llo) / step)) + 2
+        window += [min(max(first, 0), res + 1), min(max(last, 0), res + 1)]
+    return tuple(window)
+
+
 def make_patterned_polydata(inputContours, fillareastyle=None,
                             fillareaindex=None, fillareacolors=None,
                             fillareaopacity=None,
                             fillareapixelspacing=None, fillareapixelscale=None,
-                            size=None, screenGeom=None, vpScale=[1.0, 1.0]):
+                            size=None, screenGeom=None, vpScale=[1.0, 1.0],
+                            latticeBounds=None):
+    """Returns an actor filling inputContours with the pattern/hatch.
+
+    By default the pattern lattice spans the bounds of inputContours.
+    Passing the same latticeBounds (e.g. the bounds of the whole plot)
+    for all the bands of a plot lays them all on one lattice: the
+    glyph size and spacing match across bands and each band only cuts
+    its part of the shared lattice."""
     if inputContours is None or fillareastyle == 'solid':
         return None
     if inputContours.GetNumberOfCells() == 0:
@@ -98,15 +165,16 @@ def make_patterned_polydata(inputContours, fillareastyle=None,
     # Create a point set laid out on a plane that will be glyphed with the
     # pattern / hatch
     # The bounds of the plane match the bounds of the input polydata
+    # or the shared lattice bounds
     bounds = inputContours.GetBounds()
+    if latticeBounds is None:
+        latticeBounds = bounds
+    latticeBounds = tuple(float(b) for b in latticeBounds[:4])
 
-    patternPolyData = vtk.vtkPolyData()
-    patternPts = vtk.vtkPoints()
-    patternPolyData.SetPoints(patternPts)
-
-    xBounds = bounds[1] - bounds[0]
-    yBounds = bounds[3] - bounds[2]
+    xBounds = latticeBounds[1] - latticeBounds[0]
+    yBounds = latticeBounds[3] - latticeBounds[2]
 
+    scale = [1.0, 1.0]
     if screenGeom is not None:
         [xres, yres], scale = computeResolutionAndScale([xBounds, yBounds],
                                                         screenGeom,
@@ -121,42 +189,23 @@ def make_patterned_polydata(inputContours, fillareastyle=None,
         xres = int(xBounds / 3)
         yres = int(yBounds / 3)
 
-    numPts = (xres + 1) * (yres + 1)
-    patternPts.Allocate(numPts)
-    normals = vtk.vtkFloatArray()
-    normals.SetName("Normals")
-    normals.SetNumberOfComponents(3)
-    normals.Allocate(3 * numPts)
-    tcoords = vtk.vtkFloatArray()
-    tcoords.SetName("TextureCoordinates")
-    tcoords.SetNumberOfComponents(2)
-    tcoords.Allocate(2 * numPts)
-
-    x = [0.0, 0.0, 0.0]
-    tc = [0.0, 0.0]
-    v1 = [0.0, bounds[3] - bounds[2]]
-    v2 = [bounds[1] - bounds[0], 0.0]
-    normal = [0.0, 0.0, 1.0]
-    numPt = 0
-    for i in range(yres + 1):
-        tc[0] = i * 1.0 / yres
-        for j in range(xres + 1):
-            tc[1] = j * 1.0 / xres
-            for ii in range(2):
-                x[ii] = bounds[2 * ii] + tc[0] * v1[ii] + tc[1] * v2[ii]
-            patternPts.InsertPoint(numPt, x)
-            tcoords.InsertTuple(numPt, tc)
-            normals.InsertTuple(numPt, normal)
-            numPt += 1
-    patternPolyData.GetPointData().SetNormals(normals)
-    patternPolyData.GetPointData().SetTCoords(tcoords)
+    window = lattice_window(bounds, latticeBounds, xres, yres)
 
     # Create the pattern
     scale_max = max(*scale)
-    create_pattern(patternPolyData, [scale_max, scale_max],
-                   fillareastyle, fillareaindex)
+    key = (fillareastyle, fillareaindex, scale_max, xres, yres,
+           latticeBounds, window)
+    patternPolyData = patternTiles.pop(key, None)
+    if patternPolyData is None:
+        patternPolyData = make_lattice(latticeBounds, xres, yres, window)
+        create_pattern(patternPolyData, [scale_max, scale_max],
+                       fillareastyle, fillareaindex)
+        while len(patternTiles) >= patternTilesSize:
+            patternTiles.popitem(last=False)
+    patternTiles[key] = patternPolyData
 
     # Create pipeline to create a clipped polydata from the pattern plane.
+    # The cached tile is only read by the cutter
     cutter = vtk.vtkCookieCutter()
     cutter.SetInputData(patternPolyData)
     cutter.SetLoopsData(inputContours)
@@ -1,10 +1,10 @@
 from .pipeline2d import Pipeline2D
-from . import fillareautils
 from .. import vcs2vtk
 
 import numpy
 import vcs
 import vtk
+from vtk.util import numpy_support as VN
 
 
 class IsofillPipeline(Pipeline2D):
@@ -18,6 +18,12 @@ class IsofillPipeline(Pipeline2D):
     def _updateContourLevelsAndColors(self):
         self._updateContourLevelsAndColorsGeneric()
 
+    def updatePatternItems(self):
+        """Overrides baseclass implementation."""
+        poly = vcs2vtk.classifyCells(self._resultDict["vtk_backend_contours"][0].GetOutput(),
+                                     **self._resultDict["vtk_backend_custom_levels"])
+        self._drawPatterns(poly, self._levelGroups[VN.vtk_to_numpy(poly.GetCellData().GetScalars())])
+
     def _plotInternal(self):
         """Overrides baseclass implementation."""
         preppedCountours = self._prepContours()
@@ -36,47 +42,46 @@ class IsofillPipeline(Pipeline2D):
         x1, x2, y1, y2 = plotting_dataset_bounds
         fareapixelspacing, fareapixelscale = self._patternSpacingAndScale()
 
+        # One [low, high] level per color, remembering the group (same
+        # pattern) it comes from
+        levels = []
+        levelColors = []
+        levelOpacities = []
+        levelGroups = []
         for i, l in enumerate(tmpLevels):
-            # Ok here we are trying to group together levels can be, a join
-            # will happen if: next set of levels continues where one left off
-            # AND pattern is identical
-            mapper = vtk.vtkPolyDataMapper()
-            lut = vtk.vtkLookupTable()
+            for j, color in enumerate(tmpColors[i]):
+                levels.append([l[j], l[j + 1]])
+                levelColors.append(color)
+                levelOpacities.append(tmpOpacities[j])
+                levelGroups.append(i)
+        levelGroups = numpy.array(levelGroups, dtype=int)
+
+        if levels:
+            # Contour all levels at once, then classify the bands
+            bands = numpy.unique(levels).tolist()
             cot = vtk.vtkBandedPolyDataContourFilter()
             cot.ClippingOn()
-            # cot.SetInputData(self._vtkPolyDataFilter.GetOutput())
             cot.SetInputData(self._vtkDataSetFittedToViewport)
-            cot.SetNumberOfContours(len(l))
+            cot.SetNumberOfContours(len(bands))
             cot.SetClipTolerance(0.)
-            for j, v in enumerate(l):
+            cot.SetScalarModeToValue()
+            for j, v in enumerate(bands):
                 cot.SetValue(j, v)
             cot.Update()
-
             cots.append(cot)
-            mapper.SetInputConnection(cot.GetOutputPort())
-            lut.SetNumberOfTableValues(len(tmpColors[i]))
-            for j, color in enumerate(tmpColors[i]):
-                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, color)
-                if style == 'solid':
-                    tmpOpacity = tmpOpacities[j]
-                    if tmpOpacity is None:
-                        tmpOpacity = a / 100.
-                    else:
-                        tmpOpacity = tmpOpacities[j] / 100.
-                    lut.SetTableValue(j, r / 100., g / 100., b / 100., tmpOpacity)
-                else:
-                    lut.SetTableValue(j, 1., 1., 1., 0.)
-            luts.append([lut, [0, len(l) - 1, True]])
+
+            mapper = vtk.vtkPolyDataMapper()
+            mapper.SetInputData(vcs2vtk.classifyCells(cot.GetOutput(), levels, bands=bands))
+            lut = vcs2vtk.createLookupTable(
+                self.getColorsRGBA(_colorMap, levelColors),
+                opacities=levelOpacities, transparent=(style != 'solid'))
+            scalarRange = [-.5, len(levels) - .5]
+            luts.append([lut, scalarRange + [True]])
             mapper.SetLookupTable(lut)
-            minRange = 0
-            maxRange = len(l) - 1
-            if (i == 0 and self._scalarRange[0] < l[0]):
-                # band 0 is from self._scalarRange[0] to l[0]
-                # we don't show band 0
-                minRange += 1
-            mapper.SetScalarRange(minRange, maxRange)
+            mapper.SetScalarRange(scalarRange)
             mapper.SetScalarModeToUseCellData()
             mappers.append(mapper)
+            self._resultDict["vtk_backend_custom_levels"] = {"levels": levels, "bands": bands}
 
         self._resultDict["vtk_backend_luts"] = luts
         if len(cots) > 0:
@@ -91,11 +96,8 @@ class IsofillPipeline(Pipeline2D):
             while len(self._contourColors) < len(self._contourLevels):
                 self._contourColors.append(self._contourColors[-1])
 
-            lut = vtk.vtkLookupTable()
-            lut.SetNumberOfTableValues(numLevels)
-            for i in range(numLevels):
-                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, self._contourColors[i])
-                lut.SetTableValue(i, r / 100., g / 100., b / 100., a / 100.)
+            lut = vcs2vtk.createLookupTable(
+                self.getColorsRGBA(_colorMap, self._contourColors[:numLevels]))
 
             mapper.SetLookupTable(lut)
             if numpy.allclose(self._contourLevels[0], -1.e20):
@@ -114,7 +116,6 @@ class IsofillPipeline(Pipeline2D):
 
         # And now we need actors to actually render this thing
         actors = []
-        ct = 0
         vp = self._resultDict.get('ratio_autot_viewport',
                                   [self._template.data.x1, self._template.data.x2,
                                    self._template.data.y1, self._template.data.y2])
@@ -145,7 +146,6 @@ class IsofillPipeline(Pipeline2D):
             if not poly:
                 continue
 
-            patact = None
             item = None
 
             if style == "solid":
@@ -180,39 +180,25 @@ class IsofillPipeline(Pipeline2D):
             else:
                 actors.append([item, plotting_dataset_bounds])
 
-            if mapper is not self._maskedDataMapper:
-                # Since pattern creation requires a single color, assuming the first
-                c = self.getColorIndexOrRGBA(_colorMap, tmpColors[ct][0])
-
-                patact = fillareautils.make_patterned_polydata(poly,
-                                                               fillareastyle=style,
-                                                               fillareaindex=tmpIndices[ct],
-                                                               fillareacolors=c,
-                                                               fillareaopacity=tmpOpacities[ct],
-                                                               fillareapixelspacing=fareapixelspacing,
-                                                               fillareapixelscale=fareapixelscale,
-                                                               size=self._context().renWin.GetSize(),
-                                                               screenGeom=[geom[2], geom[3]],
-                                                               vpScale=[self._context_xScale, self._context_yScale])
-
-                if patact is not None:
-                    patMapper = patact.GetMapper()
-                    patMapper.Update()
-                    patPoly = patMapper.GetInput()
-
-                    patItem = vtk.vtkPolyDataItem()
-                    patItem.SetPolyData(patPoly)
-
-                    patItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
-                    colorArray = patPoly.GetCellData().GetArray('Colors')
-
-                    patItem.SetMappedColors(colorArray)
-                    area.GetDrawAreaItem().AddItem(patItem)
-
-                    actors.append([patItem, plotting_dataset_bounds])
-
-                # increment the count
-                ct += 1
+            if mapper is not self._maskedDataMapper and levels and style != "solid":
+                # Patterned groups are subsets of the classified bands, one
+                # item per group
+                patterns = {}
+                for i in range(len(tmpLevels)):
+                    # Since pattern creation requires a single color, assuming the first
+                    patterns[i] = dict(
+                        fillareastyle=style,
+                        fillareaindex=tmpIndices[i],
+                        fillareacolors=self.getColorIndexOrRGBA(_colorMap, tmpColors[i][0]),
+                        fillareaopacity=tmpOpacities[i],
+                        fillareapixelspacing=fareapixelspacing,
+                        fillareapixelscale=fareapixelscale,
+                        size=self._context().renWin.GetSize(),
+                        screenGeom=[geom[2], geom[3]],
+                        vpScale=[self._context_xScale, self._context_yScale])
+                actors.extend(self._addPatternItems(area, patterns, plotting_dataset_bounds))
+                self._levelGroups = levelGroups
+                self._drawPatterns(poly, levelGroups[VN.vtk_to_numpy(poly.GetCellData().GetScalars())])
 
         self._resultDict["vtk_backend_actors"] = actors
 
@@ -145,11 +145,9 @@ class IsolinePipeline(Pipeline2D):
                             int(round((vp[3] - vp[2]) * renWinHeight)))
 
         vcs2vtk.configureContextArea(area, drawAreaBounds, geom)
-
-        # FIXME: This render call is needed to work around a bug somewhere in the
-        # FIXME: vtkContextTransform code, where the transformation represented by
-        # FIXME: Map[To|From]Scene() isn't set up properly until after a render call.
-        self._context().renWin.Render()
+        # Map[To|From]Scene() of the labels needs the transformation before
+        # the first render
+        vcs2vtk.setupContextAreaTransform(area, drawAreaBounds, geom)
 
         for i, l in enumerate(tmpLevels):
             numLevels = len(l)
@@ -164,12 +162,8 @@ class IsolinePipeline(Pipeline2D):
             # TODO remove update
             cot.Update()
 
-            lut = vtk.vtkLookupTable()
-            lut.SetNumberOfTableValues(len(tmpColors[i]))
             cmap = self.getColorMap()
-            for n, col in enumerate(tmpColors[i]):
-                r, g, b, a = self.getColorIndexOrRGBA(cmap, col)
-                lut.SetTableValue(n, r / 100., g / 100., b / 100., a / 100.)
+            lut = vcs2vtk.createLookupTable(self.getColorsRGBA(cmap, tmpColors[i]))
 
             # Setup isoline labels
             if self._gm.label:
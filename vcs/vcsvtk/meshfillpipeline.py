@@ -21,6 +21,9 @@ class MeshfillPipeline(Pipeline2D):
         # We don't trim _data2 for meshfill:
         frame = self._plot_kargs.get("frame", 0)
         self._data1 = vcs.utils.trimData2D(self._originalData1, frame=frame)
+        if self._data2 is self._originalData2:
+            # already converted, this is a data update (updateData)
+            return
         _convert = self._gm.yaxisconvert
         _func = vcs.utils.axisConvertFunctions[_convert]["forward"]
         self._data2 = self._originalData2
@@ -29,6 +32,11 @@ class MeshfillPipeline(Pipeline2D):
         _func = vcs.utils.axisConvertFunctions[_convert]["forward"]
         self._data2[..., 1, :] = _func(self._data2[..., 1, :])
 
+    def updateData(self, data1, data2=None):
+        """Overrides baseclass implementation."""
+        # the mesh does not change
+        return super(MeshfillPipeline, self).updateData(data1)
+
     def _updateContourLevelsAndColors(self):
         self._updateContourLevelsAndColorsGeneric()
 
@@ -67,7 +75,6 @@ class MeshfillPipeline(Pipeline2D):
             # colored by scalars:
             for j, color in enumerate(tmpColors[i]):
                 mapper = vtk.vtkPolyDataMapper()
-                lut = vtk.vtkLookupTable()
                 th = vtk.vtkThreshold()
                 th.ThresholdBetween(l[j], l[j + 1])
                 # th.SetInputConnection(self._vtkPolyDataFilter.GetOutputPort())
@@ -78,18 +85,9 @@ class MeshfillPipeline(Pipeline2D):
                 geoFilter2.Update()
                 geos.append(geoFilter2)
                 mapper.SetInputConnection(geoFilter2.GetOutputPort())
-                lut.SetNumberOfTableValues(1)
-                r, g, b, a = self.getColorIndexOrRGBA(_colorMap, color)
-                if style == 'solid':
-                    tmpOpacity = tmpOpacities[j]
-                    if tmpOpacity is None:
-                        tmpOpacity = a / 100.
-                    else:
-                        tmpOpacity = tmpOpacities[j] / 100.
-                    lut.SetTableValue(
-                        0, r / 100., g / 100., b / 100., tmpOpacity)
-                else:
-                    lut.SetTableValue(0, 1., 1., 1., 0.)
+                lut = vcs2vtk.createLookupTable(
+                    self.getColorIndexOrRGBA(_colorMap, color),
+                    opacities=[tmpOpacities[j]], transparent=(style != 'solid'))
                 mapper.SetLookupTable(lut)
                 mapper.SetScalarRange(l[j], l[j + 1])
                 luts.append([lut, [l[j], l[j + 1], True]])
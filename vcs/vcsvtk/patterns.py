@@ -1,5 +1,7 @@
 import vtk
 import math
+import numpy
+from vtk.util import numpy_support as VN
 
 
 class Pattern(object):
@@ -49,25 +51,22 @@ class Pattern(object):
                 type(self)))
 
     def transform_glyph(self):
+        # Rotates then scales all the glyph points at once (in place,
+        # through a numpy view of the points)
         pts = self.glyph.GetPoints()
-        npts = pts.GetNumberOfPoints()
-        if self.rotation == 0.0:
-            pass
-            for i in range(npts):
-                x = pts.GetPoint(i)
-                y = [c * d for c, d in zip(x, self.scale)]
-                y.append(0.0)
-                pts.SetPoint(i, y)
-        else:
+        if pts.GetNumberOfPoints() == 0:
+            return
+        xyz = VN.vtk_to_numpy(pts.GetData())
+        x = xyz[:, 0].astype(numpy.float64)
+        y = xyz[:, 1].astype(numpy.float64)
+        if self.rotation != 0.0:
             a = math.radians(self.rotation)
-            for i in range(npts):
-                x = pts.GetPoint(i)
-                xt = x[0] * math.cos(a) - x[1] * math.sin(a)
-                yt = x[0] * math.sin(a) + x[1] * math.cos(a)
-                y = [xt, yt, 0]
-                y = [c * d for c, d in zip(y, self.scale)]
-                y.append(0.0)
-                pts.SetPoint(i, y)
+            x, y = (x * math.cos(a) - y * math.sin(a),
+                    x * math.sin(a) + y * math.cos(a))
+        xyz[:, 0] = x * self.scale[0]
+        xyz[:, 1] = y * self.scale[1]
+        xyz[:, 2] = 0.0
+        pts.Modified()
 
 
 class BottomLeftTri(Pattern):
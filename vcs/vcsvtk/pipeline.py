@@ -59,6 +59,10 @@ class Pipeline(object):
     def getColorIndexOrRGBA(self, colormap, color):
         return vcs.utils.rgba_color(color, colormap)
 
+    def getColorsRGBA(self, colormap, colors):
+        """(len(colors), 4) array of the 0-100 RGBA values of colors"""
+        return vcs.utils.rgba_colors(colors, colormap)
+
     # Returns new viewport bounds such that the dataset displayed there
     # will not be deformed.
     def _processRatioAutot(self, template, dataset):
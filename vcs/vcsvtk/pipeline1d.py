@@ -15,6 +15,70 @@ def smooth(x, beta, window_len=11):
     return y[(window_len / 2):-(window_len / 2)]
 
 
+def segments(valid):
+    """ (start, end) of the runs of True in the boolean array valid """
+    edges = numpy.flatnonzero(numpy.diff(numpy.concatenate(([0], valid.astype(numpy.int8), [0]))))
+    return zip(edges[::2], edges[1::2])
+
+
+def minmax_indices(x, y, x1, x2, nbins):
+    """ indices of the first, last, min and max points of (x, y)
+    in each of nbins columns of [x1, x2], x must be monotonic """
+    bins = numpy.floor((x - x1) * (nbins / float(x2 - x1)))
+    bins = numpy.clip(bins, -1, nbins).astype(numpy.int64)
+    starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(bins)) + 1))
+    ends = numpy.concatenate((starts[1:], [len(x)]))
+    runs = numpy.repeat(numpy.arange(len(starts)), ends - starts)
+    keep = [starts, ends - 1]
+    for reduction in (numpy.minimum, numpy.maximum):
+        extremum = numpy.repeat(reduction.reduceat(y, starts), ends - starts)
+        candidates = numpy.flatnonzero(y == extremum)
+        # first candidate of each run
+        first = numpy.concatenate(([True], numpy.diff(runs[candidates]) != 0))
+        keep.append(candidates[first])
+    return numpy.unique(numpy.concatenate(keep))
+
+
+def lttb_indices(x, y, n):
+    """ indices of the n points of (x, y) kept by the
+    Largest Triangle Three Buckets algorithm """
+    if n < 3 or len(x) <= 2 * n:
+        return numpy.arange(len(x))
+    # first and last points are kept, n - 2 buckets in between
+    edges = numpy.linspace(1, len(x) - 1, n - 1).astype(numpy.int64)
+    keep = numpy.empty(n, dtype=numpy.int64)
+    keep[0] = 0
+    keep[-1] = len(x) - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nextHi = edges[i + 2] if i + 2 < len(edges) else len(x)
+        avgX = x[hi:nextHi].mean()
+        avgY = y[hi:nextHi].mean()
+        area = numpy.abs((x[a] - avgX) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avgY - y[a]))
+        a = lo + numpy.argmax(area)
+        keep[i + 1] = a
+    return keep
+
+
+def decimate(x, y, method, x1, x2, npixels):
+    """ indices of the points of (x, y) to draw in npixels columns
+    spanning [x1, x2], about two per pixel """
+    if method is None or len(x) <= 4 * npixels or npixels < 1 or x1 == x2:
+        return None
+    if method == "lttb":
+        # buckets of consecutive points, x does not need to be sorted
+        return lttb_indices(x, y, 2 * npixels)
+    steps = numpy.diff(x)
+    if (steps >= 0).all() or (steps <= 0).all():
+        return minmax_indices(x, y, x1, x2, npixels)
+    # x goes back and forth (e.g. flipped plots): the columns are runs of
+    # consecutive points, keeping the extrema of both x and y
+    index = numpy.arange(len(x))
+    return numpy.union1d(minmax_indices(index, y, 0, len(x), npixels),
+                         minmax_indices(index, x, 0, len(x), npixels))
+
+
 class Pipeline1D(Pipeline):
 
     """Implementation of the Pipeline interface for 1D VCS plots."""
@@ -50,33 +114,41 @@ class Pipeline1D(Pipeline):
 
         ln_tmp = self._context().canvas.createline()
         try:  # Need to squeeze or list it too deep
-            Xs = X[:](squeeze=1).tolist()
+            Xs = X[:](squeeze=1)
         except Exception:
-            Xs = X[:].tolist()
+            Xs = X[:]
         try:  # Need to squeeze or list it too deep
-            Ys = Y[:](squeeze=1).tolist()
+            Ys = Y[:](squeeze=1)
         except Exception:
-            Ys = Y[:].tolist()
+            Ys = Y[:]
+        Xs = numpy.ma.ravel(Xs)
+        Ys = numpy.ma.ravel(Ys)
+
+        # Also need to make sure it fills the whole space
+        x1, x2, y1, y2 = vcs.utils.getworldcoordinates(self._gm, X, Y)
 
+        # Missing values break the line
+        valid = ~(numpy.ma.getmaskarray(Xs) | numpy.ma.getmaskarray(Ys))
+        Xs = numpy.ma.getdata(Xs)
+        Ys = numpy.ma.getdata(Ys)
+        npixels = int(round((tmpl.data.x2 - tmpl.data.x1) * self._context().renWin.GetSize()[0]))
         xs = []
         ys = []
-        prev = None
-        for i, v in enumerate(Ys):
-            if v is not None and Xs[i] is not None:  # Valid data
-                if prev is None:
-                    prev = []
-                    prev2 = []
-                prev.append(Xs[i])
-                prev2.append(v)
-            else:
-                if prev is not None:
-                    xs.append(prev)
-                    ys.append(prev2)
-                    prev = None
-
-        if prev is not None:
-            xs.append(prev)
-            ys.append(prev2)
+        # decimation only thins the line, markers are drawn at all the points
+        markerXs = []
+        markerYs = []
+        for start, end in segments(valid):
+            x = Xs[start:end]
+            y = Ys[start:end]
+            if self._gm.marker is not None:
+                markerXs.append(x.tolist())
+                markerYs.append(y.tolist())
+            kept = decimate(x, y, self._gm.decimate, x1, x2, npixels)
+            if kept is not None:
+                x = x[kept]
+                y = y[kept]
+            xs.append(x.tolist())
+            ys.append(y.tolist())
 
         ln_tmp._x = xs
         ln_tmp._y = ys
@@ -90,8 +162,6 @@ class Pipeline1D(Pipeline):
         ln_tmp._viewport = [tmpl.data.x1, tmpl.data.x2,
                             tmpl.data.y1, tmpl.data.y2]
 
-        # Also need to make sure it fills the whole space
-        x1, x2, y1, y2 = vcs.utils.getworldcoordinates(self._gm, X, Y)
         if (y1 > y2) and numpy.allclose(self._gm.datawc_y1, 1.E20):
             tmp = y1
             y1 = y2
@@ -117,8 +187,8 @@ class Pipeline1D(Pipeline):
                 m.size = self._gm.markersize
             else:
                 m.priority = 0
-            m._x = ln_tmp.x
-            m._y = ln_tmp.y
+            m._x = markerXs
+            m._y = markerYs
             m._viewport = ln_tmp.viewport
             m._worldcoordinate = ln_tmp.worldcoordinate
 
@@ -1,12 +1,150 @@
 from .pipeline import Pipeline
 from .. import vcs2vtk
+from .. import dataStatistics
 
 from . import fillareautils
+import cdms2
 import numpy
 import vcs
 import vtk
 import warnings
 
+# cells kept around the world coordinates when subsetting, so that contours
+# and cells crossing the edges of the plot are the same as on the whole data
+SUBSET_HALO = 2
+
+
+def _isSet(value):
+    return not numpy.isclose(vcs.utils.getDataWcValue(value), 1.e20)
+
+
+def subsetToWorldCoordinates(data, gm, halo=SUBSET_HALO):
+    """Returns the part of a (..., y, x) rectilinear or curvilinear variable
+    that is within the world coordinates set on the graphics method
+    (datawc_x1/x2/y1/y2), plus halo cells on each side. Longitudes are
+    compared modulo 360 so that wrapped world coordinates are kept.
+    Returns data itself if nothing can be cut off."""
+    wcs = [(gm.datawc_x1, gm.datawc_x2), (gm.datawc_y1, gm.datawc_y2)]
+    if not any(_isSet(w[0]) and _isSet(w[1]) for w in wcs):
+        return data
+    grid = data.getGrid()
+    try:
+        if isinstance(grid, cdms2.hgrid.AbstractCurveGrid):
+            subset = _subsetCurvilinear(data, grid, wcs, halo)
+        elif grid is None or isinstance(grid, cdms2.grid.AbstractRectGrid):
+            subset = _subsetRectilinear(data, wcs, halo)
+        else:
+            return data
+    except Exception:
+        # e.g. non monotonic axes, or no data in the world coordinates
+        return data
+    if subset.shape == data.shape:
+        return data
+    return subset
+
+
+def _subsetRectilinear(data, wcs, halo):
+    selection = {}
+    for index, (w1, w2) in zip([-1, -2], wcs):
+        axis = data.getAxis(index)
+        if not (_isSet(w1) and _isSet(w2)) or len(axis) < 2:
+            continue
+        cell = abs(axis[-1] - axis[0]) / (len(axis) - 1.)
+        lo = min(vcs.utils.getDataWcValue(w1), vcs.utils.getDataWcValue(w2)) - halo * cell
+        hi = max(vcs.utils.getDataWcValue(w1), vcs.utils.getDataWcValue(w2)) + halo * cell
+        if axis.isCircular() and hi - lo >= 360.:
+            continue
+        selection[axis.id] = (lo, hi)
+    if len(selection) == 0 or data.getAxis(-1).id == data.getAxis(-2).id:
+        return data
+    # cdms wraps circular axes (longitudes) around the selection
+    return data(**selection)
+
+
+def _subsetCurvilinear(data, grid, wcs, halo):
+    lat = numpy.ma.filled(grid.getLatitude()[:], numpy.nan)
+    lon = numpy.ma.filled(grid.getLongitude()[:], numpy.nan)
+    inside = numpy.ones(lat.shape, dtype=bool)
+    for coords, (w1, w2) in zip([lon, lat], wcs):
+        if not (_isSet(w1) and _isSet(w2)):
+            continue
+        lo = min(vcs.utils.getDataWcValue(w1), vcs.utils.getDataWcValue(w2))
+        hi = max(vcs.utils.getDataWcValue(w1), vcs.utils.getDataWcValue(w2))
+        if coords is lon:
+            if hi - lo >= 360.:
+                continue
+            with numpy.errstate(invalid="ignore"):
+                inside &= numpy.mod(coords - lo, 360.) <= hi - lo
+        else:
+            with numpy.errstate(invalid="ignore"):
+                inside &= (coords >= lo) & (coords <= hi)
+    rows = numpy.flatnonzero(inside.any(axis=1))
+    columns = numpy.flatnonzero(inside.any(axis=0))
+    if len(rows) == 0 or len(columns) == 0:
+        return data
+    j0 = max(rows[0] - halo, 0)
+    j1 = min(rows[-1] + halo + 1, lat.shape[0])
+    i0 = max(columns[0] - halo, 0)
+    i1 = min(columns[-1] + halo + 1, lat.shape[1])
+    return data[..., j0:j1, i0:i1]
+
+
+def _coarsenAxis(axis, factor, stride):
+    """Axis of the blocks of factor cells of axis, centered on the block
+    (or on the first cell of each block for stride) and bounded by the
+    block"""
+    n = len(axis)
+    starts = numpy.arange(0, n, factor)
+    ends = numpy.minimum(starts + factor, n) - 1
+    values = numpy.asarray(axis[:], dtype=numpy.float64)
+    bounds = axis.getBounds()
+    if bounds is not None:
+        bounds = numpy.stack([bounds[starts, 0], bounds[ends, 1]], axis=1)
+    if stride:
+        values = values[starts]
+    else:
+        values = numpy.add.reduceat(values, starts) / (ends - starts + 1)
+    coarse = cdms2.createAxis(values, bounds=bounds, id=axis.id)
+    for att, value in axis.attributes.items():
+        if att not in ["bounds", "realtopology"]:
+            setattr(coarse, att, value)
+    if axis.isLatitude():
+        coarse.designateLatitude()
+    elif axis.isLongitude():
+        coarse.designateLongitude()
+    return coarse
+
+
+def decimate2D(data, xfactor, yfactor, method="mean"):
+    """Reduces a (..., y, x) variable by xfactor cells along x and yfactor
+    along y, averaging the non missing values of each block ('mean') or
+    keeping the first cell of each block ('stride'). Curvilinear data is
+    always strided."""
+    if xfactor <= 1 and yfactor <= 1:
+        return data
+    xfactor = max(int(xfactor), 1)
+    yfactor = max(int(yfactor), 1)
+    grid = data.getGrid()
+    if isinstance(grid, cdms2.hgrid.AbstractCurveGrid):
+        return data[..., ::yfactor, ::xfactor]
+    axes = data.getAxisList()
+    Y = _coarsenAxis(axes[-2], yfactor, method == "stride")
+    X = _coarsenAxis(axes[-1], xfactor, method == "stride")
+    if method == "stride":
+        values = numpy.ma.array(data[..., ::yfactor, ::xfactor])
+    else:
+        mask = numpy.ma.getmaskarray(data)
+        values = numpy.ma.filled(data, 0.).astype(numpy.float64)
+        counts = (~mask).astype(numpy.int64)
+        for factor, axis in [(xfactor, -1), (yfactor, -2)]:
+            starts = numpy.arange(0, data.shape[axis], factor)
+            values = numpy.add.reduceat(values, starts, axis=axis)
+            counts = numpy.add.reduceat(counts, starts, axis=axis)
+        values = numpy.ma.masked_where(counts == 0, values / numpy.maximum(counts, 1))
+        values = values.astype(data.dtype)
+    return cdms2.createVariable(values, axes=axes[:-2] + [Y, X], id=data.id,
+                                attributes=data.attributes, fill_value=data.fill_value)
+
 
 class IPipeline2D(Pipeline):
 
@@ -31,6 +169,9 @@ class IPipeline2D(Pipeline):
         - _originalData2: The original data2 object.
         - _data1: The _originalData1 object modified for this pipeline.
         - _data2: The _originalData2 object modified for this pipeline.
+        - _gridData1: The part of _data1 put on _vtkDataSet, subset to the
+            world coordinates and decimated (lod plot keyword).
+        - _gridData2: The part of _data2 put on _vtkDataSet.
         - _contourLevels: List of contour levels.
         - _contourColors: List of contour colors.
         - _vtkDataSet: The vtkDataSet object with _trimmedData[1|2] set as
@@ -75,6 +216,8 @@ class IPipeline2D(Pipeline):
         self._originalData2 = None
         self._data1 = None
         self._data2 = None
+        self._gridData1 = None
+        self._gridData2 = None
         self._contourLevels = None
         self._contourColors = None
         self._vtkDataSet = None
@@ -193,6 +336,45 @@ class Pipeline2D(IPipeline2D):
             self._patternActors.append(act)
         return
 
+    def _addPatternItems(self, area, patterns, bounds):
+        """Adds to area one pattern/hatch item per key of patterns, which maps
+        the key to the fillareautils.make_patterned_polydata keywords of its
+        cells. Returns the actors of the items, filled by _drawPatterns"""
+        self._patterns = patterns
+        self._patternItems = []
+        actors = []
+        for key in sorted(patterns):
+            item = vtk.vtkPolyDataItem()
+            item.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
+            area.GetDrawAreaItem().AddItem(item)
+            self._patternItems.append((key, item))
+            actors.append([item, bounds])
+        self._resultDict["vtk_backend_pattern_items"] = [item for _, item in self._patternItems]
+        return actors
+
+    def _drawPatterns(self, poly, cellKeys):
+        """Fills the pattern items with the cells of poly, cellKeys being the
+        pattern key of each cell. Items without cells are hidden"""
+        # all the patterns are cut out of one lattice spanning the plot
+        latticeBounds = poly.GetBounds()
+        for key, item in self._patternItems:
+            patact = fillareautils.make_patterned_polydata(
+                vcs2vtk.extractCells(poly, cellKeys == key, compact=True),
+                latticeBounds=latticeBounds, **self._patterns[key])
+            item.SetVisible(patact is not None)
+            if patact is None:
+                continue
+            patMapper = patact.GetMapper()
+            patMapper.Update()
+            patPoly = patMapper.GetInput()
+            item.SetPolyData(patPoly)
+            item.SetMappedColors(patPoly.GetCellData().GetArray('Colors'))
+
+    def updatePatternItems(self):
+        """Cuts the pattern/hatch items out of the updated data, called by
+        VTKPlots.update_input for plots with patterned levels."""
+        raise NotImplementedError("Missing override.")
+
     def _prepContours(self):
         """ Prep contours bands"""
         tmpLevels = []
@@ -273,6 +455,28 @@ class Pipeline2D(IPipeline2D):
 
         return result
 
+    def _dataForGrid(self):
+        """Returns the data to put on the vtk grid: _data1 and _data2 cut to
+        the world coordinates of the graphics method and, with the lod plot
+        keyword, decimated to about one cell per pixel of the data area.
+        lod is None (no decimation), 'auto' or 'mean' (block means), or
+        'stride'. Meshfill, vectors and other two arrays plots are left as is."""
+        lod = self._plot_kargs.get("lod", None)
+        if lod not in [None, "auto", "mean", "stride"]:
+            raise ValueError("lod must be None, 'auto', 'mean' or 'stride', got %s" % repr(lod))
+        if self._data2 is not None or self._needsVectors or self._gm.g_name == "Gfm":
+            return self._data1, self._data2
+        data1 = subsetToWorldCoordinates(self._data1, self._gm)
+        if lod is None:
+            return data1, None
+        width, height = self._context().renWin.GetSize()
+        tmpl = self._template
+        pixels = [max(abs(tmpl.data.x2 - tmpl.data.x1) * width, 1.),
+                  max(abs(tmpl.data.y2 - tmpl.data.y1) * height, 1.)]
+        factors = [int(data1.shape[-1] // pixels[0]), int(data1.shape[-2] // pixels[1])]
+        method = "stride" if lod == "stride" else "mean"
+        return decimate2D(data1, factors[0], factors[1], method), None
+
     def plot(self, data1, data2, tmpl, grid, transform, **kargs):
         """Overrides baseclass implementation."""
         # Clear old results:
@@ -286,9 +490,7 @@ class Pipeline2D(IPipeline2D):
 
         # Preprocess the input scalar data:
         self._updateScalarData()
-        self._min = self._data1.min()
-        self._max = self._data1.max()
-        self._scalarRange = vcs.minmax(self._data1)
+        self._updateStatistics()
 
         # Create/update the VTK dataset.
         plotBasedDualGrid = kargs.get('plot_based_dual_grid', True)
@@ -325,8 +527,68 @@ class Pipeline2D(IPipeline2D):
         # Plot specific rendering:
         self._plotInternal()
 
+        # kept for in place data updates (VTKPlots.update_input)
+        self._resultDict["vtk_backend_pipeline"] = self
+        self._resultDict["vtk_backend_template"] = self._template
         return self._resultDict
 
+    def updateData(self, data1, data2=None):
+        """Prepares new data for an in place update of the plot.
+
+        Returns (data1, unchanged): the data to put on the vtk grid and
+        whether the contour levels, colors (and so the legend) computed from
+        the new data are the ones plotted. If not the plot must be redone.
+        """
+        levels = self._contourLevels
+        colors = self._contourColors
+        mask = numpy.ma.getmaskarray(self._gridData1)
+        self._originalData1 = data1
+        if data2 is not None:
+            self._originalData2 = data2
+        self._updateScalarData()
+        self._updateStatistics()
+        self._gridData1, self._gridData2 = self._dataForGrid()
+        vectorsUpdated = True
+        if self._needsVectors:
+            # levels colored by vector follow the new vector range
+            vectorsUpdated = self._updateVectors()
+        self._updateContourLevelsAndColors()
+        if isinstance(levels, numpy.ndarray):
+            levels = levels.tolist()
+        if isinstance(self._contourLevels, numpy.ndarray):
+            self._contourLevels = self._contourLevels.tolist()
+        unchanged = vectorsUpdated and self._contourLevels == levels and self._contourColors == colors
+        if self._maskedDataMapper is not None or getattr(self._gm, "missing", None) is not None:
+            # missing values are drawn by their own item
+            unchanged = unchanged and numpy.array_equal(mask, numpy.ma.getmaskarray(self._gridData1))
+        return self._gridData1, unchanged
+
+    def _updateVectors(self):
+        """Puts the vectors of the new data on the vtk grid. Returns False
+        if they cannot be updated in place (projected vectors)"""
+        if self._vtkGeoTransform is not None:
+            return False
+        vectors = vcs2vtk.generateVectorValues(self._gridData1, self._gridData2)
+        vcs2vtk.setArray(self._vtkDataSet, vectors, "vector",
+                         isCellData=self._hasCellData, isScalars=False)
+        self._vtkDataSet.GetPointData().GetVectors().GetRange(self._vectorRange, -1)
+        return True
+
+    def _fitToViewport(self, polydata):
+        """Returns polydata (the output of the polydata filter) scaled to the
+        viewport, vectors are kept as they are"""
+        T = vtk.vtkTransform()
+        T.Scale(self._context_xScale, self._context_yScale, 1.)
+        return vcs2vtk.applyTransformationToDataset(T, polydata)
+
+    def _updateStatistics(self):
+        """Sets the min, max and scalar range of the data, in one pass shared
+        with the template strings"""
+        stats = dataStatistics.statistics(self._data1)
+        self._min = stats.min
+        self._max = stats.max
+        self._scalarRange = stats.minmax()
+
     def _updateScalarData(self):
         """Overrides baseclass implementation."""
         data1 = self._originalData1.clone()
@@ -341,17 +603,18 @@ class Pipeline2D(IPipeline2D):
     def _updateVTKDataSet(self, plotBasedDualGrid):
         """
         """
+        data1, data2 = self._dataForGrid()
         if (plotBasedDualGrid):
-            hasCellData = self._data1.hasCellData()
+            hasCellData = data1.hasCellData()
             dualGrid = (hasCellData != self._needsCellData)
         else:
             dualGrid = False
-        genGridDict = vcs2vtk.genGrid(self._data1, self._data2, self._gm,
+        genGridDict = vcs2vtk.genGrid(data1, data2, self._gm,
                                       grid=self._vtkDataSet,
                                       geo=self._vtkGeoTransform, genVectors=self._needsVectors,
                                       dualGrid=dualGrid)
-        self._data1 = genGridDict["data"]
-        self._data2 = genGridDict["data2"]
+        self._gridData1 = genGridDict["data"]
+        self._gridData2 = genGridDict["data2"]
         self._updateFromGenGridDict(genGridDict)
 
     def _createPolyDataFilter(self):
@@ -418,7 +681,7 @@ class Pipeline2D(IPipeline2D):
 
         self._maskedDataMapper = vcs2vtk.putMaskOnVTKGrid(
             # self._data1, self._vtkDataSetFittedToViewport, color, self._hasCellData,
-            self._data1, self._vtkDataSet, color, self._hasCellData,
+            self._gridData1, self._vtkDataSet, color, self._hasCellData,
             deep=False)
 
         self._resultDict["vtk_backend_missing_mapper"] = (
@@ -59,10 +59,7 @@ class StreamlinePipeline(Pipeline2D):
         # plots between Context2D and the old baselines.
 
         # Transform the input data
-        T = vtk.vtkTransform()
-        T.Scale(self._context_xScale, self._context_yScale, 1.)
-
-        self._vtkDataSetFittedToViewport = vcs2vtk.applyTransformationToDataset(T, self._vtkDataSetFittedToViewport)
+        self._vtkDataSetFittedToViewport = self._fitToViewport(self._vtkDataSetFittedToViewport)
         self._vtkDataSetBoundsNoMask = self._vtkDataSetFittedToViewport.GetBounds()
 
         polydata = self._vtkDataSetFittedToViewport
@@ -159,22 +156,9 @@ class StreamlinePipeline(Pipeline2D):
         arcLengthFilter = vtk.vtkAppendArcLength()
         arcLengthFilter.SetInputConnection(streamer.GetOutputPort())
 
-        arcLengthFilter.Update()
-        streamlines = arcLengthFilter.GetOutput()
-
         # glyph seed points
         contour = vtk.vtkContourFilter()
         contour.SetInputConnection(arcLengthFilter.GetOutputPort())
-        contour.SetValue(0, 0.001)
-        if (streamlines.GetNumberOfPoints()):
-            r = streamlines.GetPointData().GetArray("arc_length").GetRange()
-            numberofglyphsoneside = self._gm.numberofglyphs // 2
-            for i in range(1, numberofglyphsoneside):
-                contour.SetValue(i, r[1] / numberofglyphsoneside * i)
-        else:
-            warnings.warn("No streamlines created. "
-                          "The 'startseed' parameter needs to be inside the domain and "
-                          "not over masked data.")
         contour.SetInputArrayToProcess(0, 0, 0, 0, "arc_length")
 
         # arrow glyph source
@@ -201,32 +185,113 @@ class StreamlinePipeline(Pipeline2D):
         glyph.SetScaleFactor(dataLength * self._gm.glyphscalefactor / glyphLength)
         glyph.SetColorModeToColorByVector()
 
-        glyphMapper = vtk.vtkPolyDataMapper()
-        glyphActor = vtk.vtkActor()
+        cmap = self.getColorMap()
+        if (not self._gm.coloredbyvector):
+            if isinstance(lcolor, (list, tuple)):
+                r, g, b, a = lcolor
+            else:
+                r, g, b, a = cmap.index[lcolor]
+            self._fixedColor = [int((r / 100.) * 255), int((g / 100.) * 255), int((b / 100.) * 255), 255]
+
+        self._streamer = streamer
+        self._arcLengthFilter = arcLengthFilter
+        self._glyphContour = contour
+        self._glyphFilter = glyph
+        self._lineItem = vtk.vtkPolyDataItem()
+        self._lineItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_POINT_DATA)
+        self._glyphItem = vtk.vtkPolyDataItem()
+        self._glyphItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_POINT_DATA)
+        self._drawStreamlines()
+
+        # Add the streamlines and the glyphs
+        area.GetDrawAreaItem().AddItem(self._lineItem)
+        area.GetDrawAreaItem().AddItem(self._glyphItem)
+
+        plotting_dataset_bounds = self.getPlottingBounds()
+        vp = self._resultDict.get('ratio_autot_viewport',
+                                  [self._template.data.x1, self._template.data.x2,
+                                   self._template.data.y1, self._template.data.y2])
+
+        kwargs = {
+            'vtk_backend_grid': self._vtkDataSet,
+            'dataset_bounds': self._vtkDataSetBounds,
+            'plotting_dataset_bounds': plotting_dataset_bounds,
+            "vtk_dataset_bounds_no_mask": self._vtkDataSetBoundsNoMask,
+            'vtk_backend_geo': self._vtkGeoTransform,
+            "vtk_backend_draw_area_bounds": continentBounds,
+            "vtk_backend_viewport_scale": [
+                self._context_xScale,
+                self._context_yScale
+            ]
+        }
+        if ('ratio_autot_viewport' in self._resultDict):
+            kwargs["ratio_autot_viewport"] = vp
+        self._resultDict.update(self._context().renderTemplate(
+            self._template, self._data1,
+            self._gm, taxis, zaxis, **kwargs))
+        if (self._gm.coloredbyvector):
+            self._resultDict.update(
+                self._context().renderColorBar(self._template, self._contourLevels,
+                                               self._contourColors,
+                                               None,
+                                               self.getColorMap()))
 
-        mapper = vtk.vtkPolyDataMapper()
-        act = vtk.vtkActor()
+        kwargs['xaxisconvert'] = self._gm.xaxisconvert
+        kwargs['yaxisconvert'] = self._gm.yaxisconvert
+        if self._data1.getAxis(-1).isLongitude() and self._data1.getAxis(-2).isLatitude():
+            self._context().plotContinents(self._plot_kargs.get("continents", self._useContinents),
+                                           plotting_dataset_bounds, projection,
+                                           self._dataWrapModulo, vp,
+                                           self._template.data.priority, **kwargs)
+        self._resultDict["vtk_backend_actors"] = [[self._lineItem, plotting_dataset_bounds]]
+        self._resultDict["vtk_backend_streamer"] = self._streamer
+        self._resultDict["vtk_backend_luts"] = [[None, None]]
 
-        glyph.Update()
-        glyphDataset = glyph.GetOutput()
-        streamer.Update()
-        lineDataset = streamer.GetOutput()
+    def updateVectorItems(self):
+        """Integrates and draws the streamlines again with the vectors put on
+        the grid by updateData. The colorbar only depends on the levels, which
+        updateData compares, so the plot is always up to date."""
+        self._vtkPolyDataFilter.Update()
+        self._streamer.SetInputData(self._fitToViewport(self._vtkPolyDataFilter.GetOutput()))
+        self._drawStreamlines()
+        return True
+
+    def _drawStreamlines(self):
+        """Runs the streamer and the glyphs, puts them and their colors on the
+        line and glyph items"""
+        self._arcLengthFilter.Update()
+        streamlines = self._arcLengthFilter.GetOutput()
+
+        # glyph seed points
+        contour = self._glyphContour
+        contour.SetNumberOfContours(0)
+        contour.SetValue(0, 0.001)
+        if (streamlines.GetNumberOfPoints()):
+            r = streamlines.GetPointData().GetArray("arc_length").GetRange()
+            numberofglyphsoneside = self._gm.numberofglyphs // 2
+            for i in range(1, numberofglyphsoneside):
+                contour.SetValue(i, r[1] / numberofglyphsoneside * i)
+        else:
+            warnings.warn("No streamlines created. "
+                          "The 'startseed' parameter needs to be inside the domain and "
+                          "not over masked data.")
+
+        self._glyphFilter.Update()
+        glyphDataset = self._glyphFilter.GetOutput()
+        self._streamer.Update()
+        lineDataset = self._streamer.GetOutput()
 
         deleteLineColors = False
         deleteGlyphColors = False
 
         # color the streamlines and glyphs
-        cmap = self.getColorMap()
         if (self._gm.coloredbyvector):
             numLevels = len(self._contourLevels) - 1
             while len(self._contourColors) < numLevels:
                 self._contourColors.append(self._contourColors[-1])
 
-            lut = vtk.vtkLookupTable()
-            lut.SetNumberOfTableValues(numLevels)
-            for i in range(numLevels):
-                r, g, b, a = self.getColorIndexOrRGBA(cmap, self._contourColors[i])
-                lut.SetTableValue(i, r / 100., g / 100., b / 100., a / 100.)
+            lut = vcs2vtk.createLookupTable(
+                self.getColorsRGBA(self.getColorMap(), self._contourColors[:numLevels]))
             lut.SetVectorModeToMagnitude()
             if numpy.allclose(self._contourLevels[0], -1.e20):
                 lmn = self._vectorRange[0]
@@ -238,14 +303,7 @@ class StreamlinePipeline(Pipeline2D):
                 lmx = self._contourLevels[-1][-1]
             lut.SetRange(lmn, lmx)
 
-            mapper.ScalarVisibilityOn()
-            mapper.SetLookupTable(lut)
-            mapper.UseLookupTableScalarRangeOn()
-            mapper.SetScalarModeToUsePointFieldData()
-            mapper.SelectColorArray("vector")
-
-            lineAttrs = lineDataset.GetPointData()
-            lineData = lineAttrs.GetArray("vector")
+            lineData = lineDataset.GetPointData().GetArray("vector")
 
             if lineData and numLevels:
                 lineColors = lut.MapScalars(lineData, vtk.VTK_COLOR_MODE_DEFAULT, 0)
@@ -256,14 +314,7 @@ class StreamlinePipeline(Pipeline2D):
                 color = [0, 0, 0, 255]
                 lineColors = vcs2vtk.generateSolidColorArray(numTuples, color)
 
-            glyphMapper.ScalarVisibilityOn()
-            glyphMapper.SetLookupTable(lut)
-            glyphMapper.UseLookupTableScalarRangeOn()
-            glyphMapper.SetScalarModeToUsePointFieldData()
-            glyphMapper.SelectColorArray("VectorMagnitude")
-
-            glyphAttrs = glyphDataset.GetPointData()
-            glyphData = glyphAttrs.GetArray("VectorMagnitude")
+            glyphData = glyphDataset.GetPointData().GetArray("VectorMagnitude")
 
             if glyphData and numLevels:
                 glyphColors = lut.MapScalars(glyphData, vtk.VTK_COLOR_MODE_DEFAULT, 0)
@@ -274,76 +325,18 @@ class StreamlinePipeline(Pipeline2D):
                 color = [0, 0, 0, 255]
                 glyphColors = vcs2vtk.generateSolidColorArray(numTuples, color)
         else:
-            mapper.ScalarVisibilityOff()
-            glyphMapper.ScalarVisibilityOff()
-            if isinstance(lcolor, (list, tuple)):
-                r, g, b, a = lcolor
-            else:
-                r, g, b, a = cmap.index[lcolor]
-            act.GetProperty().SetColor(r / 100., g / 100., b / 100.)
-            glyphActor.GetProperty().SetColor(r / 100., g / 100., b / 100.)
-
-            fixedColor = [int((r / 100.) * 255), int((g / 100.) * 255), int((b / 100.) * 255), 255]
-
             numTuples = lineDataset.GetNumberOfPoints()
-            lineColors = vcs2vtk.generateSolidColorArray(numTuples, fixedColor)
+            lineColors = vcs2vtk.generateSolidColorArray(numTuples, self._fixedColor)
 
             numTuples = glyphDataset.GetNumberOfPoints()
-            glyphColors = vcs2vtk.generateSolidColorArray(numTuples, fixedColor)
+            glyphColors = vcs2vtk.generateSolidColorArray(numTuples, self._fixedColor)
 
-        # Add the streamlines
-        lineItem = vtk.vtkPolyDataItem()
-        lineItem.SetPolyData(lineDataset)
-        lineItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_POINT_DATA)
-        lineItem.SetMappedColors(lineColors)
+        self._lineItem.SetPolyData(lineDataset)
+        self._lineItem.SetMappedColors(lineColors)
         if deleteLineColors:
             lineColors.FastDelete()
-        area.GetDrawAreaItem().AddItem(lineItem)
 
-        # Add the glyphs
-        glyphItem = vtk.vtkPolyDataItem()
-        glyphItem.SetPolyData(glyphDataset)
-        glyphItem.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_POINT_DATA)
-        glyphItem.SetMappedColors(glyphColors)
+        self._glyphItem.SetPolyData(glyphDataset)
+        self._glyphItem.SetMappedColors(glyphColors)
         if deleteGlyphColors:
             glyphColors.FastDelete()
-        area.GetDrawAreaItem().AddItem(glyphItem)
-
-        plotting_dataset_bounds = self.getPlottingBounds()
-        vp = self._resultDict.get('ratio_autot_viewport',
-                                  [self._template.data.x1, self._template.data.x2,
-                                   self._template.data.y1, self._template.data.y2])
-
-        kwargs = {
-            'vtk_backend_grid': self._vtkDataSet,
-            'dataset_bounds': self._vtkDataSetBounds,
-            'plotting_dataset_bounds': plotting_dataset_bounds,
-            "vtk_dataset_bounds_no_mask": self._vtkDataSetBoundsNoMask,
-            'vtk_backend_geo': self._vtkGeoTransform,
-            "vtk_backend_draw_area_bounds": continentBounds,
-            "vtk_backend_viewport_scale": [
-                self._context_xScale,
-                self._context_yScale
-            ]
-        }
-        if ('ratio_autot_viewport' in self._resultDict):
-            kwargs["ratio_autot_viewport"] = vp
-        self._resultDict.update(self._context().renderTemplate(
-            self._template, self._data1,
-            self._gm, taxis, zaxis, **kwargs))
-        if (self._gm.coloredbyvector):
-            self._resultDict.update(
-                self._context().renderColorBar(self._template, self._contourLevels,
-                                               self._contourColors,
-                                               None,
-                                               self.getColorMap()))
-
-        kwargs['xaxisconvert'] = self._gm.xaxisconvert
-        kwargs['yaxisconvert'] = self._gm.yaxisconvert
-        if self._data1.getAxis(-1).isLongitude() and self._data1.getAxis(-2).isLatitude():
-            self._context().plotContinents(self._plot_kargs.get("continents", self._useContinents),
-                                           plotting_dataset_bounds, projection,
-                                           self._dataWrapModulo, vp,
-                                           self._template.data.priority, **kwargs)
-        self._resultDict["vtk_backend_actors"] = [[lineItem, plotting_dataset_bounds]]
-        self._resultDict["vtk_backend_luts"] = [[None, None]]
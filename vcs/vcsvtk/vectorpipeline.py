@@ -1,8 +1,10 @@
 from .pipeline2d import Pipeline2D
 
+import numpy
 import vcs
 from vcs import vcs2vtk
 import vtk
+from vtk.util import numpy_support as VN
 
 
 class VectorPipeline(Pipeline2D):
@@ -87,9 +89,7 @@ class VectorPipeline(Pipeline2D):
         continentBounds = vcs2vtk.computeDrawAreaBounds(adjusted_plotting_bounds)
 
         # Transform the input data
-        T = vtk.vtkTransform()
-        T.Scale(self._context_xScale, self._context_yScale, 1.)
-        self._vtkDataSetFittedToViewport = vcs2vtk.applyTransformationToDataset(T, self._vtkDataSetFittedToViewport)
+        self._vtkDataSetFittedToViewport = self._fitToViewport(self._vtkDataSetFittedToViewport)
         self._vtkDataSetBoundsNoMask = self._vtkDataSetFittedToViewport.GetBounds()
 
         polydata = self._vtkDataSetFittedToViewport
@@ -113,8 +113,6 @@ class VectorPipeline(Pipeline2D):
         # polydata = tmpMapper.GetInput()
         plotting_dataset_bounds = self.getPlottingBounds()
 
-        vectors = polydata.GetPointData().GetVectors()
-
         arrow = vtk.vtkGlyphSource2D()
         arrow.SetGlyphTypeToArrow()
         arrow.SetOutputPointsPrecision(vtk.vtkAlgorithm.DOUBLE_PRECISION)
@@ -129,65 +127,15 @@ class VectorPipeline(Pipeline2D):
         glyphFilter.OrientOn()
         glyphFilter.ScalingOn()
 
-        glyphFilter.SetScaleModeToScaleByVector()
-
-        if self._gm.scaletype == 'constant' or\
-           self._gm.scaletype == 'constantNNormalize' or\
-           self._gm.scaletype == 'constantNLinear':
-            scaleFactor = scale * self._gm.scale
-        else:
-            scaleFactor = 1.0
-        maxNormInVp = None
-        minNormInVp = None
-        # Find the min and max vector magnitudes
-        (minNorm, maxNorm) = vectors.GetRange(-1)
-        if maxNorm == 0:
-            maxNorm = 1.0
-
-        if self._gm.scaletype == 'normalize' or self._gm.scaletype == 'linear' or\
-           self._gm.scaletype == 'constantNNormalize' or self._gm.scaletype == 'constantNLinear':
-            if self._gm.scaletype == 'normalize' or self._gm.scaletype == 'constantNNormalize':
-                scaleFactor /= maxNorm
-
-            if self._gm.scaletype == 'linear' or self._gm.scaletype == 'constantNLinear':
-                noOfComponents = vectors.GetNumberOfComponents()
-                scalarArray = vtk.vtkDoubleArray()
-                scalarArray.SetNumberOfComponents(1)
-                scalarArray.SetNumberOfValues(vectors.GetNumberOfTuples())
-
-                oldRange = maxNorm - minNorm
-                oldRange = 1.0 if oldRange == 0.0 else oldRange
-
-                # New range min, max.
-                newRangeValues = self._gm.scalerange
-                newRange = newRangeValues[1] - newRangeValues[0]
-
-                for i in range(0, vectors.GetNumberOfTuples()):
-                    norm = vtk.vtkMath.Norm(vectors.GetTuple(i), noOfComponents)
-                    newValue = (((norm - minNorm) * newRange) / oldRange) + newRangeValues[0]
-                    scalarArray.SetValue(i, newValue)
-
-                polydata.GetPointData().SetScalars(scalarArray)
-                maxNormInVp = newRangeValues[1] * scaleFactor
-                minNormInVp = newRangeValues[0] * scaleFactor
-
-                # Scale to vector magnitude:
-                # NOTE: Currently we compute our own scaling factor since VTK does
-                # it by clamping the values > max to max  and values < min to min
-                # and not remap the range.
-                glyphFilter.SetScaleModeToScaleByScalar()
-
-        if (maxNormInVp is None):
-            maxNormInVp = maxNorm * scaleFactor
-            # minNormInVp is left None, as it is displayed only for linear scaling.
+        # Scale to the data in the viewport
+        self._glyphScale = scale
+        self._glyphWorldToViewportXScale = vp[1] - vp[0]
         if self._vtkGeoTransform:
-            worldWidth = self._vtkDataSetBoundsNoMask[1] - self._vtkDataSetBoundsNoMask[0]
+            self._glyphWorldToViewportXScale /= self._vtkDataSetBoundsNoMask[1] - self._vtkDataSetBoundsNoMask[0]
         else:
-            worldWidth = self._vtkDataSetBounds[1] - self._vtkDataSetBounds[0]
-        worldToViewportXScale = (vp[1] - vp[0]) / worldWidth
-        maxNormInVp *= worldToViewportXScale
-        if (minNormInVp):
-            minNormInVp *= worldToViewportXScale
+            self._glyphWorldToViewportXScale /= self._vtkDataSetBounds[1] - self._vtkDataSetBounds[0]
+        self._glyphFilter = glyphFilter
+        legend = self._scaleGlyphs(polydata)
 
         cmap = self.getColorMap()
         if isinstance(lcolor, (list, tuple)):
@@ -197,31 +145,13 @@ class VectorPipeline(Pipeline2D):
         # act.GetProperty().SetColor(r / 100., g / 100., b / 100.)
         vtk_color = [int((c / 100.) * 255) for c in [r, g, b, a]]
 
-        # Using the scaled data, set the glyph filter input
-        glyphFilter.SetScaleFactor(scaleFactor)
-        glyphFilter.SetInputData(polydata)
-        glyphFilter.Update()
         # and set the arrows to be rendered.
-
-        data = glyphFilter.GetOutput()
-
-        floatValue = vtk.vtkFloatArray()
-        floatValue.SetNumberOfComponents(1)
-        floatValue.SetName("LineWidth")
-        floatValue.InsertNextValue(lwidth)
-        data.GetFieldData().AddArray(floatValue)
-
         item = vtk.vtkPolyDataItem()
-        item.SetPolyData(data)
-
         item.SetScalarMode(vtk.VTK_SCALAR_MODE_USE_CELL_DATA)
-
-        colorArray = vtk.vtkUnsignedCharArray()
-        colorArray.SetNumberOfComponents(4)
-        for i in range(data.GetNumberOfCells()):
-            colorArray.InsertNextTypedTuple(vtk_color)
-
-        item.SetMappedColors(colorArray)
+        self._glyphItem = item
+        self._glyphWidth = lwidth
+        self._glyphColor = vtk_color
+        self._drawGlyphs()
         area.GetDrawAreaItem().AddItem(item)
 
         # assume that self._data1.units has the proper vector units
@@ -229,9 +159,10 @@ class VectorPipeline(Pipeline2D):
         if (hasattr(self._data1, 'units')):
             unitString = self._data1.units
 
+        self._legend = legend
         vcs.utils.drawVectorLegend(
             self._context().canvas, self._template.legend, lcolor, lstyle, lwidth,
-            unitString, maxNormInVp, maxNorm, minNormInVp, minNorm, reference=self._gm.reference)
+            unitString, *legend, reference=self._gm.reference)
 
         kwargs = {
             'vtk_backend_grid': self._vtkDataSet,
@@ -262,6 +193,107 @@ class VectorPipeline(Pipeline2D):
         self._resultDict["vtk_backend_glyphfilters"] = [glyphFilter]
         self._resultDict["vtk_backend_luts"] = [[None, None]]
 
+    def updateVectorItems(self):
+        """Redraws the arrows with the vectors put on the grid by updateData.
+
+        Returns False if the vector legend changes with the new data, the
+        plot must then be redone.
+        """
+        self._vtkPolyDataFilter.Update()
+        polydata = self._fitToViewport(self._vtkPolyDataFilter.GetOutput())
+        legend = self._scaleGlyphs(polydata)
+        self._drawGlyphs()
+        return self._legendKey(legend) == self._legendKey(self._legend)
+
+    def _legendKey(self, legend):
+        """What the vector legend shows for (maxNormInVp, maxNorm, minNormInVp, minNorm)"""
+        maxNormInVp, maxNorm, minNormInVp, minNorm = legend
+        if numpy.allclose(self._gm.reference, 1e20):
+            key = [maxNormInVp, maxNorm]
+        else:
+            # the reference vector is drawn
+            key = [maxNormInVp / maxNorm]
+        if minNormInVp:
+            key.extend([minNormInVp, minNorm])
+        return key
+
+    def _scaleGlyphs(self, polydata):
+        """Sets polydata as the input of the glyph filter, scaled for its
+        vectors. Returns the vector legend (maxNormInVp, maxNorm, minNormInVp,
+        minNorm)"""
+        glyphFilter = self._glyphFilter
+        vectors = polydata.GetPointData().GetVectors()
+        glyphFilter.SetScaleModeToScaleByVector()
+
+        if self._gm.scaletype == 'constant' or\
+           self._gm.scaletype == 'constantNNormalize' or\
+           self._gm.scaletype == 'constantNLinear':
+            scaleFactor = self._glyphScale * self._gm.scale
+        else:
+            scaleFactor = 1.0
+        maxNormInVp = None
+        minNormInVp = None
+        # Find the min and max vector magnitudes
+        (minNorm, maxNorm) = vectors.GetRange(-1)
+        if maxNorm == 0:
+            maxNorm = 1.0
+
+        if self._gm.scaletype == 'normalize' or self._gm.scaletype == 'linear' or\
+           self._gm.scaletype == 'constantNNormalize' or self._gm.scaletype == 'constantNLinear':
+            if self._gm.scaletype == 'normalize' or self._gm.scaletype == 'constantNNormalize':
+                scaleFactor /= maxNorm
+
+            if self._gm.scaletype == 'linear' or self._gm.scaletype == 'constantNLinear':
+                oldRange = maxNorm - minNorm
+                oldRange = 1.0 if oldRange == 0.0 else oldRange
+
+                # New range min, max.
+                newRangeValues = self._gm.scalerange
+                newRange = newRangeValues[1] - newRangeValues[0]
+
+                norms = numpy.linalg.norm(VN.vtk_to_numpy(vectors).reshape((-1, vectors.GetNumberOfComponents())),
+                                          axis=1)
+                scalarArray = vcs2vtk.numpy_to_vtk_wrapper(
+                    ((norms - minNorm) * newRange) / oldRange + newRangeValues[0], deep=True)
+
+                polydata.GetPointData().SetScalars(scalarArray)
+                maxNormInVp = newRangeValues[1] * scaleFactor
+                minNormInVp = newRangeValues[0] * scaleFactor
+
+                # Scale to vector magnitude:
+                # NOTE: Currently we compute our own scaling factor since VTK does
+                # it by clamping the values > max to max  and values < min to min
+                # and not remap the range.
+                glyphFilter.SetScaleModeToScaleByScalar()
+
+        if (maxNormInVp is None):
+            maxNormInVp = maxNorm * scaleFactor
+            # minNormInVp is left None, as it is displayed only for linear scaling.
+        maxNormInVp *= self._glyphWorldToViewportXScale
+        if (minNormInVp):
+            minNormInVp *= self._glyphWorldToViewportXScale
+
+        glyphFilter.SetScaleFactor(scaleFactor)
+        glyphFilter.SetInputData(polydata)
+        return maxNormInVp, maxNorm, minNormInVp, minNorm
+
+    def _drawGlyphs(self):
+        """Updates the glyph filter and puts its arrows on the glyph item"""
+        self._glyphFilter.Update()
+        data = self._glyphFilter.GetOutput()
+
+        floatValue = vtk.vtkFloatArray()
+        floatValue.SetNumberOfComponents(1)
+        floatValue.SetName("LineWidth")
+        floatValue.InsertNextValue(self._glyphWidth)
+        data.GetFieldData().AddArray(floatValue)
+
+        self._glyphItem.SetPolyData(data)
+        colors = numpy.empty((data.GetNumberOfCells(), 4), dtype=numpy.uint8)
+        colors[:] = self._glyphColor
+        colorArray = vcs2vtk.numpy_to_vtk_wrapper(colors, deep=True, array_type=vtk.VTK_UNSIGNED_CHAR)
+        self._glyphItem.SetMappedColors(colorArray)
+
     def _updateContourLevelsAndColors(self):
         """Overrides baseclass implementation."""
         pass